@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.association import AssociationMode, associate
+
+def legacy_associate(people, bags, threshold=150.0):
+    """Reference copy of the original per-dict nested loop."""
+    for p in people:
+        p['has_bag'] = False
+        p['bag_ids'] = []
+
+    associated_bags = []
+    for b in bags:
+        bx1, by1, bx2, by2 = b['box']
+        bcx, bcy = (bx1 + bx2) / 2, (by1 + by2) / 2
+        min_dist = float('inf')
+        best_person = None
+        for p in people:
+            px1, py1, px2, py2 = p['box']
+            pcx, pcy = (px1 + px2) / 2, (py1 + py2) / 2
+            dist = ((bcx - pcx)**2 + (bcy - pcy)**2)**0.5
+            if dist < min_dist and dist < threshold:
+                min_dist = dist
+                best_person = p
+        if best_person:
+            best_person['has_bag'] = True
+            best_person['bag_ids'].append(b['id'])
+            b['associated'] = True
+            associated_bags.append(b)
+        else:
+            b['associated'] = False
+    return associated_bags
+
+def random_boxes(rng, n, width=1920, height=1080, size=80):
+    xy = rng.uniform(0, [width - size, height - size], size=(n, 2))
+    return np.hstack([xy, xy + size])
+
+def time_call(fn, repeats):
+    fn()  # warm-up (lazy imports, allocator)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame cost of person-bag association as detection counts grow")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 20, 40, 80, 160])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'people':>6} | {'bags':>6} | {'legacy ms':>10} | {'greedy ms':>10} | {'optimal ms':>10}")
+    print("-" * 56)
+    for n in args.sizes:
+        m = int(n * 1.3)
+        person_xyxy = random_boxes(rng, n)
+        bag_xyxy = random_boxes(rng, m)
+        people = [{'box': b, 'id': i} for i, b in enumerate(person_xyxy)]
+        bags = [{'box': b, 'id': i} for i, b in enumerate(bag_xyxy)]
+
+        legacy = time_call(lambda: legacy_associate(people, bags), args.repeats)
+        greedy = time_call(lambda: associate(person_xyxy, bag_xyxy), args.repeats)
+        optimal = time_call(lambda: associate(person_xyxy, bag_xyxy, mode=AssociationMode.OPTIMAL), args.repeats)
+        print(f"{n:>6} | {m:>6} | {legacy:>10.3f} | {greedy:>10.3f} | {optimal:>10.3f}")
+
+if __name__ == "__main__":
+    main()
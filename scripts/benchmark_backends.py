@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backends import Backend, Detections, load_detector
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, CountSink
+from src.utils import load_config
+
+def read_frames(video, limit):
+    cap = cv2.VideoCapture(video)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def torch_detect(model, frames, conf, imgsz):
+    out = []
+    for result in model.predict(frames, conf=conf, imgsz=imgsz, verbose=False):
+        boxes = result.boxes
+        out.append(Detections(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy()))
+    return out
+
+def max_box_error(reference, other):
+    """Largest corner offset (px) between matched detections; inf when the detection sets differ in size."""
+    if len(reference) != len(other):
+        return float("inf")
+    if len(reference) == 0:
+        return 0.0
+    a = reference.xyxy[np.argsort(-reference.conf)]
+    b = other.xyxy[np.argsort(-other.conf)]
+    return float(np.abs(a - b).max())
+
+def latency(detect, frames, repeats):
+    detect(frames[:1])  # warm-up: session creation, first-run allocations
+    times = []
+    for _ in range(repeats):
+        for frame in frames:
+            start = time.perf_counter()
+            detect([frame])
+            times.append(time.perf_counter() - start)
+    times = np.array(times) * 1000
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+def count(config, video, backend):
+    counter = BagCounter({**config, 'inference_backend': backend})
+    for _ in FramePipeline(counter, [CountSink()]).run(video):
+        pass
+    return counter.count_in, counter.count_out
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame latency and detection parity of the inference backends")
+    parser.add_argument("--config", type=str, default="config/default_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the .pt weights from the config")
+    parser.add_argument("--videos", type=str, default="data/samples", help="A video or a directory of them")
+    parser.add_argument("--backends", type=str, default="torch,onnx,openvino")
+    parser.add_argument("--frames", type=int, default=10, help="Frames per video")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=2.0, help="Max box corner offset (px) vs. torch")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.model:
+        config['model'] = args.model
+    conf, imgsz = config.get('confidence', 0.4), config.get('imgsz', 640)
+    videos = sorted(os.path.join(args.videos, f) for f in os.listdir(args.videos)) \
+        if os.path.isdir(args.videos) else [args.videos]
+
+    from ultralytics import YOLO
+    detectors = {"torch": lambda frames, m=YOLO(config['model']): torch_detect(m, frames, conf, imgsz)}
+    for name in args.backends.split(","):
+        if name == "torch":
+            continue
+        try:
+            detector = load_detector(config['model'], Backend(name), imgsz)
+        except Exception as e:
+            print(f"{name}: unavailable ({e})")
+            continue
+        detectors[name] = lambda frames, d=detector: d(frames, conf=conf)
+
+    print(f"{'video':<22} | {'backend':<9} | {'p50 ms':>7} | {'p95 ms':>7} | {'max box err':>11} | {'IN/OUT':>7} | parity")
+    print("-" * 90)
+    failures = 0
+    for video in videos:
+        frames = read_frames(video, args.frames)
+        if not frames:
+            continue
+        reference = detectors["torch"](frames)
+        torch_counts = count(config, video, "torch")
+        for name, detect in detectors.items():
+            p50, p95 = latency(detect, frames, args.repeats)
+            error = max(max_box_error(r, o) for r, o in zip(reference, detect(frames)))
+            counts = torch_counts if name == "torch" else count(config, video, name)
+            ok = error <= args.tolerance and counts == torch_counts
+            failures += not ok
+            print(f"{os.path.basename(video):<22} | {name:<9} | {p50:>7.1f} | {p95:>7.1f} | {error:>11.3f} | "
+                  f"{counts[0]:>3}/{counts[1]:<3} | {'ok' if ok else 'MISMATCH'}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import glob
+import time
+import argparse
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, CountSink
+from src.utils import load_config
+
+def run(config, model, video, batch_size, latency_ms):
+    # A fresh counter (and so a fresh ByteTrack state) per run keeps the comparison fair
+    counter = BagCounter(config, model=model)
+    pipeline = FramePipeline(counter, [CountSink()], batch_size=batch_size, max_batch_latency_ms=latency_ms)
+    frames = 0
+    track_ids = []
+    start = time.perf_counter()
+    for result in pipeline.run(video):
+        frames += 1
+        track_ids.append(tuple(result.track_ids.tolist()) if result.track_ids is not None else ())
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, (counter.count_in, counter.count_out), track_ids
+
+def main():
+    parser = argparse.ArgumentParser(description="FPS and count parity of micro-batched vs. single-frame inference")
+    parser.add_argument("--videos", type=str, nargs="+", default=sorted(glob.glob("data/samples/*")))
+    parser.add_argument("--config", type=str, default="config/scenario1_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the model from the config")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    model = args.model or config.get('model', 'yolov8n.pt')
+
+    print(f"{'video':<28} | {'batch':>5} | {'fps':>7} | {'IN/OUT':>7} | parity")
+    print("-" * 66)
+    for video in args.videos:
+        run(config, model, video, 1, args.latency_ms)  # warm-up: first inference pays for lazy setup
+        baseline = None
+        for batch_size in args.batch_sizes:
+            fps, counts, ids = run(config, model, video, batch_size, args.latency_ms)
+            if baseline is None:
+                baseline = (counts, ids)
+            parity = "counts+ids" if (counts, ids) == baseline else ("counts" if counts == baseline[0] else "MISMATCH")
+            print(f"{os.path.basename(video):<28} | {batch_size:>5} | {fps:>7.1f} | {counts[0]:>3}/{counts[1]:<3} | {parity}")
+
+if __name__ == "__main__":
+    main()
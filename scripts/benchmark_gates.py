@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gates import Gate, GateCrossingDetector
+
+WIDTH, HEIGHT = 1920, 1080
+
+def make_gates(n, rng):
+    """n short angled gates scattered over the frame."""
+    gates = []
+    for i in range(n):
+        x, y = rng.uniform(100, WIDTH - 300), rng.uniform(100, HEIGHT - 300)
+        gates.append(Gate(f"g{i}", [[x, y], [x + 120, y + 60], [x + 200, y + 180]]))
+    return gates
+
+def time_updates(detector, ids, tracks, frames):
+    start = time.perf_counter()
+    for f in range(frames):
+        detector.update_points(ids, tracks[f])
+    return (time.perf_counter() - start) / frames * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Gate crossing cost: grid-indexed vs. every track against every gate")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--tracks", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--gates", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'tracks':>6} | {'gates':>5} | {'grid ms/frame':>13} | {'brute ms/frame':>14} | {'counts match':>12}")
+    for n_tracks in args.tracks:
+        # Random walks so most tracks are away from any gate on a given frame
+        start = rng.uniform([0, 0], [WIDTH, HEIGHT], size=(n_tracks, 2))
+        steps = rng.normal(0, 6, size=(args.frames, n_tracks, 2))
+        tracks = start + np.cumsum(steps, axis=0)
+        ids = np.arange(n_tracks)
+        for n_gates in args.gates:
+            gates = make_gates(n_gates, rng)
+            grid = GateCrossingDetector(gates, WIDTH, HEIGHT, cooldown_frames=0, line_margin=4, grid_cell=64)
+            # One cell covering the whole frame: every moving track is tested against every segment
+            brute = GateCrossingDetector(gates, WIDTH, HEIGHT, cooldown_frames=0, line_margin=4, grid_cell=4 * WIDTH)
+            grid_ms = time_updates(grid, ids, tracks, args.frames)
+            brute_ms = time_updates(brute, ids, tracks, args.frames)
+            grid.reset()
+            brute.reset()
+            same = all(grid.update_points(ids, t) == brute.update_points(ids, t) for t in tracks)
+            print(f"{n_tracks:>6} | {n_gates:>5} | {grid_ms:>13.3f} | {brute_ms:>14.3f} | {str(same):>12}")
+
+if __name__ == "__main__":
+    main()
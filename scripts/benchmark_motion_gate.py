@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, CountSink
+from src.utils import load_config
+
+def run(config, model, video):
+    counter = BagCounter(config, model=model)
+    pipeline = FramePipeline(counter, [CountSink()])
+    frames = 0
+    start = time.perf_counter()
+    for _ in pipeline.run(video):
+        frames += 1
+    fps = frames / (time.perf_counter() - start)
+    return fps, (counter.count_in, counter.count_out), pipeline.stats().get("motion")
+
+def main():
+    parser = argparse.ArgumentParser(description="Skipped-frame share, FPS and count delta of motion-gated inference")
+    parser.add_argument("--video", type=str, required=True)
+    parser.add_argument("--config", type=str, default="config/default_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the model from the config")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    model = args.model or config.get('model', 'yolov8n.pt')
+
+    run(config, model, args.video)  # warm-up: first inference pays for lazy setup
+    full_fps, full_counts, _ = run({**config, 'motion_gating': False}, model, args.video)
+    gated_fps, gated_counts, motion = run({**config, 'motion_gating': True}, model, args.video)
+
+    print(f"{'mode':<8} | {'fps':>7} | {'IN':>4} | {'OUT':>4} | {'skipped':>8}")
+    print("-" * 44)
+    print(f"{'full':<8} | {full_fps:>7.1f} | {full_counts[0]:>4} | {full_counts[1]:>4} | {'0.0%':>8}")
+    print(f"{'gated':<8} | {gated_fps:>7.1f} | {gated_counts[0]:>4} | {gated_counts[1]:>4} | {motion['skip_ratio']:>8.1%}")
+    print(f"Count delta (gated - full): IN {gated_counts[0] - full_counts[0]:+d}, OUT {gated_counts[1] - full_counts[1]:+d}")
+
+if __name__ == "__main__":
+    main()
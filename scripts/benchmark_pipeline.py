@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, ThreadedFramePipeline, CountSink, EventLogSink, MJPEGSink, VideoWriterSink
+
+class _Attr:
+    def __init__(self, val):
+        self.val = val
+    def cpu(self):
+        return self
+    def numpy(self):
+        return self.val
+
+class _Boxes:
+    def __init__(self, xyxy, ids, cls, conf):
+        self.xyxy, self.id, self.cls, self.conf = _Attr(xyxy), _Attr(ids), _Attr(cls), _Attr(conf)
+
+class _Results:
+    def __init__(self, xyxy, ids, cls, conf):
+        self.boxes = _Boxes(xyxy, ids, cls, conf)
+
+class StubModel:
+    """Returns the same `n` worker/sack pairs for every frame so only host-side work is timed."""
+
+    def __init__(self, n=20, width=640, height=480, seed=0):
+        rng = np.random.default_rng(seed)
+        xy = rng.uniform(0, [width - 60, height - 60], size=(n, 2))
+        people = np.hstack([xy, xy + 60])
+        bags = people + 5
+        self.result = _Results(
+            np.vstack([people, bags]).astype(np.float32),
+            np.arange(2 * n, dtype=float),
+            np.concatenate([np.zeros(n), np.full(n, 24.0)]),
+            np.full(2 * n, 0.9, dtype=np.float32)
+        )
+
+    def track(self, frame, **kwargs):
+        return [self.result]
+
+def run(counter, sinks_factory, video, loops, pipeline_cls=FramePipeline):
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(loops):
+        counter.reset()
+        pipeline = pipeline_cls(counter, sinks_factory())
+        for _ in pipeline.run(video):
+            frames += 1
+    return frames / (time.perf_counter() - start), pipeline.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Frames per second and per-stage cost of the pipeline for each sink setup")
+    parser.add_argument("--video", type=str, default="data/samples/test_mp4v_mp4.mp4")
+    parser.add_argument("--config", type=str, help="Scenario config (defaults to scenario 3 class layout)")
+    parser.add_argument("--model", type=str, help="Real YOLO weights; omit to time host-side overhead with a stub model")
+    parser.add_argument("--loops", type=int, default=20, help="Times to replay the clip")
+    parser.add_argument("--output-dir", type=str, default="outputs/benchmark")
+    args = parser.parse_args()
+
+    if args.config:
+        from src.utils import load_config
+        config = load_config(args.config)
+    else:
+        config = {'track_classes': [0, 24], 'person_classes': [0], 'bag_classes': [24], 'line_orientation': 'vertical'}
+    model = args.model if args.model else StubModel()
+    counter = BagCounter(config, model=model)
+
+    setups = {
+        "count-only": lambda: [CountSink()],
+        "event log": lambda: [CountSink(), EventLogSink()],
+        "mjpeg": lambda: [MJPEGSink()],
+        "video writer": lambda: [VideoWriterSink(args.video, os.path.join(args.output_dir, "bench.mp4"))],
+    }
+    print(f"{'sinks':<14} | {'pipeline':<10} | {'fps':>8} | {'decode ms':>9} | {'infer ms':>9} | {'render ms':>9}")
+    print("-" * 72)
+    for name, factory in setups.items():
+        for mode, pipeline_cls in (("sequential", FramePipeline), ("threaded", ThreadedFramePipeline)):
+            fps, stats = run(counter, factory, args.video, args.loops, pipeline_cls)
+            ms = [stats["stages"][stage]["ms_per_frame"] for stage in ("decode", "infer", "render")]
+            print(f"{name:<14} | {mode:<10} | {fps:>8.1f} | {ms[0]:>9.3f} | {ms[1]:>9.3f} | {ms[2]:>9.3f}")
+            if "queues" in stats:
+                depths = ", ".join(f"{q}={v['mean_depth']}/{v['capacity']}" for q, v in stats["queues"].items())
+                print(f"{'':<14} | {'':<10} | mean queue depth: {depths}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, CountSink
+from src.utils import load_config
+
+def run(config, video, model=None):
+    counter = BagCounter({**config, 'track_cache_dir': None, 'show_preview': False}, model=model)
+    pipeline = FramePipeline(counter, [CountSink()])
+    frames = 0
+    start = time.perf_counter()
+    for _ in pipeline.run(video):
+        frames += 1
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, (counter.count_in, counter.count_out), pipeline.stats().get("resolution")
+
+def main():
+    parser = argparse.ArgumentParser(description="FPS vs. count accuracy at each inference resolution tier, "
+                                                 "and with the dynamic resolution controller")
+    parser.add_argument("--video", type=str, default="data/samples/test_mp4v_mp4.mp4")
+    parser.add_argument("--config", type=str, default="config/default_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the model from the config")
+    parser.add_argument("--tiers", type=str, help="Comma list of sizes (default: imgsz_tiers from the config)")
+    parser.add_argument("--gt-in", type=int, help="True IN count (default: the largest tier's count)")
+    parser.add_argument("--gt-out", type=int, help="True OUT count (default: the largest tier's count)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.model:
+        config['model'] = args.model
+    tiers = [int(t) for t in args.tiers.split(",")] if args.tiers else config.get('imgsz_tiers', [320, 480, 640, 960])
+    config['imgsz_tiers'] = tiers
+
+    # One model for every run, warmed up at each size, so no row pays for loading it
+    model = None
+    if config.get('inference_backend', 'torch') == 'torch':
+        from ultralytics import YOLO
+        model = YOLO(config['model'])
+    for imgsz in tiers:
+        run({**config, 'imgsz': imgsz, 'dynamic_imgsz': False}, args.video, model)
+
+    rows = []
+    for imgsz in sorted(tiers, reverse=True):
+        fps, counts, _ = run({**config, 'imgsz': imgsz, 'dynamic_imgsz': False}, args.video, model)
+        rows.append((str(imgsz), fps, counts, None))
+    fps, counts, resolution = run({**config, 'dynamic_imgsz': True}, args.video, model)
+    rows.append(("dynamic", fps, counts, resolution))
+
+    truth = (args.gt_in, args.gt_out) if args.gt_in is not None or args.gt_out is not None else rows[0][2]
+    print(f"{'imgsz':<8} | {'fps':>7} | {'IN/OUT':>7} | {'count err':>9} | frames per tier")
+    print("-" * 70)
+    for name, fps, (cin, cout), resolution in rows:
+        error = abs(cin - (truth[0] or 0)) + abs(cout - (truth[1] or 0))
+        spread = ""
+        if resolution:
+            spread = ", ".join(f"{t}:{n}" for t, n in resolution["frames_at"].items() if n)
+            spread += f" ({len(resolution['decisions'])} switches)"
+        print(f"{name:<8} | {fps:>7.2f} | {cin:>3}/{cout:<3} | {error:>9} | {spread}")
+    reference = "ground truth" if truth is not rows[0][2] else f"imgsz {rows[0][0]}"
+    print(f"\nCount error is against {reference}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, CountSink
+from src.utils import load_config
+
+FULL_FRAME = {'roi_x_min': 0.0, 'roi_x_max': 1.0, 'roi_y_min': 0.0, 'roi_y_max': 1.0, 'roi_polygon': None}
+
+def run(config, model, video):
+    counter = BagCounter(config, model=model)
+    pipeline = FramePipeline(counter, [CountSink()])
+    frames = 0
+    pixels = 0
+    start = time.perf_counter()
+    for result in pipeline.run(video):
+        frames += 1
+        crop = counter.roi.crop(result.frame) if counter.roi else result.frame
+        pixels += crop.shape[0] * crop.shape[1]
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, pixels / max(frames, 1), (counter.count_in, counter.count_out)
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference pixels, FPS and counts with and without the ROI crop")
+    parser.add_argument("--video", type=str, default="data/samples/test_mp4v_mp4.mp4")
+    parser.add_argument("--config", type=str, default="config/scenario2_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the model from the config")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    model = args.model or config.get('model', 'yolov8n.pt')
+
+    run(config, model, args.video)  # warm-up: first inference pays for lazy setup
+    full_fps, full_px, full_counts = run({**config, **FULL_FRAME}, model, args.video)
+    roi_fps, roi_px, roi_counts = run(config, model, args.video)
+
+    print(f"{'mode':<10} | {'pixels/frame':>12} | {'fps':>7} | {'IN/OUT':>7}")
+    print("-" * 46)
+    print(f"{'full':<10} | {full_px:>12.0f} | {full_fps:>7.1f} | {full_counts[0]:>3}/{full_counts[1]:<3}")
+    print(f"{'roi':<10} | {roi_px:>12.0f} | {roi_fps:>7.1f} | {roi_counts[0]:>3}/{roi_counts[1]:<3}")
+    print(f"Inference pixels: {roi_px / full_px:.1%} of the full frame")
+
+if __name__ == "__main__":
+    main()
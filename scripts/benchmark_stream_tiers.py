@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.encoding import StreamTier, TierEncoder
+
+DEFAULT_TIERS = [
+    StreamTier(width=0, quality=95),               # previous behaviour: source size, OpenCV default quality
+    StreamTier(width=1280, quality=80, max_fps=25),
+    StreamTier(width=960, quality=70, max_fps=15),
+    StreamTier(width=640, quality=60, max_fps=10),
+    StreamTier(width=320, quality=50, max_fps=5)
+]
+
+def synthetic_frames(n, width, height, seed=0):
+    """Warehouse-like frames: textured floor, moving boxes, HUD text and sensor noise."""
+    rng = np.random.default_rng(seed)
+    base = np.zeros((height, width, 3), dtype=np.uint8)
+    base[:] = np.linspace(60, 140, width, dtype=np.uint8)[None, :, None]
+    base = cv2.add(base, rng.integers(0, 25, (height, width, 3), dtype=np.uint8))
+    frames = []
+    for i in range(n):
+        frame = base.copy()
+        for k in range(6):
+            x = int((i * 7 + k * width / 6) % (width - 120))
+            y = int(height * (0.3 + 0.1 * k % 0.6))
+            cv2.rectangle(frame, (x, y), (x + 110, y + 150), (30 + 30 * k, 120, 200), -1)
+        cv2.putText(frame, f"IN: {i // 10}  OUT: {i // 25}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        frames.append(cv2.add(frame, rng.integers(0, 8, (height, width, 3), dtype=np.uint8)))
+    return frames
+
+def video_frames(path, n):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description="MJPEG stream tiers: encode cost and bandwidth per tier")
+    parser.add_argument("--video", type=str, help="Use frames from this video instead of synthetic 1080p frames")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--source-fps", type=float, default=25.0, help="Frame rate the pipeline produces")
+    args = parser.parse_args()
+
+    frames = video_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames, 1920, 1080)
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {w}x{h}, pipeline at {args.source_fps:.0f} fps")
+    print(f"{'tier':<22} | {'encode ms':>9} | {'KiB/frame':>9} | {'sent fps':>8} | {'KiB/s':>8} | {'encode CPU %':>12}")
+    for tier in DEFAULT_TIERS:
+        encoder = TierEncoder(tier)
+        start = time.perf_counter()
+        for frame in frames:
+            encoder.encode(frame)
+        stats = encoder.stats()
+        sent_fps = min(tier.max_fps, args.source_fps) if tier.max_fps else args.source_fps
+        per_frame_ms = (time.perf_counter() - start) * 1000 / len(frames)
+        print(f"{tier.name:<22} | {stats['encode_ms']:>9.2f} | {stats['bytes_per_frame'] / 1024:>9.1f} | "
+              f"{sent_fps:>8.1f} | {stats['bytes_per_frame'] * sent_fps / 1024:>8.0f} | "
+              f"{per_frame_ms * sent_fps / 10:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+import itertools
+import tempfile
+import cv2
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmark_pipeline import StubModel  # fixed worker/sack pairs every frame: times host-side work only
+from src.benchmarking import Benchmark, compare, load_results, run_suite, save_results
+from src.counter import BagCounter
+from src.encoding import StreamTier, TierEncoder
+from src.line_crossing import Direction, LineCrossingDetector, Orientation
+from src.pipeline import CountSink, EventLogSink, FramePipeline, MJPEGSink, VideoWriterSink
+from src.utils import get_video_properties, load_config, setup_logging
+from src.visualizer import Visualizer
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+STUB_CONFIG = {'track_classes': [0, 24], 'person_classes': [0], 'bag_classes': [24], 'line_orientation': 'vertical'}
+
+def e2e_cases(videos, config, model_path):
+    """Full BagCounter.process_video per clip with the real model, loaded and warmed up once."""
+    from ultralytics import YOLO
+    model = YOLO(model_path)
+    cases = []
+    for video in videos:
+        def setup(video=video):
+            counter = BagCounter({**config, 'model': model_path, 'track_cache_dir': None, 'show_preview': False,
+                                  'profiling': False}, model=model)
+            return lambda: (counter.reset(), counter.process_video(video))
+        name = os.path.splitext(os.path.basename(video))[0]
+        cases.append(Benchmark(f"e2e.process_video[{name}]", setup, unit="frame",
+                               items=max(get_video_properties(video)['total_frames'], 1),
+                               params={"video": video, "model": model_path}))
+    return cases
+
+def host_cases(video, output_dir):
+    """The pipeline with a stub model per sink setup: everything but inference."""
+    setups = {
+        "count-only": lambda: [CountSink()],
+        "event-log": lambda: [CountSink(), EventLogSink()],
+        "mjpeg": lambda: [MJPEGSink()],
+        "video-writer": lambda: [VideoWriterSink(video, os.path.join(output_dir, "bench.mp4"))],
+    }
+    cases = []
+    for name, sinks in setups.items():
+        def setup(sinks=sinks):
+            counter = BagCounter(STUB_CONFIG, model=StubModel())
+            def run():
+                counter.reset()
+                for _ in FramePipeline(counter, sinks()).run(video):
+                    pass
+            return run
+        cases.append(Benchmark(f"host.pipeline[{name}]", setup, unit="frame",
+                               items=max(get_video_properties(video)['total_frames'], 1),
+                               params={"video": video, "sinks": name, "tracks": 40}))
+    return cases
+
+def random_walks(n, frames=200):
+    """Ids and per-frame (n, 2) positions of n tracks random-walking around y = 240 in a 640x480 frame."""
+    rng = np.random.default_rng(0)
+    ys = rng.uniform(0, 480, n) + np.cumsum(rng.normal(0, 4, (frames, n)), axis=0)
+    xs = rng.uniform(0, 640, n)
+    return np.arange(n), [np.column_stack([xs, y]) for y in ys]
+
+def crossing_cases(counts):
+    """LineCrossingDetector on n random-walking tracks, one frame per call, through both update APIs."""
+    cases = []
+    for n in counts:
+        def setup_points(n=n):
+            ids, frames = random_walks(n)
+            det, cycle = LineCrossingDetector(240, Direction.BOTH, Orientation.HORIZONTAL), itertools.cycle(frames)
+            return lambda: det.update_points(ids, next(cycle))
+
+        def setup_update(n=n):
+            ids, frames = random_walks(n)
+            det = LineCrossingDetector(240, Direction.BOTH, Orientation.HORIZONTAL)
+            cycle = itertools.cycle([list(zip(ids.tolist(), f[:, 1].tolist())) for f in frames])
+            return lambda: det.update(next(cycle))
+
+        cases.append(Benchmark(f"crossing.update_points[n={n}]", setup_points, unit="frame", params={"tracks": n}))
+        cases.append(Benchmark(f"crossing.update[n={n}]", setup_update, unit="frame", params={"tracks": n}))
+    return cases
+
+def association_cases(counts):
+    """BagCounter._associate_bags_to_people with n people and n bags scattered over a 1080p frame."""
+    cases = []
+    for n in counts:
+        def setup(n=n):
+            counter = BagCounter(STUB_CONFIG, model=StubModel())
+            rng = np.random.default_rng(0)
+            xy = rng.uniform(0, [1860, 1020], size=(2 * n, 2))
+            boxes = np.hstack([xy, xy + 60]).tolist()
+            people = [{'box': b, 'id': i} for i, b in enumerate(boxes[:n])]
+            bags = [{'box': b, 'id': n + i} for i, b in enumerate(boxes[n:])]
+            return lambda: counter._associate_bags_to_people(people, bags)
+        cases.append(Benchmark(f"association[n={n}]", setup, unit="frame", params={"people": n, "bags": n}))
+    return cases
+
+def render_cases(resolutions, video=None):
+    """
+    Drawing detections and the HUD, and JPEG-encoding the result, per output resolution. Frames are a sample
+    clip's first frame scaled up (noise would make JPEG encoding far slower than on real footage).
+    """
+    source = None
+    if video:
+        cap = cv2.VideoCapture(video)
+        ok, source = cap.read()
+        cap.release()
+        source = source if ok else None
+    if source is None:
+        y, x = np.mgrid[0:480, 0:640]
+        source = np.dstack([x * 255 // 640, y * 255 // 480, (x + y) * 255 // 1120]).astype(np.uint8)
+
+    cases = []
+    for name in resolutions:
+        width, height = RESOLUTIONS[name]
+        image = cv2.resize(source, (width, height), interpolation=cv2.INTER_LINEAR)
+
+        def setup_draw(width=width, height=height, image=image):
+            vis, canvas = Visualizer(height // 2, Orientation.HORIZONTAL, width, height), image.copy()
+            rng = np.random.default_rng(1)
+            xy = rng.uniform(0, [width - 120, height - 120], size=(20, 2))
+            detections = [{'box': [x, y, x + 100, y + 100], 'id': i, 'color': (0, 255, 0), 'label': 'Sack'}
+                          for i, (x, y) in enumerate(xy)]
+            calls = itertools.count()
+            def draw():
+                i = next(calls)
+                vis.draw_detections(canvas, detections)
+                vis.draw_hud(canvas, i // 25, i // 75, i)
+            return draw
+
+        def setup_jpeg(image=image):
+            encoder = TierEncoder(StreamTier(quality=80))
+            return lambda: encoder.encode(image)
+
+        cases.append(Benchmark(f"render.draw[{name}]", setup_draw, unit="frame",
+                               params={"resolution": name, "detections": 20}))
+        cases.append(Benchmark(f"render.jpeg[{name}]", setup_jpeg, unit="frame",
+                               params={"resolution": name, "quality": 80}))
+    return cases
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite: end-to-end runs on the sample clips, host-side "
+                                                 "pipeline overhead, line crossing, association and rendering. "
+                                                 "Results are saved as JSON and can be compared against a baseline")
+    parser.add_argument("--videos", type=str, nargs="+", default=["data/samples"],
+                        help="Clips (or directories of them) for the end-to-end cases")
+    parser.add_argument("--config", type=str, default="config/default_config.yaml")
+    parser.add_argument("--model", type=str, help="Weights for the end-to-end cases (default: the config's)")
+    parser.add_argument("--filter", type=str, help="Only run cases whose name matches this regex")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--tracks", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--pairs", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--resolutions", type=str, default=",".join(RESOLUTIONS))
+    parser.add_argument("--output", type=str, help="Results JSON (default: outputs/benchmarks/<timestamp>.json)")
+    parser.add_argument("--baseline", type=str, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Fail when a case is this many times slower than the baseline")
+    parser.add_argument("--stat", type=str, default="min_s", choices=["min_s", "median_s", "mean_s"],
+                        help="Statistic compared against the baseline (min is the least affected by other load)")
+    args = parser.parse_args()
+
+    setup_logging(logging.WARNING)
+    config = load_config(args.config)
+    model_path = args.model or config.get('model', 'yolov8n.pt')
+    videos = []
+    for path in args.videos:
+        if os.path.isdir(path):
+            videos.extend(sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(VIDEO_EXTENSIONS)))
+        else:
+            videos.append(path)
+
+    output_dir = tempfile.mkdtemp(prefix="bagcounter-bench-")
+    selected = re.compile(args.filter) if args.filter else None
+    cases = []
+    if videos and (selected is None or selected.search("e2e.process_video")):
+        if os.path.exists(model_path):
+            cases += e2e_cases(videos, config, model_path)
+        else:
+            print(f"Skipping end-to-end cases: model {model_path} not found (use --model)")
+    if videos:
+        cases += host_cases(videos[0], output_dir)
+    cases += crossing_cases(args.tracks)
+    cases += association_cases(args.pairs)
+    cases += render_cases(args.resolutions.split(","), videos[0] if videos else None)
+    if selected is not None:
+        cases = [c for c in cases if selected.search(c.name)]
+
+    if args.list:
+        for case in cases:
+            print(case.name)
+        return
+
+    width = max(len(c.name) for c in cases)
+    print(f"{'case':<{width}} | {'median':>10} | {'min':>10} | {'per second':>10}")
+    print("-" * (width + 40))
+
+    def progress(name, r):
+        print(f"{name:<{width}} | {r['median_s'] * 1000:>7.3f} ms | {r['min_s'] * 1000:>7.3f} ms | "
+              f"{r['per_second']:>10.1f}", flush=True)
+
+    report = run_suite(cases, repeat=args.repeat, min_time=args.min_time, progress=progress)
+    report["settings"] = {"repeat": args.repeat, "min_time": args.min_time}
+    output = args.output or os.path.join("outputs", "benchmarks", f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    save_results(report, output)
+    print(f"\nResults: {output}")
+
+    if not args.baseline:
+        return
+    rows = compare(load_results(args.baseline), report, args.threshold, args.stat)
+    print(f"\nAgainst {args.baseline} ({args.stat}, threshold {args.threshold}x):")
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        print(f"{row['name']:<{width}} | {ratio:>7} | {row['status']}")
+    slower = [row["name"] for row in rows if row["status"] == "slower"]
+    if slower:
+        print(f"\n{len(slower)} case(s) slower than {args.threshold}x the baseline: {', '.join(slower)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.counter import BagCounter
+from src.pipeline import FramePipeline, CountSink
+from src.utils import load_config
+
+def run(config):
+    counter = BagCounter(config)
+    pipeline = FramePipeline(counter, [CountSink()])
+    frames = 0
+    start = time.perf_counter()
+    for _ in pipeline.run(config['video']):
+        frames += 1
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, (counter.count_in, counter.count_out), counter.tracker.loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="FPS of a recording (inference) pass vs. replays from the track cache")
+    parser.add_argument("--video", type=str, default="data/samples/test_mp4v_mp4.mp4")
+    parser.add_argument("--config", type=str, default="config/default_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the model from the config")
+    parser.add_argument("--lines", type=str, default="0.3,0.5,0.7", help="Line positions to replay")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.model:
+        config['model'] = args.model
+    cache_dir = tempfile.mkdtemp(prefix="track_cache_")
+    config.update(video=args.video, track_cache_dir=cache_dir)
+
+    try:
+        print(f"{'pass':<16} | {'fps':>9} | {'IN/OUT':>7} | model loaded")
+        print("-" * 52)
+        fps, counts, loaded = run(config)
+        print(f"{'record':<16} | {fps:>9.1f} | {counts[0]:>3}/{counts[1]:<3} | {loaded}")
+        for line in (float(v) for v in args.lines.split(",")):
+            fps, counts, loaded = run({**config, 'line_position': line})
+            print(f"{f'replay line={line}':<16} | {fps:>9.1f} | {counts[0]:>3}/{counts[1]:<3} | {loaded}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import importlib.util
+import cv2
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.benchmarking import Benchmark, run_suite, save_results
+from src.video_io import Decoder, VideoIOOptions, Writer, open_video, open_writer
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+RESOLUTIONS = {"480p": (640, 480), "720p": (1280, 720), "1080p": (1920, 1080)}
+
+def decoders():
+    """
+    Decoder setups: OpenCV's default, its FFmpeg backend single- and multi-threaded and with hardware decoding,
+    and PyAV when installed.
+    """
+    setups = {
+        "opencv": VideoIOOptions(),
+        "ffmpeg-1t": VideoIOOptions(decoder=Decoder.FFMPEG, decode_threads=1),
+        "ffmpeg-auto": VideoIOOptions(decoder=Decoder.FFMPEG),
+        "ffmpeg-hw": VideoIOOptions(decoder=Decoder.FFMPEG, hw_decode=True),
+    }
+    if importlib.util.find_spec("av"):
+        setups["pyav"] = VideoIOOptions(decoder=Decoder.PYAV)
+    return setups
+
+def writers():
+    """Writer setups to try; fourccs the OpenCV build cannot encode and missing ffmpeg/PyAV are skipped later."""
+    setups = {f"opencv-{fourcc}": VideoIOOptions(fourcc=fourcc) for fourcc in ("mp4v", "XVID", "MJPG", "avc1")}
+    setups["jpeg-q90"] = VideoIOOptions(writer=Writer.JPEG, jpeg_quality=90)
+    if shutil.which("ffmpeg"):
+        for preset in ("ultrafast", "veryfast", "medium"):
+            setups[f"ffmpeg-x264-{preset}"] = VideoIOOptions(writer=Writer.FFMPEG, preset=preset)
+    if importlib.util.find_spec("av"):
+        setups["pyav-x264-veryfast"] = VideoIOOptions(writer=Writer.PYAV, preset="veryfast")
+    return setups
+
+def count_frames(path, options):
+    reader, frames = open_video(path, options), 0
+    while reader.read()[0]:
+        frames += 1
+    reader.release()
+    return frames
+
+def decode_cases(videos, seeks):
+    """Opening and reading each clip to the end, and seek + read at random positions, per decoder."""
+    cases = []
+    for video in videos:
+        clip = os.path.splitext(os.path.basename(video))[0]
+        for name, options in decoders().items():
+            try:
+                frames = count_frames(video, options)
+            except (ImportError, ValueError) as e:
+                print(f"Skipping {name} on {clip}: {e}")
+                continue
+
+            def setup_decode(video=video, options=options):
+                return lambda: count_frames(video, options)
+
+            def setup_seek(video=video, options=options, frames=frames):
+                reader = open_video(video, options)
+                targets = iter(np.random.default_rng(0).integers(0, frames, size=1 << 20).tolist())
+                return lambda: (reader.seek(next(targets)), reader.read())
+
+            params = {"video": video, "decoder": name, "frames": frames}
+            cases.append(Benchmark(f"decode[{clip}/{name}]", setup_decode, unit="frame", items=frames, params=params))
+            if seeks:
+                cases.append(Benchmark(f"seek[{clip}/{name}]", setup_seek, unit="seek", params=params))
+    return cases
+
+def encode_cases(frames, fps, output_dir):
+    """Writing the same frames with each writer; the output size per frame is recorded with each case."""
+    height, width = frames[0].shape[:2]
+    cases = []
+    for name, options in writers().items():
+        path = os.path.join(output_dir, f"{name}.{'avi' if options.fourcc in ('XVID', 'MJPG') else 'mp4'}")
+
+        def encode(path=path, options=options):
+            writer = open_writer(path, fps, width, height, options)
+            for frame in frames:
+                writer.write(frame)
+            writer.release()
+
+        try:
+            encode()
+        except (ImportError, FileNotFoundError, ValueError, RuntimeError) as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        if options.writer == Writer.JPEG:
+            directory = os.path.splitext(path)[0]
+            size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        else:
+            size = os.path.getsize(path)
+        cases.append(Benchmark(f"encode[{name}]", lambda encode=encode: encode, unit="frame", items=len(frames),
+                               params={"writer": name, "width": width, "height": height,
+                                       "bytes_per_frame": size // len(frames)}))
+    return cases
+
+def encode_frames(videos, resolution, count):
+    """The clips' frames, scaled to the benchmark resolution and cycled up to `count` frames."""
+    width, height = RESOLUTIONS[resolution]
+    source = []
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            source.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR))
+        cap.release()
+    return [source[i % len(source)] for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Video I/O backends: decode and seek per decoder across the "
+                                                 "sample codecs, and encode speed and size per writer")
+    parser.add_argument("--videos", type=str, nargs="+", default=["data/samples"],
+                        help="Clips (or directories of them)")
+    parser.add_argument("--resolution", type=str, default="720p", choices=list(RESOLUTIONS),
+                        help="Frame size for the encode cases")
+    parser.add_argument("--frames", type=int, default=60, help="Frames per encode run")
+    parser.add_argument("--no-seek", action="store_true", help="Skip the seek cases")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--output", type=str,
+                        help="Results JSON (default: outputs/benchmarks/video_io_<timestamp>.json)")
+    args = parser.parse_args()
+
+    videos = []
+    for path in args.videos:
+        if os.path.isdir(path):
+            videos.extend(sorted(os.path.join(path, f) for f in os.listdir(path)
+                                 if f.lower().endswith(VIDEO_EXTENSIONS)))
+        else:
+            videos.append(path)
+    if not videos:
+        parser.error("no videos found")
+
+    output_dir = tempfile.mkdtemp(prefix="bagcounter-video-io-")
+    try:
+        frames = encode_frames(videos, args.resolution, args.frames)
+        cases = decode_cases(videos, not args.no_seek) + encode_cases(frames, 25.0, output_dir)
+        width = max(len(c.name) for c in cases)
+        print(f"{'case':<{width}} | {'per unit':>10} | {'per second':>10} | {'KB/frame':>8}")
+        print("-" * (width + 40))
+
+        def progress(name, r):
+            size = r["params"].get("bytes_per_frame")
+            size = f"{size / 1024:>8.1f}" if size is not None else f"{'':>8}"
+            print(f"{name:<{width}} | {r['median_s'] * 1000:>7.3f} ms | {r['per_second']:>10.1f} | {size}", flush=True)
+
+        report = run_suite(cases, repeat=args.repeat, min_time=args.min_time, progress=progress)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    report["settings"] = {"resolution": args.resolution, "frames": args.frames, "repeat": args.repeat,
+                          "min_time": args.min_time}
+    output = args.output or os.path.join("outputs", "benchmarks", f"video_io_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    save_results(report, output)
+    print(f"\nResults: {output}")
+
+if __name__ == "__main__":
+    main()
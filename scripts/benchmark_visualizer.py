@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gates import Gate
+from src.line_crossing import Orientation
+from src.visualizer import FONT, Visualizer
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+
+def full_frame_hud(frame, vis, count_in, count_out, frame_idx, gate_counts=None):
+    """The previous draw_hud: draw every layer each frame, then blend a shaded copy of the whole frame."""
+    if vis.gates:
+        for gate in vis.gates:
+            vis._draw_gate_shape(frame, gate, None)
+            counts = (gate_counts or {}).get(gate.name, {"in": 0, "out": 0})
+            x, y = int(round(gate.points[0][0])), int(round(gate.points[0][1])) - 10
+            cv2.putText(frame, f"{gate.name} IN {counts['in']} OUT {counts['out']}", (max(0, x), max(20, y)),
+                        FONT, 0.6, (0, 255, 255), 2)
+    elif vis.orientation == Orientation.HORIZONTAL:
+        cv2.line(frame, (0, vis.line_coord), (vis.width, vis.line_coord), (0, 0, 255), 3)
+    else:
+        cv2.line(frame, (vis.line_coord, 0), (vis.line_coord, vis.height), (0, 0, 255), 3)
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (10, 10), (250, 140), (0, 0, 0), -1)
+    cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+    cv2.putText(frame, f"Frame: {frame_idx}", (20, 40), FONT, 0.8, (255, 255, 255), 2)
+    cv2.putText(frame, f"IN: {count_in}", (20, 75), FONT, 0.8, (0, 255, 0), 2)
+    cv2.putText(frame, f"OUT: {count_out}", (20, 105), FONT, 0.8, (0, 0, 255), 2)
+    cv2.putText(frame, f"TOTAL: {count_in + count_out}", (20, 135), FONT, 0.8, (0, 255, 255), 2)
+    return frame
+
+def make_gates(width, height):
+    return [Gate("dock", [[width * 0.1, height * 0.3], [width * 0.45, height * 0.35]]),
+            Gate("conveyor", [[width * 0.55, height * 0.8], [width * 0.7, height * 0.6], [width * 0.9, height * 0.55]])]
+
+def time_draw(draw, frames, n):
+    """ms per frame; counts change every 25 frames, as they would with a bag every second at 25 fps."""
+    start = time.perf_counter()
+    for i in range(n):
+        count = i // 25
+        draw(frames[i % len(frames)], count, count // 3, i,
+             {"dock": {"in": count, "out": 0}, "conveyor": {"in": count // 2, "out": 1}})
+    return (time.perf_counter() - start) / n * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="HUD draw cost per frame: cached region-limited compositing vs. "
+                                                 "the full-frame copy and blend")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--resolutions", type=str, default=",".join(RESOLUTIONS))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'resolution':<10} | {'layout':<6} | {'full-frame ms':>13} | {'cached ms':>9} | {'speedup':>7} | "
+          f"{'max px diff':>11}")
+    print("-" * 72)
+    for name in args.resolutions.split(","):
+        width, height = RESOLUTIONS[name]
+        source = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+        for layout in ("line", "gates"):
+            gates = make_gates(width, height) if layout == "gates" else None
+            vis = Visualizer(height // 2, Orientation.HORIZONTAL, width, height, gates=gates)
+            legacy_ms = time_draw(lambda frame, *a: full_frame_hud(frame, vis, *a),
+                                  [f.copy() for f in source], args.frames)
+            cached_ms = time_draw(vis.draw_hud, [f.copy() for f in source], args.frames)
+            counts = {"dock": {"in": 7, "out": 0}, "conveyor": {"in": 3, "out": 1}}
+            diff = np.abs(full_frame_hud(source[1].copy(), vis, 7, 2, 99, counts).astype(int)
+                          - vis.draw_hud(source[1].copy(), 7, 2, 99, counts).astype(int)).max()
+            print(f"{name:<10} | {layout:<6} | {legacy_ms:>13.3f} | {cached_ms:>9.3f} | "
+                  f"{legacy_ms / cached_ms:>6.1f}x | {diff:>11}")
+    print("\nPixel differences are rounding in blending antialiased text from the cache.")
+
+if __name__ == "__main__":
+    main()
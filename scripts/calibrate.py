@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import yaml
+import logging
+import argparse
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.calibration import GroundTruth, SWEEP_KEYS, best_config, calibrate, parse_values
+from src.utils import load_config, setup_logging
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweeps line/cooldown/association settings against a ground truth, "
+                                                 "replaying tracks recorded in one inference pass")
+    parser.add_argument("--video", type=str, required=True)
+    parser.add_argument("--config", type=str, default="config/default_config.yaml", help="Base config YAML")
+    parser.add_argument("--model", type=str, help="Override the model from the config")
+    parser.add_argument("--gt-in", type=int, help="True IN count")
+    parser.add_argument("--gt-out", type=int, help="True OUT count")
+    parser.add_argument("--gt-events", type=str, help="CSV of true crossings (frame_idx,direction)")
+    parser.add_argument("--tolerance", type=int, default=15, help="Frames a predicted crossing may be off by")
+    parser.add_argument("--lines", type=str, default="0.3:0.7:0.05", help="line_position values or start:stop:step")
+    parser.add_argument("--margins", type=str, default="0,2,5,10", help="line_margin values (pixels)")
+    parser.add_argument("--cooldowns", type=str, default="10,25,40", help="cooldown_frames values")
+    parser.add_argument("--assoc", type=str, default="100,150,200", help="association_threshold values (pixels)")
+    parser.add_argument("--directions", type=str, help="count_direction values (default: the config's)")
+    parser.add_argument("--workers", type=int, help="Processes (default: one per core; 0 = in-process)")
+    parser.add_argument("--track-cache", type=str, default="outputs/track_cache")
+    parser.add_argument("--output", type=str, help="Best config YAML (default: outputs/calibrated_<video>.yaml)")
+    parser.add_argument("--report", type=str, help="JSON report (default: next to the best config)")
+    parser.add_argument("--top", type=int, default=10, help="Trials to print")
+    args = parser.parse_args()
+
+    if args.gt_events:
+        truth = GroundTruth.from_events_csv(args.gt_events)
+    elif args.gt_in is not None or args.gt_out is not None:
+        truth = GroundTruth(count_in=args.gt_in, count_out=args.gt_out)
+    else:
+        parser.error("give --gt-in/--gt-out or --gt-events")
+
+    setup_logging(logging.WARNING)
+    config = load_config(args.config)
+    if args.model:
+        config['model'] = args.model
+
+    axes = {
+        "line_position": parse_values(args.lines),
+        "line_margin": parse_values(args.margins, int),
+        "cooldown_frames": parse_values(args.cooldowns, int),
+        "association_threshold": parse_values(args.assoc),
+        "count_direction": parse_values(args.directions, str) if args.directions
+        else [config.get('count_direction', SWEEP_KEYS['count_direction'])]
+    }
+    report = calibrate(args.video, config, axes, truth, args.track_cache, workers=args.workers,
+                       tolerance=args.tolerance)
+
+    video_name = os.path.splitext(os.path.basename(args.video))[0]
+    output = args.output or os.path.join(config.get('output_dir', 'outputs'), f"calibrated_{video_name}.yaml")
+    report_path = args.report or os.path.splitext(output)[0] + "_report.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        f.write(f"# Calibrated on {args.video} ({report['sweep']['trials']} trials)\n")
+        yaml.safe_dump(best_config(load_config(args.config), report), f, sort_keys=False)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    record, sweep = report["record"], report["sweep"]
+    source = "replayed from cache" if record["replayed"] else f"{record['fps']} fps inference"
+    print(f"Tracks: {record['frames']} frames, {source}")
+    print(f"Sweep : {sweep['trials']} trials on {sweep['workers']} worker(s) in {sweep['seconds']:.1f}s "
+          f"({sweep['trials_per_s']:.1f} trials/s)")
+    print(f"\n{'line':>6} {'margin':>6} {'cool':>5} {'assoc':>6} {'direction':<14} | {'IN':>4} {'OUT':>4} "
+          f"{'err':>4} {'F1':>6} | {'ms/frame':>8}")
+    for trial in report["trials"][:args.top]:
+        p, m = trial["params"], trial["metrics"]
+        f1 = f"{m['f1']:.3f}" if "f1" in m else "-"
+        print(f"{p['line_position']:>6.2f} {p['line_margin']:>6} {p['cooldown_frames']:>5} "
+              f"{p['association_threshold']:>6.0f} {p['count_direction']:<14} | {m['in']:>4} {m['out']:>4} "
+              f"{m['count_error']:>4} {f1:>6} | {trial['ms_per_frame']:>8.3f}")
+    print(f"\nBest of {report['best']['ties']} equally scored trial(s) written to {output}")
+    print(f"Report: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import os
+import sys
+import argparse
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -6,11 +8,37 @@ from sklearn.metrics import accuracy_score, precision_score, f1_score, roc_auc_s
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CSV_PATH = os.path.join(BASE_DIR, "evaluation", "bag_events.csv")
+GT_PATH = os.path.join(BASE_DIR, "evaluation", "ground_truth.csv")
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(BASE_DIR)
+
+def generate_csv(log_args, gt_path):
+    """Rebuilds bag_events.csv from per-scenario crossing-event logs and the ground-truth labels."""
+    from src.events import bag_event_rows, load_ground_truth, write_bag_events
+
+    logs = {}
+    for arg in log_args:
+        scenario_id, _, path = arg.partition("=")
+        logs[scenario_id] = path
+    rows = bag_event_rows(logs, load_ground_truth(gt_path))
+    write_bag_events(rows, CSV_PATH)
+    print(f"Generated {CSV_PATH} from {len(logs)} event log(s) ({len(rows)} bags)")
 
 def main():
+    parser = argparse.ArgumentParser(description="Per-bag counting metrics")
+    parser.add_argument("--logs", nargs="+", metavar="SCENARIO_ID=PATH",
+                        help="Event logs written by BagCounter; regenerates bag_events.csv before scoring")
+    parser.add_argument("--ground-truth", type=str, default=GT_PATH,
+                        help="CSV with scenario_id,bag_id,gt_crossed labels")
+    args = parser.parse_args()
+
+    if args.logs:
+        generate_csv(args.logs, args.ground_truth)
+
     if not os.path.exists(CSV_PATH):
         print(f"[ERROR] Label file not found: {CSV_PATH}")
-        print("Create 'evaluation/bag_events.csv' with columns:")
+        print("Generate it from event logs with --logs SCENARIO_ID=PATH, or create it with columns:")
         print("scenario_id,bag_id,gt_crossed,pred_crossed,score")
         return
 
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def cpu_seconds(pid: int) -> float:
+    """User + system CPU time of a process, from /proc (Linux)."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+class Dashboard(threading.Thread):
+    """One simulated browser tab following the counts of a scenario."""
+
+    def __init__(self, url: str, scenario: str, mode: str, interval: float, stop: threading.Event):
+        super().__init__(daemon=True)
+        parsed = urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.scenario, self.mode, self.interval, self.stop = scenario, mode, interval, stop
+        self.requests = 0
+        self.messages = 0
+        self.errors = 0
+        self.sock = None
+
+    def run(self) -> None:
+        if self.mode == "poll":
+            self.poll()
+        else:
+            self.listen()
+
+    def poll(self) -> None:
+        """The old app.js: GET /api/counts every `interval` seconds."""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        while not self.stop.is_set():
+            start = time.time()
+            try:
+                conn.request("GET", f"/api/counts?scenario={self.scenario}")
+                conn.getresponse().read()
+                self.requests += 1
+                self.messages += 1
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=5)
+            self.stop.wait(max(0.0, self.interval - (time.time() - start)))
+        conn.close()
+
+    def listen(self) -> None:
+        """The new app.js: one long-lived EventSource on /api/events/<scenario>."""
+        while not self.stop.is_set():
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=5)
+            try:
+                conn.request("GET", f"/api/events/{self.scenario}", headers={"Accept": "text/event-stream"})
+                self.sock = conn.sock
+                resp = conn.getresponse()
+                self.requests += 1
+                self.sock.settimeout(None)  # idle streams only carry a keepalive every few seconds
+                for line in iter(resp.fp.readline, b""):
+                    if line.startswith(b"data:"):
+                        self.messages += 1
+            except (OSError, http.client.HTTPException):
+                if not self.stop.is_set():
+                    self.errors += 1
+                    self.stop.wait(1.0)
+            finally:
+                conn.close()
+
+    def close(self) -> None:
+        """Unblocks a listener waiting on its stream."""
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+def run_phase(url: str, scenario: str, mode: str, dashboards: int, duration: float, interval: float, pid: int):
+    stop = threading.Event()
+    clients = [Dashboard(url, scenario, mode, interval, stop) for _ in range(dashboards)]
+    cpu0, t0 = cpu_seconds(pid), time.time()
+    for c in clients:
+        c.start()
+    time.sleep(duration)
+    cpu1, t1 = cpu_seconds(pid), time.time()
+    stop.set()
+    for c in clients:
+        c.close()
+    for c in clients:
+        c.join(timeout=5)
+    wall = t1 - t0
+    return {
+        "mode": mode,
+        "requests_per_s": sum(c.requests for c in clients) / wall,
+        "messages_per_s": sum(c.messages for c in clients) / wall,
+        "server_cpu_pct": 100.0 * (cpu1 - cpu0) / wall,
+        "errors": sum(c.errors for c in clients)
+    }
+
+def drain(response) -> None:
+    while response.read(65536):
+        pass
+
+def wait_for_server(url: str, timeout: float = 120.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urlopen(f"{url}/api/scenarios", timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates many open dashboards: /api/counts polling vs. SSE push")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000")
+    parser.add_argument("--server-pid", type=int, help="PID of an already running server (for CPU measurement)")
+    parser.add_argument("--spawn", action="store_true", help="Start webapp/flask_server.py for the test")
+    parser.add_argument("--model", type=str, help="Model for a spawned server (sets BAGCOUNTER_MODEL)")
+    parser.add_argument("--scenario", type=str, default="1")
+    parser.add_argument("--dashboards", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per phase")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval of the old dashboard")
+    parser.add_argument("--mode", choices=["poll", "sse", "both"], default="both")
+    parser.add_argument("--with-video", action="store_true", help="Keep one /video_feed viewer open so counts change")
+    args = parser.parse_args()
+
+    server = None
+    pid = args.server_pid
+    if args.spawn:
+        env = dict(os.environ)
+        if args.model:
+            env["BAGCOUNTER_MODEL"] = args.model
+        server = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "webapp", "flask_server.py")], cwd=BASE_DIR,
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        pid = server.pid
+    if pid is None:
+        parser.error("give --server-pid for a running server, or --spawn")
+
+    try:
+        wait_for_server(args.url)
+        viewer = None
+        if args.with_video:
+            viewer = urlopen(f"{args.url}/video_feed/{args.scenario}", timeout=10)
+            threading.Thread(target=drain, args=(viewer,), daemon=True).start()
+
+        # Baseline: the server with nobody connected
+        idle0, t0 = cpu_seconds(pid), time.time()
+        time.sleep(min(5.0, args.duration))
+        idle_pct = 100.0 * (cpu_seconds(pid) - idle0) / (time.time() - t0)
+
+        modes = ["poll", "sse"] if args.mode == "both" else [args.mode]
+        results = [run_phase(args.url, args.scenario, m, args.dashboards, args.duration, args.interval, pid) for m in modes]
+
+        print(f"\n{args.dashboards} dashboards on scenario {args.scenario}, {args.duration:.0f}s per phase "
+              f"(idle server CPU {idle_pct:.1f}%)")
+        print(f"{'mode':<6} | {'requests/s':>10} | {'updates/s':>9} | {'server CPU %':>12} | {'errors':>6}")
+        for r in results:
+            print(f"{r['mode']:<6} | {r['requests_per_s']:>10.1f} | {r['messages_per_s']:>9.1f} | "
+                  f"{r['server_cpu_pct']:>12.1f} | {r['errors']:>6}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
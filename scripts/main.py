@@ -1,5 +1,7 @@
 import os
+import re
 import sys
+import json
 import logging
 import argparse
 
@@ -7,11 +9,13 @@ import argparse
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.counter import BagCounter
+from src.live import is_live_source
 from src.utils import setup_logging, load_config
 
 def main():
     parser = argparse.ArgumentParser(description="AI-BagCounter: Automatic sack counting using YOLOv8 + ByteTrack")
-    parser.add_argument("--video", type=str, required=True, help="Path to input video file")
+    parser.add_argument("--video", type=str, required=True,
+                        help="Input video file, camera URL (rtsp://, http://, ...) or device index")
     parser.add_argument("--config", type=str, default="config/default_config.yaml", help="Path to config YAML")
     parser.add_argument("--line", type=float, help="Override line position (0.0 - 1.0)")
     parser.add_argument("--conf", type=float, help="Override confidence threshold")
@@ -19,7 +23,14 @@ def main():
     parser.add_argument("--model", type=str, help="Override YOLO model path")
     parser.add_argument("--show", action="store_true", help="Show live preview")
     parser.add_argument("--save", action="store_true", default=True, help="Save output video")
+    parser.add_argument("--no-save", dest="save", action="store_false", help="Only count (no annotated video)")
     parser.add_argument("--output-dir", type=str, help="Override output directory")
+    parser.add_argument("--events", action="store_true", help="Write the crossing-event log to <output-dir>/events_<video>")
+    parser.add_argument("--track-cache", type=str, help="Record tracker output here, or replay it without inference")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every stage; print a JSON summary and write it to <output-dir>/profile_<video>.json")
+    parser.add_argument("--profile-frames", type=int,
+                        help="With --profile, also sample stacks for this many frames into a flamegraph-ready file")
 
     args = parser.parse_args()
     
@@ -42,15 +53,27 @@ def main():
         config['show_preview'] = True
     if args.output_dir:
         config['output_dir'] = args.output_dir
+    if args.track_cache:
+        config['track_cache_dir'] = args.track_cache
+    if args.profile:
+        config['profiling'] = True
+    if args.profile_frames is not None:
+        config['profile_frames'] = args.profile_frames
 
     # Output path
     video_name = os.path.basename(args.video)
+    if is_live_source(args.video, config) and not os.path.exists(args.video):
+        # Stream URLs have no usable file name; "rtsp://cam-3/live" -> "live_cam-3_live.mp4"
+        video_name = "live_" + re.sub(r"[^A-Za-z0-9.-]+", "_", args.video.split("://")[-1]).strip("_") + ".mp4"
     output_path = os.path.join(config.get('output_dir', 'outputs'), f"annotated_{video_name}")
 
     logger.info(f"Starting BagCounter on {args.video}")
     counter = BagCounter(config)
-    results = counter.process_video(args.video, output_path if args.save else None)
+    events_path = os.path.join(config.get('output_dir', 'outputs'), f"events_{video_name}") if args.events else None
+    results = counter.process_video(args.video, output_path if args.save else None, events_path)
     
+    if events_path:
+        print(f"Crossing events written to {events_path}")
     print("-" * 30)
     print(f"Final Count for {video_name}:")
     print(f"IN:    {results['in']}")
@@ -58,5 +81,14 @@ def main():
     print(f"TOTAL: {results['in'] + results['out']}")
     print("-" * 30)
 
+    if config.get('profiling') and counter.pipeline is not None:
+        stats = counter.pipeline.stats()
+        profile_path = os.path.join(config.get('output_dir', 'outputs'), f"profile_{os.path.splitext(video_name)[0]}.json")
+        os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+        with open(profile_path, "w") as f:
+            json.dump(stats, f, indent=2)
+        print(json.dumps(stats, indent=2))
+        print(f"Profile written to {profile_path}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import logging
+import argparse
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.quantization import PRECISIONS, quantize_and_gate, registry_path
+from src.utils import load_config, setup_logging
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds INT8/FP16 variants of the model and registers the ones "
+                                                 "whose counts match the FP32 model on the given videos")
+    parser.add_argument("--config", type=str, default="config/default_config.yaml")
+    parser.add_argument("--model", type=str, help="Override the .pt weights from the config")
+    parser.add_argument("--videos", type=str, nargs="+", default=["data/samples"],
+                        help="Videos (or directories of them) used for calibration and the accuracy gate")
+    parser.add_argument("--precisions", type=str, default=",".join(PRECISIONS))
+    parser.add_argument("--calibration-frames", type=int, default=200, help="Frames sampled for INT8 calibration")
+    parser.add_argument("--max-count-drift", type=int, help="Override quantization_max_count_drift")
+    parser.add_argument("--min-event-f1", type=float, help="Override quantization_min_event_f1")
+    parser.add_argument("--event-logs", type=str,
+                        help="Keep every run's crossing log here (<dir>/<precision>/events_<video>), "
+                             "for scripts/evaluate_bag_metrics.py --logs")
+    parser.add_argument("--report", type=str, help="JSON report (default: outputs/quantization_<model>.json)")
+    args = parser.parse_args()
+
+    setup_logging(logging.WARNING)
+    config = load_config(args.config)
+    if args.model:
+        config['model'] = args.model
+    if args.max_count_drift is not None:
+        config['quantization_max_count_drift'] = args.max_count_drift
+    if args.min_event_f1 is not None:
+        config['quantization_min_event_f1'] = args.min_event_f1
+
+    videos = []
+    for path in args.videos:
+        if os.path.isdir(path):
+            videos.extend(sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(VIDEO_EXTENSIONS)))
+        else:
+            videos.append(path)
+
+    report = quantize_and_gate(config['model'], videos, config, precisions=args.precisions.split(","),
+                               calibration_frames=args.calibration_frames, event_dir=args.event_logs)
+
+    model_name = os.path.splitext(os.path.basename(config['model']))[0]
+    report_path = args.report or os.path.join(config.get('output_dir', 'outputs'), f"quantization_{model_name}.json")
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'video':<22} | {'precision':<9} | {'IN':>4} {'OUT':>4} | {'drift':>5} | {'event F1':>8} | {'fps':>6}")
+    print("-" * 74)
+    for video, base in report["baseline"].items():
+        print(f"{video:<22} | {'fp32':<9} | {base['in']:>4} {base['out']:>4} | {'-':>5} | {'-':>8} | {base['fps']:>6.2f}")
+        for precision, entry in report["variants"].items():
+            r = next(r for r in entry["results"] if r["video"] == video)
+            print(f"{'':<22} | {precision:<9} | {r['in']:>4} {r['out']:>4} | {r['count_drift']:>5} | "
+                  f"{r['event_f1']:>8.3f} | {r['fps']:>6.2f}")
+    print()
+    rejected = 0
+    for precision, entry in report["variants"].items():
+        if entry["status"] == "accepted":
+            print(f"{precision}: accepted ({entry['size_mb']} MB) -> model_precision: {precision}")
+        else:
+            rejected += 1
+            print(f"{precision}: REJECTED, {entry['reason']}")
+    print(f"\nRegistry: {registry_path(config['model'])}\nReport  : {report_path}")
+    sys.exit(1 if rejected else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,86 @@
 import os
-import subprocess
-import logging
 import sys
+import json
+import logging
+import argparse
 
 # Add parent directory to sys.path so we can import 'src'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.batch import run_jobs
+from src.utils import setup_logging, load_config
+
+DEFAULT_SCENARIOS = [
+    ("data/samples/Problem Statement Scenario1.mp4", "config/scenario1_config.yaml"),
+    ("data/samples/Problem Statement Scenario2.mp4", "config/scenario2_config.yaml"),
+    ("data/samples/Problem Statement Scenario3.mp4", "config/scenario3_config.yaml")
+]
+
+def load_jobs(manifest: str = None):
+    """
+    Reads the job list. A manifest is a YAML list of {video, config} entries;
+    without one the three bundled scenarios are used.
+    """
+    if manifest:
+        entries = load_config(manifest)
+        return [{"video": e["video"], "config": e["config"]} for e in entries]
+    return [{"video": v, "config": c} for v, c in DEFAULT_SCENARIOS]
+
 def run_scenarios():
-    scenarios = [
-        ("data/samples/Problem Statement Scenario1.mp4", "config/scenario1_config.yaml"),
-        ("data/samples/Problem Statement Scenario2.mp4", "config/scenario2_config.yaml"),
-        ("data/samples/Problem Statement Scenario3.mp4", "config/scenario3_config.yaml")
-    ]
-    
+    parser = argparse.ArgumentParser(description="AI-BagCounter: batch processor for many (video, config) jobs")
+    parser.add_argument("--manifest", type=str, help="YAML list of {video, config} jobs")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: cores / threads-per-worker)")
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="Intra-op threads per worker")
+    parser.add_argument("--order", type=str, choices=["largest-first", "given"], default="largest-first")
+    parser.add_argument("--summary", type=str, default="outputs/batch_summary.json", help="Where to write the JSON summary")
+    parser.add_argument("--no-save", action="store_true", help="Skip writing annotated videos")
+    args = parser.parse_args()
+
+    setup_logging(logging.WARNING)
+
     print("=" * 50)
     print("AI-BagCounter: Batch Scenario Processor")
     print("=" * 50)
-    
-    results_summary = []
 
-    for video, config in scenarios:
-        if not os.path.exists(video):
-            print(f"[SKIP] Video not found: {video}")
+    jobs = []
+    for job in load_jobs(args.manifest):
+        if not os.path.exists(job["video"]):
+            print(f"[SKIP] Video not found: {job['video']}")
             continue
-        
-        print(f"\n[RUNNING] Processing {video} with {config}...")
-        
-        cmd = [
-            "python", "scripts/main.py",
-            "--video", video,
-            "--config", config
-        ]
-        
-        try:
-            # We use subprocess to keep it clean and isolated
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                # Parse output for summary table
-                lines = result.stdout.splitlines()
-                in_count = 0
-                out_count = 0
-                for line in lines:
-                    if "IN:" in line:
-                        in_count = line.split(":")[-1].strip()
-                    if "OUT:" in line:
-                        out_count = line.split(":")[-1].strip()
-                
-                results_summary.append({
-                    "scenario": video,
-                    "in": in_count,
-                    "out": out_count,
-                    "total": int(in_count) + int(out_count)
-                })
-                print(f"[SUCCESS] {video} processed.")
-            else:
-                print(f"[ERROR] Failed to process {video}")
-                print(result.stderr)
-        except Exception as e:
-            print(f"[ERROR] An exception occurred: {e}")
+        if args.no_save:
+            job["save_output"] = False
+        jobs.append(job)
+
+    if not jobs:
+        print("\n[INFO] No scenarios were processed. Please ensure video files are in data/samples.")
+        return
+
+    print(f"\n[RUNNING] {len(jobs)} job(s) on {args.workers or 'auto'} worker(s)...")
+    results = run_jobs(jobs, workers=args.workers, threads_per_worker=args.threads_per_worker, order=args.order)
 
     # Print Summary Table
-    if results_summary:
-        print("\n" + "=" * 60)
-        print(f"{'Scenario':<40} | {'IN':<5} | {'OUT':<5} | {'Total':<5}")
-        print("-" * 60)
-        for res in results_summary:
-            print(f"{res['scenario']:<40} | {res['in']:<5} | {res['out']:<5} | {res['total']:<5}")
-        print("=" * 60)
-    else:
-        print("\n[INFO] No scenarios were processed. Please ensure video files are in the root directory.")
+    print("\n" + "=" * 78)
+    print(f"{'Scenario':<40} | {'IN':<5} | {'OUT':<5} | {'Total':<5} | {'FPS':<8}")
+    print("-" * 78)
+    for res in results:
+        if res["error"]:
+            print(f"{res['video']:<40} | ERROR: {res['error']}")
+            continue
+        print(f"{res['video']:<40} | {res['in']:<5} | {res['out']:<5} | {res['total']:<5} | {res['fps']:<8}")
+    print("=" * 78)
+
+    if os.path.dirname(args.summary):
+        os.makedirs(os.path.dirname(args.summary), exist_ok=True)
+    with open(args.summary, "w") as f:
+        json.dump({
+            "jobs": results,
+            "totals": {
+                "in": sum(r["in"] for r in results),
+                "out": sum(r["out"] for r in results),
+                "failed": sum(1 for r in results if r["error"])
+            }
+        }, f, indent=2)
+    print(f"Summary written to {args.summary}")
 
 if __name__ == "__main__":
     run_scenarios()
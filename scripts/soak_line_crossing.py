@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+# Add parent directory to sys.path so we can import 'src'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.line_crossing import LineCrossingDetector, Direction, Orientation
+
+def run_soak(hours: float, fps: int, concurrent: int, lifetime: int, ttl: int, report_every: float, seed: int = 0):
+    """
+    Feeds the detector a simulated stream of ever-increasing track ids (ByteTrack never reuses ids)
+    and reports tracked state and traced memory, which must stay flat.
+    """
+    rng = np.random.default_rng(seed)
+    detector = LineCrossingDetector(line_coord=540, direction=Direction.BOTH, orientation=Orientation.HORIZONTAL,
+                                    cooldown_frames=30, line_margin=5, ttl_frames=ttl)
+    frames = int(hours * 3600 * fps)
+    # Each live bag walks across the frame over `lifetime` frames, starting at a random offset
+    ids = np.arange(concurrent, dtype=np.int64)
+    born = -rng.integers(0, lifetime, size=concurrent)
+    next_id = concurrent
+    total_in = total_out = 0
+
+    tracemalloc.start()
+    baseline = None
+    start = time.perf_counter()
+    print(f"{'hour':>6} | {'tracks':>7} | {'capacity':>8} | {'traced KiB':>10} | {'IN':>7} | {'OUT':>7}")
+    for frame in range(frames):
+        expired = frame - born >= lifetime
+        if expired.any():
+            n = int(expired.sum())
+            ids[expired] = np.arange(next_id, next_id + n)
+            born[expired] = frame
+            next_id += n
+        progress = (frame - born) / lifetime
+        coords = np.where(ids % 2 == 0, progress, 1.0 - progress) * 1080
+        cin, cout = detector.update_arrays(ids, coords)
+        total_in += cin
+        total_out += cout
+
+        if frame == fps * 60:
+            baseline = tracemalloc.get_traced_memory()[0]
+        if (frame + 1) % int(report_every * 3600 * fps) == 0:
+            current = tracemalloc.get_traced_memory()[0]
+            print(f"{(frame + 1) / (3600 * fps):>6.1f} | {len(detector.slots):>7} | {len(detector._side):>8} | "
+                  f"{current / 1024:>10.1f} | {total_in:>7} | {total_out:>7}")
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"\n{frames} frames, {next_id} track ids in {seconds:.1f}s ({frames / seconds:.0f} updates/s)")
+    print(f"Traced memory after 1 min: {(baseline or 0) / 1024:.1f} KiB, at end: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB")
+    return detector
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-run memory soak for LineCrossingDetector")
+    parser.add_argument("--hours", type=float, default=24.0, help="Simulated stream length")
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--concurrent", type=int, default=12, help="Bags visible at once")
+    parser.add_argument("--lifetime", type=int, default=75, help="Frames each track lives")
+    parser.add_argument("--ttl", type=int, default=900, help="track_ttl_frames")
+    parser.add_argument("--report-every", type=float, default=1.0, help="Hours between report lines")
+    args = parser.parse_args()
+    run_soak(args.hours, args.fps, args.concurrent, args.lifetime, args.ttl, args.report_every)
@@ -0,0 +1,73 @@
+import numpy as np
+from enum import Enum
+from dataclasses import dataclass
+from typing import Any, List, Tuple
+
+class AssociationMode(Enum):
+    # Each bag independently picks its nearest person (several bags may share one)
+    GREEDY = "greedy"
+    # One-to-one minimum-cost assignment (Hungarian), so bags can't fight over a worker
+    OPTIMAL = "optimal"
+
+@dataclass
+class Association:
+    """Result of a person-bag association pass, expressed as index arrays and masks."""
+    bag_to_person: np.ndarray   # (M,) index into the people array, -1 if unassigned
+    bag_mask: np.ndarray        # (M,) True where the bag was associated
+    person_has_bag: np.ndarray  # (N,) True where at least one bag was assigned
+
+def box_centroids(xyxy: Any) -> np.ndarray:
+    """Returns the (K, 2) centroids of a (K, 4) array of xyxy boxes."""
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+    return np.stack(((xyxy[:, 0] + xyxy[:, 2]) * 0.5, (xyxy[:, 1] + xyxy[:, 3]) * 0.5), axis=1)
+
+def pairwise_sq_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Returns the (len(a), len(b)) matrix of squared distances between two point sets."""
+    diff = a[:, None, :] - b[None, :, :]
+    return np.einsum('ijk,ijk->ij', diff, diff)
+
+def split_classes(cls_ids: Any, person_classes: List[int], bag_classes: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (person_mask, bag_mask). A class listed in both groups sets both masks."""
+    cls_ids = np.asarray(cls_ids)
+    return np.isin(cls_ids, person_classes), np.isin(cls_ids, bag_classes)
+
+def require_scipy_assignment() -> Any:
+    """SciPy's Hungarian solver, with an error naming the package when the optional dependency is missing."""
+    try:
+        from scipy.optimize import linear_sum_assignment
+        return linear_sum_assignment
+    except ImportError as e:
+        raise ImportError("association_mode: optimal needs the scipy package") from e
+
+def associate(person_xyxy: Any, bag_xyxy: Any, threshold: float = 150.0,
+              mode: AssociationMode = AssociationMode.GREEDY) -> Association:
+    """
+    Associates bags with people by centroid distance.
+    A bag is only linked to a person whose centroid is strictly closer than `threshold` pixels.
+    """
+    people = box_centroids(person_xyxy)
+    bags = box_centroids(bag_xyxy)
+    n, m = len(people), len(bags)
+
+    bag_to_person = np.full(m, -1, dtype=np.intp)
+    if n and m:
+        d2 = pairwise_sq_distances(bags, people)
+        within = d2 < threshold * threshold
+
+        if mode == AssociationMode.OPTIMAL:
+            linear_sum_assignment = require_scipy_assignment()
+            # Infeasible pairs cost more than any full set of feasible ones, so the
+            # solver maximises the number of valid links before minimising distance.
+            big = float(d2[within].sum()) + 1.0 if within.any() else 1.0
+            rows, cols = linear_sum_assignment(np.where(within, d2, big))
+            keep = within[rows, cols]
+            bag_to_person[rows[keep]] = cols[keep]
+        else:
+            nearest = np.argmin(d2, axis=1)
+            hit = within[np.arange(m), nearest]
+            bag_to_person[hit] = nearest[hit]
+
+    bag_mask = bag_to_person >= 0
+    person_has_bag = np.zeros(n, dtype=bool)
+    person_has_bag[bag_to_person[bag_mask]] = True
+    return Association(bag_to_person=bag_to_person, bag_mask=bag_mask, person_has_bag=person_has_bag)
@@ -0,0 +1,249 @@
+import os
+import cv2
+import glob
+import shutil
+import importlib
+import logging
+import numpy as np
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Backend(Enum):
+    TORCH = "torch"          # ultralytics YOLO.track on the PyTorch weights
+    ONNX = "onnx"            # exported ONNX model on ONNX Runtime
+    OPENVINO = "openvino"    # exported OpenVINO IR
+
+class _Column:
+    """A numpy array behind the .cpu().numpy() accessors of an ultralytics tensor."""
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+
+    def cpu(self) -> "_Column":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self.array
+
+class _Boxes:
+    def __init__(self, xyxy: np.ndarray, ids: Optional[np.ndarray], cls: np.ndarray, conf: np.ndarray):
+        self.xyxy = _Column(xyxy)
+        self.id = _Column(ids) if ids is not None else None
+        self.cls = _Column(cls)
+        self.conf = _Column(conf)
+
+class ArrayResult:
+    """Tracker output held in numpy arrays, shaped like an ultralytics Results object."""
+
+    def __init__(self, xyxy: np.ndarray, ids: Optional[np.ndarray], cls: np.ndarray, conf: np.ndarray):
+        self.boxes = _Boxes(xyxy, ids, cls, conf)
+
+class Detections:
+    """One frame's detections, with the fields and boolean indexing ByteTrack reads from ultralytics Boxes."""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    @property
+    def xywh(self) -> np.ndarray:
+        xy = (self.xyxy[:, :2] + self.xyxy[:, 2:]) / 2
+        return np.concatenate([xy, self.xyxy[:, 2:] - self.xyxy[:, :2]], axis=1)
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, index: Any) -> "Detections":
+        return Detections(self.xyxy[index], self.conf[index], self.cls[index])
+
+def backend_for(model: Any, configured: str = "torch") -> Backend:
+    """An exported model file picks its own backend; .pt weights and model objects use the configured one."""
+    if isinstance(model, str):
+        if model.endswith(".onnx"):
+            return Backend.ONNX
+        if model.rstrip("/").endswith("_openvino_model") or model.endswith(".xml"):
+            return Backend.OPENVINO
+    return Backend(configured)
+
+def letterbox_geometry(shape: Tuple[int, int], size: int) -> Tuple[float, Tuple[int, int], Tuple[int, int]]:
+    """(gain, resized (w, h), top-left padding (x, y)) for fitting an (h, w) frame into a size x size square."""
+    h, w = shape
+    gain = min(size / h, size / w)
+    new_w, new_h = int(round(w * gain)), int(round(h * gain))
+    # Same rounding as ultralytics' LetterBox, so boxes land on the same pixels
+    pad_x, pad_y = int(round((size - new_w) / 2 - 0.1)), int(round((size - new_h) / 2 - 0.1))
+    return gain, (new_w, new_h), (pad_x, pad_y)
+
+class Preprocessor:
+    """
+    Letterboxes a batch of same-sized BGR frames into one NCHW float32 RGB tensor in [0, 1].
+    The padded canvas and the tensor are allocated once and reused; only the resize runs per frame.
+    """
+
+    def __init__(self, size: int = 640):
+        self.size = size
+        self._canvas: Optional[np.ndarray] = None
+        self._tensor: Optional[np.ndarray] = None
+
+    def __call__(self, frames: Sequence[np.ndarray]) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        n = len(frames)
+        gain, (new_w, new_h), (pad_x, pad_y) = letterbox_geometry(frames[0].shape[:2], self.size)
+        if self._canvas is None or len(self._canvas) < n:
+            self._canvas = np.full((n, self.size, self.size, 3), 114, dtype=np.uint8)
+            self._tensor = np.empty((n, 3, self.size, self.size), dtype=np.float32)
+        canvas = self._canvas[:n]
+        for frame, out in zip(frames, canvas):
+            region = out[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+            if frame.shape[:2] == (new_h, new_w):
+                region[...] = frame
+            else:
+                cv2.resize(frame, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+        tensor = self._tensor[:n]
+        # BGR HWC uint8 -> RGB CHW float in one pass over the whole batch
+        np.multiply(canvas[..., ::-1].transpose(0, 3, 1, 2), 1.0 / 255.0, out=tensor, casting='unsafe')
+        return tensor, gain, (pad_x, pad_y)
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression; returns kept indices, highest score first."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+def postprocess(pred: np.ndarray, conf: float, classes: Optional[Sequence[int]], gain: float, pad: Tuple[int, int],
+                shape: Tuple[int, int], iou: float = 0.7, max_det: int = 300) -> Detections:
+    """
+    Decodes one image's YOLOv8 head output (4 + num_classes, anchors): best class per anchor, confidence and
+    class filter, class-aware NMS, then boxes mapped back to the original (h, w) frame.
+    """
+    scores_all = pred[4:]
+    cls = scores_all.argmax(axis=0)
+    scores = scores_all[cls, np.arange(scores_all.shape[1])]
+    mask = scores > conf
+    if classes is not None:
+        mask &= np.isin(cls, classes)
+    if not mask.any():
+        return Detections(np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.float32))
+
+    cx, cy, w, h = pred[:4, mask]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    scores, cls = scores[mask], cls[mask]
+    # Offsetting each class into its own region makes one NMS pass class-aware
+    keep = nms(xyxy + (cls * 7680.0)[:, None], scores, iou)[:max_det]
+    xyxy, scores, cls = xyxy[keep], scores[keep], cls[keep]
+
+    xyxy -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=xyxy.dtype)
+    xyxy /= gain
+    height, width = shape
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, width)
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, height)
+    return Detections(xyxy.astype(np.float32), scores.astype(np.float32), cls.astype(np.float32))
+
+class ExportedDetector:
+    """YOLOv8 detection on an exported model: letterbox, one forward pass per batch, decode and NMS in numpy."""
+
+    def __init__(self, path: str, imgsz: int = 640, iou: float = 0.7, max_det: int = 300):
+        self.path = path
+        self.imgsz = imgsz
+        self.iou = iou
+        self.max_det = max_det
+        self.preprocess = Preprocessor(imgsz)
+        self.batch_limit = 1
+
+    def _forward(self, tensor: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def __call__(self, frames: Sequence[np.ndarray], conf: float = 0.25,
+                 classes: Optional[Sequence[int]] = None) -> List[Detections]:
+        results = []
+        for start in range(0, len(frames), self.batch_limit):
+            chunk = frames[start:start + self.batch_limit]
+            tensor, gain, pad = self.preprocess(chunk)
+            output = self._forward(tensor)
+            results.extend(postprocess(p, conf, classes, gain, pad, f.shape[:2], self.iou, self.max_det)
+                           for p, f in zip(output, chunk))
+        return results
+
+class OnnxDetector(ExportedDetector):
+    """ONNX Runtime session on the CPU (or the given providers)."""
+
+    def __init__(self, path: str, imgsz: int = 640, providers: Optional[List[str]] = None, threads: int = 0, **kwargs):
+        super().__init__(path, imgsz, **kwargs)
+        ort = require(Backend.ONNX)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=providers or ["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, size = model_input.shape[0], model_input.shape[-1]
+        if isinstance(size, int) and size != self.imgsz:
+            # An exported model has a fixed input size, whatever was asked for
+            self.imgsz, self.preprocess = size, Preprocessor(size)
+        self.batch_limit = batch if isinstance(batch, int) else 64  # dynamic batch dimension
+
+    def _forward(self, tensor: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: tensor})[0]
+
+class OpenVinoDetector(ExportedDetector):
+    """OpenVINO IR compiled for the CPU."""
+
+    def __init__(self, path: str, imgsz: int = 640, device: str = "CPU", **kwargs):
+        super().__init__(path, imgsz, **kwargs)
+        ov = require(Backend.OPENVINO)
+        core = ov.Core()
+        xml = path if path.endswith(".xml") else glob.glob(os.path.join(path, "*.xml"))[0]
+        self.model = core.compile_model(xml, device, {"PERFORMANCE_HINT": "LATENCY"})
+        self.output = self.model.output(0)
+
+    def _forward(self, tensor: np.ndarray) -> np.ndarray:
+        return self.model(tensor)[self.output]
+
+def require(backend: Backend) -> Any:
+    """Imports the runtime of an exported backend, with an error naming the package to install."""
+    package = {Backend.ONNX: "onnxruntime", Backend.OPENVINO: "openvino"}[backend]
+    try:
+        return importlib.import_module(package)
+    except ImportError as e:
+        raise ImportError(f"inference_backend: {backend.value} needs the {package} package") from e
+
+def export_model(weights: str, backend: Backend, imgsz: int = 640) -> str:
+    """
+    Exports PyTorch weights for `backend` once and returns the exported path. The export sits next to the
+    weights, named for its input size (best_640.onnx, best_640_openvino_model/), and is redone only when
+    the weights are newer.
+    """
+    stem = f"{os.path.splitext(weights)[0]}_{imgsz}"
+    target = f"{stem}.onnx" if backend == Backend.ONNX else f"{stem}_openvino_model"
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(weights):
+        return target
+    from ultralytics import YOLO
+    logger.info(f"Exporting {weights} to {backend.value} ({imgsz}px)")
+    exported = YOLO(weights).export(format=backend.value, imgsz=imgsz, verbose=False)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.replace(exported, target)
+    return target
+
+def load_detector(model: str, backend: Backend, imgsz: int = 640) -> ExportedDetector:
+    """Opens an exported model (.onnx, OpenVINO dir or .xml), exporting .pt weights first if needed."""
+    require(backend)  # fail before a slow export the runtime could not load anyway
+    if model.endswith(".pt"):
+        model = export_model(model, backend, imgsz)
+    if backend == Backend.ONNX:
+        return OnnxDetector(model, imgsz)
+    return OpenVinoDetector(model, imgsz)
@@ -0,0 +1,134 @@
+import os
+import time
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-worker state, filled by _init_worker in each pool process
+_MODELS: Dict[str, Any] = {}
+_MODEL_FACTORY: Optional[Callable[[str], Any]] = None
+
+def _limit_threads(threads: int) -> None:
+    """Caps the intra-op thread pools so N workers don't oversubscribe the cores."""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    import cv2
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def _init_worker(threads: Optional[int], model_factory: Optional[Callable[[str], Any]]) -> None:
+    global _MODEL_FACTORY
+    if threads:
+        _limit_threads(threads)
+    _MODEL_FACTORY = model_factory
+    _MODELS.clear()
+
+def _get_model(model_path: str) -> Any:
+    """Loads each model once per worker and reuses it for every later job."""
+    if model_path not in _MODELS:
+        if _MODEL_FACTORY is not None:
+            _MODELS[model_path] = _MODEL_FACTORY(model_path)
+        else:
+            from ultralytics import YOLO
+            _MODELS[model_path] = YOLO(model_path)
+    return _MODELS[model_path]
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Processes one {video, config} job inside a worker and returns structured results.
+    `config` may be a path to a YAML file or an already-loaded dict.
+    """
+    from .counter import BagCounter
+    from .pipeline import CountSink, EventLogSink, VideoWriterSink, make_pipeline
+    from .quantization import resolve_model
+    from .utils import load_config
+    from .video_io import VideoIOOptions
+
+    video = job["video"]
+    config = job["config"]
+    result = {"video": video, "config": config if isinstance(config, str) else None, "pid": os.getpid()}
+
+    try:
+        if isinstance(config, str):
+            config = load_config(config)
+        if not os.path.exists(video):
+            raise FileNotFoundError(f"Video not found: {video}")
+
+        # Resolved first, so each worker caches the file it actually loads (an int8/fp16 variant or the weights)
+        model_path = resolve_model(config.get('model', 'yolov8n.pt'), config.get('model_precision', 'fp32'),
+                                   config.get('imgsz', 640))
+        counter = BagCounter(config, model=_get_model(model_path))
+        events_path = None
+        if job.get("save_events", config.get('save_events', False)):
+            events_path = os.path.join(config.get('output_dir', 'outputs'), f"events_{os.path.basename(video)}")
+        events = EventLogSink(events_path, meta={"video": video})
+        sinks = [CountSink(), events]
+        output_path = None
+        if job.get("save_output", config.get('save_output', False)):
+            output_path = os.path.join(config.get('output_dir', 'outputs'), f"annotated_{os.path.basename(video)}")
+            sinks.append(VideoWriterSink(video, output_path, VideoIOOptions.from_config(config)))
+
+        pipeline = make_pipeline(counter, sinks, config)
+        frames = 0
+        start = time.perf_counter()
+        for _ in pipeline.run(video):
+            frames += 1
+        seconds = time.perf_counter() - start
+
+        result.update({
+            "in": counter.count_in,
+            "out": counter.count_out,
+            "total": counter.count_in + counter.count_out,
+            "frames": frames,
+            "seconds": round(seconds, 3),
+            "fps": round(frames / seconds, 2) if seconds > 0 else 0.0,
+            "events": events.events,
+            "stages": pipeline.stats()["stages"],
+            "output": output_path,
+            "events_path": events_path,
+            "error": None
+        })
+    except Exception as e:
+        logger.exception(f"Job failed for {video}")
+        result.update({"in": 0, "out": 0, "total": 0, "frames": 0, "error": f"{type(e).__name__}: {e}"})
+    return result
+
+def order_jobs(jobs: List[Dict[str, Any]], order: str = "largest-first") -> List[Dict[str, Any]]:
+    """Orders jobs so long videos start first and don't leave a single worker running at the end."""
+    if order == "largest-first":
+        return sorted(jobs, key=lambda j: os.path.getsize(j["video"]) if os.path.exists(j["video"]) else 0, reverse=True)
+    if order == "given":
+        return list(jobs)
+    raise ValueError(f"Unknown job order: {order}")
+
+def run_jobs(jobs: List[Dict[str, Any]], workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+             order: str = "largest-first", model_factory: Optional[Callable[[str], Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Runs jobs on a pool of worker processes, each loading its model once.
+    Results come back in the order the jobs were given. workers=0 runs everything in-process.
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // (threads_per_worker or 1))
+    ordered = order_jobs(jobs, order)
+    positions = {id(job): i for i, job in enumerate(jobs)}
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+
+    if workers == 0:
+        _init_worker(threads_per_worker, model_factory)
+        for job in ordered:
+            results[positions[id(job)]] = run_job(job)
+        return results
+
+    with multiprocessing.Pool(processes=min(workers, len(jobs)) or 1, initializer=_init_worker,
+                              initargs=(threads_per_worker, model_factory)) as pool:
+        # chunksize=1 keeps the largest-first order meaningful: each idle worker takes the next biggest job
+        for job, result in zip(ordered, pool.imap(run_job, ordered, chunksize=1)):
+            results[positions[id(job)]] = result
+            logger.info(f"Finished {job['video']}: IN {result['in']}, OUT {result['out']}")
+    return results
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+@dataclass
+class Benchmark:
+    """
+    One timed case. `setup` builds whatever the case needs and returns the function to time; one call of it
+    processes `items` units (frames, updates, ...), and results are reported per unit.
+    """
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    unit: str = "call"
+    items: int = 1
+    params: Dict[str, Any] = field(default_factory=dict)
+
+def measure(bench: Benchmark, repeat: int = 5, min_time: float = 0.2, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Times `bench` in `repeat` rounds. Each round makes enough calls to last at least `min_time` seconds
+    (the call count is found once, as timeit's autorange does), so short cases are not dominated by timer noise.
+    """
+    fn = bench.setup()
+    for _ in range(warmup):
+        fn()
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / (number * bench.items))
+
+    median = statistics.median(samples)
+    return {
+        "unit": bench.unit,
+        "params": bench.params,
+        "repeat": repeat,
+        "number": number,
+        "items": bench.items,
+        "median_s": median,
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "per_second": 1.0 / median if median > 0 else 0.0,
+        "samples_s": samples
+    }
+
+def environment() -> Dict[str, Any]:
+    """What a result depends on besides the code: machine, interpreter, library versions and the git commit."""
+    import cv2
+    import numpy as np
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit or None,
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "opencv": cv2.__version__
+    }
+
+def run_suite(benchmarks: List[Benchmark], repeat: int = 5, min_time: float = 0.2,
+              progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Measures every benchmark in order; `progress(name, result)` is called after each one."""
+    results = {}
+    for bench in benchmarks:
+        results[bench.name] = measure(bench, repeat=repeat, min_time=min_time)
+        if progress:
+            progress(bench.name, results[bench.name])
+    return {"environment": environment(), "results": results}
+
+def save_results(report: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.25,
+            stat: str = "median_s") -> List[Dict[str, Any]]:
+    """
+    Compares two reports case by case. A case is "slower" when current/baseline of `stat` exceeds `threshold`,
+    "faster" below 1/threshold, else "same"; cases in only one report are "new" or "missing".
+    """
+    rows = []
+    old, new = baseline["results"], current["results"]
+    for name in list(old) + [n for n in new if n not in old]:
+        if name not in new:
+            rows.append({"name": name, "baseline": old[name][stat], "current": None, "ratio": None, "status": "missing"})
+            continue
+        if name not in old:
+            rows.append({"name": name, "baseline": None, "current": new[name][stat], "ratio": None, "status": "new"})
+            continue
+        ratio = new[name][stat] / old[name][stat] if old[name][stat] > 0 else float("inf")
+        status = "slower" if ratio > threshold else "faster" if ratio < 1.0 / threshold else "same"
+        rows.append({"name": name, "baseline": old[name][stat], "current": new[name][stat], "ratio": ratio,
+                     "status": status})
+    return rows
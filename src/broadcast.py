@@ -0,0 +1,379 @@
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class FrameRing:
+    """
+    Fixed-size ring of the latest published items with a running sequence number.
+    The producer never waits on readers: a reader that falls more than `size` items behind
+    skips ahead and the skipped items are counted as dropped. Video readers skip to the newest
+    item; with `keep_order` (update messages) they resume at the oldest item still held.
+    """
+
+    def __init__(self, size: int = 8, keep_order: bool = False):
+        self.size = max(1, size)
+        self.keep_order = keep_order
+        self.items: List[Any] = [None] * self.size
+        self.seq = 0          # sequence number of the next item to be published
+        self.closed = False
+        self.dropped = 0
+        self.cond = threading.Condition()
+
+    def publish(self, item: Any) -> None:
+        with self.cond:
+            self.items[self.seq % self.size] = item
+            self.seq += 1
+            self.cond.notify_all()
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def read(self, next_seq: int, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """
+        Returns (seq, item) for the first item at or after `next_seq` that is still in the ring,
+        waiting for it if needed. Returns None once the ring is closed and drained, or on timeout.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > next_seq or self.closed, timeout):
+                return None
+            if self.seq <= next_seq:
+                return None
+            if next_seq < self.seq - self.size:
+                # Too slow: video jumps to the newest frame rather than replaying stale ones
+                resume = self.seq - self.size if self.keep_order else self.seq - 1
+                self.dropped += resume - next_seq
+                next_seq = resume
+            return next_seq, self.items[next_seq % self.size]
+
+    def latest(self, next_seq: int, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """Like read, but always returns the newest item; older unread ones are skipped (not counted as dropped)."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > next_seq or self.closed, timeout):
+                return None
+            if self.seq <= next_seq:
+                return None
+            return self.seq - 1, self.items[(self.seq - 1) % self.size]
+
+def follow(ring: FrameRing, timeout: float = 1.0) -> Iterator[Any]:
+    """Yields a ring's items from its newest one onwards until it is closed."""
+    with ring.cond:
+        next_seq = max(0, ring.seq - 1)
+    while True:
+        got = ring.read(next_seq, timeout)
+        if got is None:
+            if ring.closed:
+                return
+            continue
+        seq, item = got
+        next_seq = seq + 1
+        yield item
+
+class DerivedStream:
+    """
+    Re-publishes a transformed copy (e.g. a JPEG at some quality tier) of a parent ring's newest items
+    on its own thread, at most `max_rate` items per second. Items published in between are skipped,
+    so neither the parent's producer nor other derived streams ever wait on this one.
+    It runs while it has subscribers and stops with the last one or when the parent closes.
+    """
+
+    def __init__(self, key: Any, parent: FrameRing, transform: Callable[[Any], Any], max_rate: float = 0.0,
+                 ring_size: int = 4):
+        self.key = key
+        self.parent = parent
+        self.transform = transform
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+        self.ring = FrameRing(ring_size)
+        self.subscribers = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.skipped = 0
+        self.thread = threading.Thread(target=self._run, name=f"derived-{key}", daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        try:
+            with self.parent.cond:
+                next_seq = max(0, self.parent.seq - 1)
+            due = 0.0
+            while not self.stop_event.is_set():
+                wait = due - time.monotonic()
+                if wait > 0 and self.stop_event.wait(wait):
+                    break
+                got = self.parent.latest(next_seq, timeout=0.5)
+                if got is None:
+                    if self.parent.closed:
+                        break
+                    continue
+                seq, item = got
+                self.skipped += seq - next_seq
+                next_seq = seq + 1
+                due = time.monotonic() + self.interval
+                out = self.transform(item)
+                if out is not None:
+                    self.ring.publish(out)
+        except Exception:
+            logger.exception(f"Derived stream {self.key} failed")
+        finally:
+            self.ring.close()
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            if self.stop_event.is_set() or self.ring.closed:
+                return False
+            self.subscribers += 1
+            return True
+
+    def release(self) -> None:
+        with self.lock:
+            self.subscribers -= 1
+            if self.subscribers == 0:
+                self.stop_event.set()
+
+    def subscribe(self, timeout: float = 1.0) -> Iterator[Any]:
+        """Follows this stream for a subscriber registered with try_acquire; closing the generator unsubscribes."""
+        try:
+            yield from follow(self.ring, timeout)
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"subscribers": self.subscribers, "published": self.ring.seq, "skipped": self.skipped,
+                 "dropped": self.ring.dropped}
+        if hasattr(self.transform, "stats"):
+            stats.update(self.transform.stats())
+        return stats
+
+class BroadcastChannel:
+    """
+    One producer (e.g. a BagCounter pipeline) on a background thread, fanned out to any number
+    of subscribers through a FrameRing. It starts on the first subscriber and stops `grace_seconds`
+    after the last one leaves, or when the producer runs out.
+
+    Besides frames, the producer can push small update messages (counts, crossing events) with
+    publish_update; they go through a second, larger ring read by update listeners.
+    """
+
+    def __init__(self, key: str, source: Callable[["BroadcastChannel"], Tuple[Any, Iterator[Any]]],
+                 ring_size: int = 8, grace_seconds: float = 5.0, update_ring_size: int = 256):
+        self.key = key
+        self.source = source
+        self.grace_seconds = grace_seconds
+        self.session = uuid.uuid4().hex[:8]
+        self.ring = FrameRing(ring_size)
+        self.updates = FrameRing(update_ring_size, keep_order=True)
+        self.last_counts: Optional[Dict[str, Any]] = None
+        self.state: Any = None        # whatever the source exposes alongside its frames (the BagCounter)
+        self.subscribers = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.idle_since: Optional[float] = None
+        self.idle_timer: Optional[threading.Timer] = None
+        self.started_at: Optional[float] = None
+        self.published = 0
+        self.views: Dict[Any, DerivedStream] = {}
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self) -> None:
+        frames = None
+        try:
+            self.state, frames = self.source(self)
+            for item in frames:
+                if self.stop_event.is_set():
+                    break
+                self.ring.publish(item)
+                self.published += 1
+        except Exception:
+            logger.exception(f"Broadcast producer for {self.key} failed")
+        finally:
+            if frames is not None and hasattr(frames, "close"):
+                frames.close()
+            self.ring.close()
+            self.updates.close()
+            logger.info(f"Broadcast {self.key} stopped after {self.published} frames")
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self.thread = threading.Thread(target=self._run, name=f"broadcast-{self.key}", daemon=True)
+        self.thread.start()
+        logger.info(f"Broadcast {self.key} started")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def publish_update(self, message: Dict[str, Any]) -> None:
+        """Publishes an update message; the latest "counts" message is kept as the snapshot for new listeners."""
+        with self.updates.cond:
+            if message.get("type") == "counts":
+                self.last_counts = message
+            self.updates.publish(message)
+
+    def try_acquire(self) -> bool:
+        """Registers a subscriber unless the channel is already stopping."""
+        with self.lock:
+            if self.stop_event.is_set() or self.ring.closed:
+                return False
+            self.subscribers += 1
+            self.idle_since = None
+            if self.idle_timer is not None:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            return True
+
+    def release(self) -> None:
+        with self.lock:
+            self.subscribers -= 1
+            if self.subscribers == 0:
+                self.idle_since = time.monotonic()
+                if self.grace_seconds <= 0:
+                    self.stop_event.set()
+                else:
+                    self.idle_timer = threading.Timer(self.grace_seconds, self._stop_if_idle)
+                    self.idle_timer.daemon = True
+                    self.idle_timer.start()
+
+    def _stop_if_idle(self) -> None:
+        with self.lock:
+            # A timer from an earlier idle spell may fire (or already be waiting on the lock) after a
+            # reconnect and disconnect; only stop once the current spell has lasted the full grace period
+            if (self.subscribers == 0 and self.idle_since is not None
+                    and time.monotonic() - self.idle_since >= self.grace_seconds):
+                logger.info(f"No viewers on {self.key} for {self.grace_seconds}s, stopping")
+                self.stop_event.set()
+
+    def subscribe(self, timeout: float = 1.0) -> Iterator[Any]:
+        """
+        Yields items as they are published, starting from the newest one, for a subscriber registered
+        with try_acquire. Closing the generator unsubscribes.
+        """
+        try:
+            yield from follow(self.ring, timeout)
+        finally:
+            self.release()
+
+    def view(self, key: Any, make_transform: Callable[[], Callable[[Any], Any]], max_rate: float = 0.0) -> DerivedStream:
+        """Registers a subscriber on the derived stream `key`, starting it with a fresh transform if needed."""
+        with self.lock:
+            view = self.views.get(key)
+            if view is None or not view.try_acquire():
+                view = DerivedStream(key, self.ring, make_transform(), max_rate)
+                view.try_acquire()
+                self.views[key] = view
+            return view
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            views = {str(getattr(k, "name", k)): v.stats() for k, v in self.views.items() if not v.ring.closed}
+        return {
+            "running": self.running,
+            "session": self.session,
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped": self.ring.dropped,
+            "uptime": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+            "views": views
+        }
+
+class BroadcastHub:
+    """Keeps at most one running BroadcastChannel per key and hands out subscriptions to it."""
+
+    def __init__(self, source_factory: Callable[[str, BroadcastChannel], Tuple[Any, Iterator[Any]]],
+                 ring_size: int = 8, grace_seconds: float = 5.0, update_ring_size: int = 256):
+        self.source_factory = source_factory
+        self.ring_size = ring_size
+        self.grace_seconds = grace_seconds
+        self.update_ring_size = update_ring_size
+        self.channels: Dict[str, BroadcastChannel] = {}
+        self.lock = threading.Lock()
+        self.started = threading.Condition(self.lock)
+
+    def join(self, key: str) -> BroadcastChannel:
+        """
+        Registers a subscriber on the running channel for `key`, starting a fresh channel if there is
+        none or the previous one is stopping.
+        """
+        with self.lock:
+            channel = self.channels.get(key)
+            if channel is None or not channel.try_acquire():
+                channel = BroadcastChannel(key, lambda ch: self.source_factory(key, ch), self.ring_size,
+                                           self.grace_seconds, self.update_ring_size)
+                channel.try_acquire()
+                self.channels[key] = channel
+                channel.start()
+                self.started.notify_all()
+            return channel
+
+    def get(self, key: str) -> Optional[BroadcastChannel]:
+        with self.lock:
+            return self.channels.get(key)
+
+    def stream(self, key: str, view: Any = None, make_transform: Optional[Callable[[], Callable[[Any], Any]]] = None,
+               max_rate: float = 0.0) -> Iterator[Any]:
+        """
+        Subscribes to the channel for `key`, or with `view` to the derived stream of that name (created with
+        make_transform() and max_rate on first use). The subscription lasts as long as the generator is iterated.
+        """
+        channel = self.join(key)
+        if view is None:
+            yield from channel.subscribe()
+            return
+        try:
+            yield from channel.view(view, make_transform, max_rate).subscribe()
+        finally:
+            channel.release()
+
+    def updates(self, key: str, heartbeat: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Follows the update messages for `key` across pipeline runs without keeping any run alive.
+        Each run begins with a counts snapshot and ends with an "end" message; None is yielded
+        whenever `heartbeat` seconds pass without news so callers can keep idle connections open.
+        """
+        last = None
+        while True:
+            with self.started:
+                self.started.wait_for(lambda: self.channels.get(key) not in (None, last), timeout=heartbeat)
+                channel = self.channels.get(key)
+            if channel is None or channel is last:
+                yield None
+                continue
+            last = channel
+            tags = {"scenario": key, "session": channel.session}
+
+            # Snapshot and read position together, so no message is missed or repeated
+            with channel.updates.cond:
+                snapshot = channel.last_counts
+                next_seq = channel.updates.seq
+            yield snapshot or {"type": "counts", **tags, "frame_idx": 0, "in": 0, "out": 0, "total": 0,
+                               "delta_in": 0, "delta_out": 0}
+            while True:
+                got = channel.updates.read(next_seq, heartbeat)
+                if got is None:
+                    if channel.updates.closed:
+                        yield {"type": "end", **tags}
+                        break
+                    yield None
+                    continue
+                seq, message = got
+                next_seq = seq + 1
+                yield message
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return {key: channel.stats() for key, channel in self.channels.items()}
+
+    def shutdown(self) -> None:
+        with self.lock:
+            channels = list(self.channels.values())
+        for channel in channels:
+            channel.stop(timeout=5.0)
@@ -0,0 +1,198 @@
+import os
+import csv
+import time
+import logging
+import itertools
+import multiprocessing
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .track_cache import TrackCache, track_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Counting-stage parameters a sweep may vary, with the config default of each
+SWEEP_KEYS = {
+    "line_position": 0.5,
+    "line_margin": 0,
+    "cooldown_frames": 30,
+    "association_threshold": 150.0,
+    "count_direction": "both"
+}
+# Settings whose recording depends on where the line is; they are turned off while line_position is swept
+LINE_DEPENDENT_KEYS = ("motion_gating", "dynamic_imgsz")
+
+@dataclass
+class GroundTruth:
+    """Expected totals, and optionally the expected crossing events as (frame_idx, direction) pairs."""
+    count_in: Optional[int] = None
+    count_out: Optional[int] = None
+    events: Optional[List[Tuple[int, str]]] = None
+
+    @classmethod
+    def from_events_csv(cls, path: str) -> "GroundTruth":
+        """Reads a CSV with frame_idx and direction (in/out) columns, one row per true crossing."""
+        with open(path, newline="") as f:
+            events = [(int(row["frame_idx"]), row["direction"].strip().lower()) for row in csv.DictReader(f)]
+        return cls(count_in=sum(d == "in" for _, d in events), count_out=sum(d == "out" for _, d in events),
+                   events=events)
+
+def parse_values(spec: str, cast: Any = float) -> List[Any]:
+    """
+    Parses a sweep axis: a comma list ("10,25,40") or an inclusive range "start:stop:step" ("0.3:0.7:0.05").
+    """
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        values = np.arange(start, stop + step / 2, step)
+        return [cast(round(float(v), 6)) for v in values]
+    return [cast(v.strip()) for v in spec.split(",") if v.strip()]
+
+def expand_grid(axes: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the axes, as config overrides."""
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*(axes[k] for k in keys))]
+
+def match_events(predicted: List[Tuple[int, str]], truth: List[Tuple[int, str]], tolerance: int) -> int:
+    """
+    Number of predicted crossings that pair with a true one of the same direction at most `tolerance`
+    frames away. Each true crossing pairs at most once; both lists are walked in frame order.
+    """
+    matched = 0
+    for direction in ("in", "out"):
+        pred = sorted(f for f, d in predicted if d == direction)
+        true = sorted(f for f, d in truth if d == direction)
+        i = j = 0
+        while i < len(pred) and j < len(true):
+            if abs(pred[i] - true[j]) <= tolerance:
+                matched += 1
+                i += 1
+                j += 1
+            elif pred[i] < true[j]:
+                i += 1
+            else:
+                j += 1
+    return matched
+
+def score_trial(count_in: int, count_out: int, events: List[Tuple[int, str]], truth: GroundTruth,
+                tolerance: int) -> Dict[str, Any]:
+    """Count error against the expected totals, plus precision/recall/F1 when true events are known."""
+    error = 0
+    if truth.count_in is not None:
+        error += abs(count_in - truth.count_in)
+    if truth.count_out is not None:
+        error += abs(count_out - truth.count_out)
+    metrics: Dict[str, Any] = {"in": count_in, "out": count_out, "count_error": error}
+    if truth.events is not None:
+        tp = match_events(events, truth.events, tolerance)
+        precision = tp / len(events) if events else float(not truth.events)
+        recall = tp / len(truth.events) if truth.events else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        metrics.update(precision=round(precision, 4), recall=round(recall, 4), f1=round(f1, 4))
+    return metrics
+
+def rank_key(trial: Dict[str, Any]) -> Tuple[float, float, int]:
+    """Best first: highest event F1 (when scored), then smallest count error, then grid order."""
+    return (-trial["metrics"].get("f1", 0.0), trial["metrics"]["count_error"], trial["index"])
+
+def run_trial(task: Tuple[int, str, Dict[str, Any], Dict[str, Any], GroundTruth, int]) -> Dict[str, Any]:
+    """Replays the recorded tracks with one set of overrides and scores the result."""
+    from .counter import BagCounter
+    from .pipeline import CountSink, EventLogSink, FramePipeline
+
+    index, video, config, overrides, truth, tolerance = task
+    counter = BagCounter({**config, **overrides})
+    events = EventLogSink()
+    pipeline = FramePipeline(counter, [CountSink(), events])
+    frames = 0
+    start = time.perf_counter()
+    for _ in pipeline.run(video):
+        frames += 1
+    seconds = time.perf_counter() - start
+    if counter.tracker.loaded:
+        raise RuntimeError("Trial ran inference; the track cache entry is missing")
+
+    predicted = [(e["frame_idx"], e["direction"]) for e in events.events]
+    return {
+        "index": index,
+        "params": overrides,
+        "metrics": score_trial(counter.count_in, counter.count_out, predicted, truth, tolerance),
+        "ms_per_frame": round(1000.0 * seconds / max(frames, 1), 4)
+    }
+
+def record_tracks(video: str, config: Dict[str, Any], model: Any = None) -> Dict[str, Any]:
+    """Runs inference once (unless the track cache already holds this video) and returns the pass's timing."""
+    from .counter import BagCounter
+    from .pipeline import CountSink, FramePipeline
+
+    counter = BagCounter(config, model=model)
+    frames = 0
+    start = time.perf_counter()
+    for _ in FramePipeline(counter, [CountSink()]).run(video):
+        frames += 1
+    seconds = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "seconds": round(seconds, 3),
+        "fps": round(frames / seconds, 2) if seconds > 0 else 0.0,
+        "replayed": counter.replay is not None
+    }
+
+def calibrate(video: str, config: Dict[str, Any], axes: Dict[str, Sequence[Any]], truth: GroundTruth,
+              track_cache_dir: str, workers: Optional[int] = None, tolerance: int = 15,
+              model: Any = None) -> Dict[str, Any]:
+    """
+    Sweeps the grid of counting parameters in `axes` against the ground truth.
+    Inference runs once to fill the track cache; every trial then replays it, on `workers` processes
+    (default: one per core, 0 = in-process). Returns the report with trials ranked best first.
+    """
+    from .quantization import resolve_model
+
+    unknown = set(axes) - set(SWEEP_KEYS)
+    if unknown:
+        raise ValueError(f"Not a counting-stage parameter: {', '.join(sorted(unknown))}")
+
+    config = {**config, "track_cache_dir": track_cache_dir, "show_preview": False}
+    if "line_position" in axes:
+        fixed = [k for k in LINE_DEPENDENT_KEYS if config.get(k)]
+        if fixed:
+            # Otherwise every line position would need its own recording, and trials would re-run inference
+            logger.warning(f"Sweeping line_position: recording and replaying with {', '.join(fixed)} off")
+            config.update({k: False for k in fixed})
+    record = record_tracks(video, config, model)
+    # Trials build their counter from the config alone, so they look the tracks up under the model it resolves to
+    trial_model = resolve_model(config.get('model', 'yolov8n.pt'), config.get('model_precision', 'fp32'),
+                                config.get('imgsz', 640))
+    if TrackCache(track_cache_dir).open(track_cache_key(video, trial_model, config)) is None:
+        raise RuntimeError(f"Recorded tracks are not keyed by the config's model ({trial_model}); "
+                           f"trials would re-run inference")
+    logger.info(f"Tracks ready ({record['frames']} frames, {'cached' if record['replayed'] else 'recorded'})")
+
+    grid = expand_grid(axes)
+    tasks = [(i, video, config, overrides, truth, tolerance) for i, overrides in enumerate(grid)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 0:
+        trials = [run_trial(t) for t in tasks]
+    else:
+        with multiprocessing.Pool(processes=min(workers, len(tasks)) or 1) as pool:
+            trials = pool.map(run_trial, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+    sweep_seconds = time.perf_counter() - start
+
+    trials.sort(key=rank_key)
+    best = trials[0]
+    ties = sum(rank_key(t)[:2] == rank_key(best)[:2] for t in trials)
+    return {
+        "video": video,
+        "ground_truth": {"in": truth.count_in, "out": truth.count_out,
+                         "events": len(truth.events) if truth.events is not None else None},
+        "record": record,
+        "sweep": {"trials": len(trials), "workers": workers, "seconds": round(sweep_seconds, 3),
+                  "trials_per_s": round(len(trials) / sweep_seconds, 2) if sweep_seconds > 0 else 0.0},
+        "best": {**best, "ties": ties},
+        "trials": trials
+    }
+
+def best_config(config: Dict[str, Any], report: Dict[str, Any]) -> Dict[str, Any]:
+    """The input config with the winning parameters applied."""
+    return {**config, **report["best"]["params"]}
@@ -1,11 +1,23 @@
 import os
-import cv2
+import time
 import logging
-from typing import Dict, Any, List
+import numpy as np
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from .tracker import TrackerWrapper
+from .quantization import resolve_model
+from .association import Association, AssociationMode, associate, box_centroids, split_classes
 from .line_crossing import LineCrossingDetector, Direction, Orientation
+from .gates import Gate, GateCrossingDetector, gates_from_config
 from .visualizer import Visualizer
-from .utils import get_video_properties, create_output_writer
+from .scheduler import MotionScheduler
+from .resolution import ResolutionController
+from .roi import RegionOfInterest
+from .events import CrossingEvent
+from .live import is_live_source
+from .track_cache import TrackCache, TrackRecorder, TrackReplay, track_cache_key
+from .video_io import VideoIOOptions
+from .pipeline import (make_pipeline, FrameResult, FrameSink, AnnotatedFrameSink, CountSink, EventLogSink,
+                       VideoWriterSink, MJPEGSink, PreviewSink)
 
 logger = logging.getLogger(__name__)
 
@@ -14,258 +26,389 @@ class BagCounter:
     
     def __init__(self, config: Dict[str, Any], model: Any = None):
         self.config = config
-        self.tracker = TrackerWrapper(model_path_or_model=model if model else config.get('model', 'yolov8n.pt'))
+        self.tracker = TrackerWrapper(
+            model_path_or_model=model if model else resolve_model(
+                config.get('model', 'yolov8n.pt'), config.get('model_precision', 'fp32'), config.get('imgsz', 640)),
+            backend=config.get('inference_backend', 'torch'),
+            imgsz=config.get('imgsz', 640)
+        )
         self.detector = None
         self.visualizer = None
+        self.fps = None
+        self.clock: Optional[Callable[[int], Optional[float]]] = None
+        self.started_at = time.time()
+        self.scheduler = None
+        self.resolution: Optional[ResolutionController] = None
+        self.zone_box: Optional[Tuple[float, float, float, float]] = None
+        self.zone_half = 0.0
+        self.roi = None
+        self.pipeline = None
+        self.gates: List[Gate] = []
+        self.gate_counts: Dict[str, Dict[str, int]] = {}
+        self.track_cache = TrackCache(config['track_cache_dir']) if config.get('track_cache_dir') else None
+        self.replay: Optional[TrackReplay] = None
+        self.recorder: Optional[TrackRecorder] = None
         self.reset()
 
     def reset(self) -> None:
         """Resets the counting state."""
         self.count_in = 0
         self.count_out = 0
+        self.gate_counts = {name: {"in": 0, "out": 0} for name in self.gate_counts}
+        self.tracker.reset()
         if self.detector:
-            self.detector.tracks_history.clear()
-            self.detector.tracks_cooldown.clear()
+            self.detector.reset()
 
     def _associate_bags_to_people(self, people: List[Dict], bags: List[Dict], threshold: float = 150.0) -> List[Dict]:
         """Associates bags with the nearest person and labels them as workers."""
-        for p in people:
-            p['has_bag'] = False
+        result = associate(
+            [p['box'] for p in people],
+            [b['box'] for b in bags],
+            threshold=threshold,
+            mode=AssociationMode(self.config.get('association_mode', 'greedy'))
+        )
+
+        for i, p in enumerate(people):
+            p['has_bag'] = bool(result.person_has_bag[i])
             p['bag_ids'] = []
 
         associated_bags = []
-        for b in bags:
-            bx1, by1, bx2, by2 = b['box']
-            bcx, bcy = (bx1 + bx2) / 2, (by1 + by2) / 2
-            
-            min_dist = float('inf')
-            best_person = None
-            
-            for p in people:
-                px1, py1, px2, py2 = p['box']
-                pcx, pcy = (px1 + px2) / 2, (py1 + py2) / 2
-                dist = ((bcx - pcx)**2 + (bcy - pcy)**2)**0.5
-                
-                if dist < min_dist and dist < threshold:
-                    min_dist = dist
-                    best_person = p
-            
-            if best_person:
-                best_person['has_bag'] = True
-                best_person['bag_ids'].append(b['id'])
+        for b, person_idx in zip(bags, result.bag_to_person):
+            if person_idx >= 0:
+                people[person_idx]['bag_ids'].append(b['id'])
                 b['associated'] = True
                 associated_bags.append(b)
             else:
                 b['associated'] = False
-        
+
         return associated_bags
 
-    def stream_video(self, video_path: str):
-        """Generator that yields processed video frames as JPEG bytes."""
-        if not os.path.exists(video_path):
-            logger.error(f"Video not found: {video_path}")
-            return
+    def _associate_tracks(self, boxes: np.ndarray, cls_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Association]:
+        """
+        Splits a frame's tracks into people and bags and associates them.
+        Returns (person_idx, bag_idx, association) where the index arrays point into `boxes`.
+        """
+        person_mask, bag_mask = split_classes(
+            cls_ids,
+            self.config.get('person_classes', [0]),
+            self.config.get('bag_classes', [24, 26, 28])
+        )
+        person_idx = np.flatnonzero(person_mask)
+        bag_idx = np.flatnonzero(bag_mask)
+        result = associate(
+            boxes[person_idx],
+            boxes[bag_idx],
+            threshold=self.config.get('association_threshold', 150.0),
+            mode=AssociationMode(self.config.get('association_mode', 'greedy'))
+        )
+        return person_idx, bag_idx, result
 
-        props = get_video_properties(video_path)
-        width, height = props['width'], props['height']
-        
+    def _sack_points(self, boxes: np.ndarray, track_ids: np.ndarray, sack_idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (track_ids, (K, 2) centroids) for the associated bags."""
+        return track_ids[sack_idx], box_centroids(boxes[sack_idx])
+
+    def _detection_data(self, boxes: np.ndarray, track_ids: np.ndarray, person_idx: np.ndarray,
+                        bag_idx: np.ndarray, result: Association) -> List[Dict[str, Any]]:
+        """Builds the Visualizer payload for people (worker or not) and associated bags."""
+        detection_data = []
+        for i, has_bag in zip(person_idx, result.person_has_bag):
+            color = (0, 255, 0) if has_bag else (255, 0, 0)
+            label = "Worker (Bag)" if has_bag else "Person"
+            detection_data.append({'box': boxes[i], 'id': track_ids[i], 'color': color, 'label': label})
+
+        for i in bag_idx[result.bag_mask]:
+            detection_data.append({'box': boxes[i], 'id': track_ids[i], 'color': (0, 255, 255), 'label': 'Sack'})
+        return detection_data
+
+    def setup(self, width: int, height: int, fps: Optional[float] = None, video_path: Optional[str] = None,
+              clock: Optional[Callable[[int], Optional[float]]] = None) -> None:
+        """
+        Builds the line detector and visualizer for a source of the given frame size.
+        With `track_cache_dir` set and a `video_path`, tracks are replayed from the cache, or recorded into it.
+        `clock` maps a frame index to its wall-clock capture time for live sources.
+        """
+        self.fps = fps if fps and fps > 0 else None
+        self.clock = clock
+        self.started_at = time.time()
         orientation_str = self.config.get('line_orientation', 'horizontal')
         self.orientation = Orientation(orientation_str)
-        
+
         if self.orientation == Orientation.HORIZONTAL:
             self.line_coord = int(height * self.config.get('line_position', 0.5))
         else:
             self.line_coord = int(width * self.config.get('line_position', 0.5))
-        
+
         direction = Direction(self.config.get('count_direction', 'both'))
-        
-        self.detector = LineCrossingDetector(
-            line_coord=self.line_coord, 
-            direction=direction,
-            orientation=self.orientation,
-            cooldown_frames=self.config.get('cooldown_frames', 30),
-            line_margin=self.config.get('line_margin', 0)
-        )
-        self.visualizer = Visualizer(line_coord=self.line_coord, orientation=self.orientation, width=width, height=height)
-
-        cap = cv2.VideoCapture(video_path)
-        frame_idx = 0
-        
-        try:
-            while cap.isOpened():
-                success, frame = cap.read()
-                if not success:
-                    break
-                
-                frame_idx += 1
-                
-                # Tracking
-                results = self.tracker.track(
-                    frame, 
-                    conf=self.config.get('confidence', 0.4),
-                    classes=self.config.get('track_classes', [0, 24, 26, 28])
-                )
-                
-                if results.boxes.id is not None:
-                    boxes = results.boxes.xyxy.cpu().numpy()
-                    track_ids = results.boxes.id.cpu().numpy().astype(int)
-                    cls_ids = results.boxes.cls.cpu().numpy().astype(int)
-                    
-                    person_classes = self.config.get('person_classes', [0])
-                    bag_classes = self.config.get('bag_classes', [24, 26, 28])
-                    
-                    people = []
-                    bags = []
-                    for i in range(len(track_ids)):
-                        item = {'box': boxes[i], 'id': track_ids[i]}
-                        if cls_ids[i] in person_classes:
-                            people.append(item)
-                        if cls_ids[i] in bag_classes:
-                            bags.append(item)
-
-                    # Association
-                    associated_bags = self._associate_bags_to_people(people, bags)
-
-                    # Crossing Logic for associated bags only (higher precision)
-                    sack_points = []
-                    for b in associated_bags:
-                        bx1, by1, bx2, by2 = b['box']
-                        bcx, bcy = (bx1 + bx2) / 2, (by1 + by2) / 2
-                        coord = bcy if self.orientation == Orientation.HORIZONTAL else bcx
-                        sack_points.append((b['id'], coord))
-                    
-                    cin, cout = self.detector.update(sack_points)
-                    self.count_in += cin
-                    self.count_out += cout
-                    
-                    # Visualization data
-                    detection_data = []
-                    for p in people:
-                        color = (0, 255, 0) if p['has_bag'] else (255, 0, 0)
-                        label = "Worker (Bag)" if p['has_bag'] else "Person"
-                        detection_data.append({'box': p['box'], 'id': p['id'], 'color': color, 'label': label})
-                    
-                    for b in bags:
-                        if b['associated']:
-                            detection_data.append({'box': b['box'], 'id': b['id'], 'color': (0, 255, 255), 'label': 'Sack'})
-
-                    frame = self.visualizer.draw_detections(frame, detection_data)
-
-                frame = self.visualizer.draw_hud(frame, self.count_in, self.count_out, frame_idx)
-                
-                ret, buffer = cv2.imencode('.jpg', frame)
-                if not ret:
-                    continue
-                
-                frame_bytes = buffer.tobytes()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        finally:
-            cap.release()
-
-    def process_video(self, video_path: str, output_path: str = None) -> Dict[str, int]:
-        """Processes a video file and counts bag crossings."""
-        if not os.path.exists(video_path):
-            logger.error(f"Video not found: {video_path}")
-            return {"in": 0, "out": 0}
 
-        props = get_video_properties(video_path)
-        width, height = props['width'], props['height']
-        
-        orientation_str = self.config.get('line_orientation', 'horizontal')
-        self.orientation = Orientation(orientation_str)
-        
-        if self.orientation == Orientation.HORIZONTAL:
-            self.line_coord = int(height * self.config.get('line_position', 0.5))
+        # Named gates replace the single counting line when configured
+        self.gates = gates_from_config(self.config, width, height)
+        if self.gates:
+            self.detector = GateCrossingDetector(
+                self.gates, width, height,
+                cooldown_frames=self.config.get('cooldown_frames', 30),
+                line_margin=self.config.get('line_margin', 0),
+                ttl_frames=self.config.get('track_ttl_frames', 900),
+                grid_cell=self.config.get('gate_grid_cell', 64)
+            )
         else:
-            self.line_coord = int(width * self.config.get('line_position', 0.5))
-        
-        direction = Direction(self.config.get('count_direction', 'both'))
-        
-        self.detector = LineCrossingDetector(
-            line_coord=self.line_coord, 
-            direction=direction,
-            orientation=self.orientation,
-            cooldown_frames=self.config.get('cooldown_frames', 30),
-            line_margin=self.config.get('line_margin', 0)
+            self.detector = LineCrossingDetector(
+                line_coord=self.line_coord,
+                direction=direction,
+                orientation=self.orientation,
+                cooldown_frames=self.config.get('cooldown_frames', 30),
+                line_margin=self.config.get('line_margin', 0),
+                ttl_frames=self.config.get('track_ttl_frames', 900)
+            )
+        self.gate_counts = {g.name: {"in": 0, "out": 0} for g in self.gates} or {"line": {"in": 0, "out": 0}}
+        self.visualizer = Visualizer(line_coord=self.line_coord, orientation=self.orientation, width=width, height=height,
+                                     gates=self.gates)
+        self.roi = RegionOfInterest.from_config(self.config, width, height)
+        self._open_track_cache(video_path, width, height, fps)
+        self.scheduler = None
+        self.zone_box = None
+        if self.gates:
+            bounds = np.array([g.bounds for g in self.gates])
+            self.zone_box = (*bounds[:, :2].min(axis=0), *bounds[:, 2:].max(axis=0))
+        # A replay follows the recorded run's detection schedule, so it needs no motion scheduler
+        if self.config.get('motion_gating') and self.replay is None:
+            self.scheduler = MotionScheduler.from_config(self.config, width, height, self.line_coord, self.orientation,
+                                                         zone_box=self.zone_box)
+        self.resolution = None
+        if self.config.get('dynamic_imgsz') and self.replay is None:
+            self.resolution = ResolutionController.from_config(self.config)
+        self.zone_half = (height if self.orientation == Orientation.HORIZONTAL else width) \
+            * self.config.get('motion_line_zone', 0.1) / 2
+
+    def _open_track_cache(self, video_path: Optional[str], width: int, height: int, fps: Optional[float]) -> None:
+        """Picks replay when the cache holds this video's tracks for the current model and inference settings."""
+        self.replay, self.recorder = None, None
+        if not self.track_cache or not video_path:
+            return
+        key = track_cache_key(video_path, self.tracker.source, self.config)
+        self.replay = self.track_cache.open(key)
+        if self.replay is not None:
+            logger.info(f"Replaying tracks from {self.replay.path} ({self.replay.total_frames} frames, no inference)")
+        else:
+            logger.info(f"Recording tracks to {self.track_cache.path_for(key)}")
+            self.recorder = self.track_cache.recorder(key, {"video": video_path, "width": width, "height": height,
+                                                            "fps": fps})
+
+    def finish_video(self, frames_read: Optional[int]) -> None:
+        """Called by the pipeline at the end of a video; a recording is only kept if the whole video was read."""
+        if self.recorder is not None and frames_read is not None:
+            self.recorder.close(frames_read)
+        self.recorder = None
+
+    def process_frame(self, frame: Any, frame_idx: int) -> FrameResult:
+        """Runs tracking, association and line crossing on one frame and updates the counts."""
+        if self.replay is not None:
+            results = self.replay.result(frame_idx)
+            return self._skip(frame, frame_idx) if results is None else self._count(frame, frame_idx, results)
+
+        if self.scheduler and not self.scheduler.should_infer(frame, frame_idx):
+            return self._skip(frame, frame_idx)
+
+        crop = self._crop(frame)
+        results = self.tracker.track(
+            crop,
+            conf=self.config.get('confidence', 0.4),
+            classes=self.config.get('track_classes', [0, 24, 26, 28]),
+            imgsz=self.resolution.imgsz if self.resolution else None
         )
-        self.visualizer = Visualizer(line_coord=self.line_coord, orientation=self.orientation, width=width, height=height)
+        if self.recorder is not None:
+            self.recorder.add(frame_idx, results)
+        result = self._count(frame, frame_idx, results)
+        self._adapt_resolution(frame_idx, crop, results, result)
+        return result
 
-        cap = cv2.VideoCapture(video_path)
-        writer = None
-        if output_path:
-            writer = create_output_writer(video_path, output_path, props['fps'], width, height)
-
-        frame_idx = 0
-        while cap.isOpened():
-            success, frame = cap.read()
-            if not success:
-                break
-            
-            frame_idx += 1
-            
-            results = self.tracker.track(
-                frame, 
-                conf=self.config.get('confidence', 0.4),
-                classes=self.config.get('track_classes', [0, 24, 26, 28])
+    def process_frames(self, frames: List[Any], first_idx: int) -> List[FrameResult]:
+        """Batched variant of process_frame: one detection pass, then counting frame by frame in order."""
+        indices = [first_idx + i for i in range(len(frames))]
+        if self.replay is not None:
+            return [self.process_frame(f, i) for f, i in zip(frames, indices)]
+
+        run = [not self.scheduler or self.scheduler.should_infer(f, i) for f, i in zip(frames, indices)]
+        crops = [self._crop(f) for f, r in zip(frames, run) if r]
+        batch = self.tracker.track_batch(
+            crops,
+            conf=self.config.get('confidence', 0.4),
+            classes=self.config.get('track_classes', [0, 24, 26, 28]),
+            imgsz=self.resolution.imgsz if self.resolution else None
+        ) if any(run) else []
+        if self.recorder is not None:
+            for i, results in zip([i for i, r in zip(indices, run) if r], batch):
+                self.recorder.add(i, results)
+        inferred = iter(zip(crops, batch))
+        out = []
+        for f, i, r in zip(frames, indices, run):
+            if not r:
+                out.append(self._skip(f, i))
+                continue
+            crop, results = next(inferred)
+            out.append(self._count(f, i, results))
+            # The whole batch ran at one size; a change applies from the next batch on
+            self._adapt_resolution(i, crop, results, out[-1])
+        return out
+
+    def _adapt_resolution(self, frame_idx: int, crop: Any, results: Any, result: FrameResult) -> None:
+        """Feeds one inferred frame's boxes to the resolution controller, if dynamic_imgsz is on."""
+        if self.resolution is None:
+            return
+        boxes = results.boxes
+        xyxy = boxes.xyxy.cpu().numpy()
+        confs = boxes.conf.cpu().numpy() if boxes.conf is not None else np.ones(len(xyxy))
+        self.resolution.observe(frame_idx, xyxy[:, 3] - xyxy[:, 1], confs, max(crop.shape[:2]),
+                                zone_clear=not self._in_counting_zone(result.boxes))
+
+    def _in_counting_zone(self, boxes: Optional[np.ndarray]) -> bool:
+        """Whether any tracked box centre lies within the line zone (or the gates' bounding box grown by it)."""
+        if boxes is None or not len(boxes):
+            return False
+        centers = box_centroids(boxes)
+        if self.zone_box is not None:
+            x0, y0, x1, y1 = self.zone_box
+            h = self.zone_half
+            return bool(np.any((centers[:, 0] >= x0 - h) & (centers[:, 0] <= x1 + h)
+                               & (centers[:, 1] >= y0 - h) & (centers[:, 1] <= y1 + h)))
+        axis = 1 if self.orientation == Orientation.HORIZONTAL else 0
+        return bool(np.any(np.abs(centers[:, axis] - self.line_coord) <= self.zone_half))
+
+    def _crop(self, frame: Any) -> Any:
+        """Restricts the frame to the configured ROI (a view, not a copy) before inference."""
+        return self.roi.crop(frame) if self.roi else frame
+
+    def _skip(self, frame: Any, frame_idx: int) -> FrameResult:
+        """Advances crossing history and cooldowns for a frame on which detection did not run."""
+        self.detector.update_points([], [])
+        result = FrameResult(frame_idx=frame_idx, frame=frame, count_in=self.count_in,
+                             count_out=self.count_out, skipped=True)
+        if self.gates:
+            result.gate_counts = {name: dict(c) for name, c in self.gate_counts.items()}
+        return result
+
+    def _count(self, frame: Any, frame_idx: int, results: Any) -> FrameResult:
+        """Association and line crossing for one frame's tracker output."""
+        result = FrameResult(frame_idx=frame_idx, frame=frame)
+
+        if results.boxes.id is not None:
+            boxes = results.boxes.xyxy.cpu().numpy()
+            track_ids = results.boxes.id.cpu().numpy().astype(int)
+            cls_ids = results.boxes.cls.cpu().numpy().astype(int)
+            confs = results.boxes.conf.cpu().numpy() if results.boxes.conf is not None else np.ones(len(track_ids))
+
+            if self.roi:
+                boxes = self.roi.to_frame(boxes)
+                keep = self.roi.keep(boxes)
+                boxes, track_ids, cls_ids, confs = boxes[keep], track_ids[keep], cls_ids[keep], confs[keep]
+
+            person_idx, bag_idx, assoc = self._associate_tracks(boxes, cls_ids)
+
+            # Crossing Logic for associated bags only (higher precision)
+            sack_ids, sack_centers = self._sack_points(boxes, track_ids, bag_idx[assoc.bag_mask])
+            cin, cout = self.detector.update_points(sack_ids, sack_centers)
+            self.count_in += cin
+            self.count_out += cout
+            for _, direction, *gate in self.detector.last_crossings:
+                self.gate_counts[gate[0] if gate else "line"][direction] += 1
+
+            result.crossed_in, result.crossed_out = cin, cout
+            if self.detector.last_crossings:
+                result.events = self._crossing_events(frame_idx, boxes, track_ids, confs, person_idx, bag_idx, assoc)
+            result.boxes, result.track_ids = boxes, track_ids
+            result.person_idx, result.bag_idx, result.association = person_idx, bag_idx, assoc
+        else:
+            # Keep the detector's frame clock (cooldowns, track expiry) in step with the video
+            self.detector.update_points([], [])
+
+        result.count_in, result.count_out = self.count_in, self.count_out
+        if self.gates:
+            result.gate_counts = {name: dict(c) for name, c in self.gate_counts.items()}
+        return result
+
+    def _timestamp(self, frame_idx: int) -> float:
+        """
+        Capture time (Unix seconds) for live sources, otherwise seconds into the video, or seconds since
+        setup when the file has no usable FPS.
+        """
+        if self.clock is not None:
+            captured = self.clock(frame_idx)
+            if captured is not None:
+                return captured
+            return time.time()
+        return (frame_idx - 1) / self.fps if self.fps else time.time() - self.started_at
+
+    def _crossing_events(self, frame_idx: int, boxes: np.ndarray, track_ids: np.ndarray, confs: np.ndarray,
+                         person_idx: np.ndarray, bag_idx: np.ndarray, assoc: Association) -> List[CrossingEvent]:
+        """Turns the detector's crossings for this frame into structured events."""
+        sacks = bag_idx[assoc.bag_mask]
+        carriers = person_idx[assoc.bag_to_person[assoc.bag_mask]]
+        lookup = {int(track_ids[k]): (k, int(track_ids[p])) for k, p in zip(sacks, carriers)}
+
+        timestamp = self._timestamp(frame_idx)
+        events = []
+        for track_id, direction, *gate in self.detector.last_crossings:
+            k, person_id = lookup.get(int(track_id), (None, -1))
+            if k is None:
+                continue
+            events.append(CrossingEvent(
+                frame_idx=frame_idx,
+                timestamp=timestamp,
+                track_id=int(track_id),
+                direction=direction,
+                person_id=person_id,
+                box=tuple(float(v) for v in boxes[k]),
+                confidence=float(confs[k]),
+                gate=gate[0] if gate else "line"
+            ))
+        return events
+
+    def annotate(self, frame: Any, result: FrameResult) -> Any:
+        """Draws detections and the HUD for a processed frame."""
+        if result.association is not None:
+            detection_data = self._detection_data(
+                result.boxes, result.track_ids, result.person_idx, result.bag_idx, result.association
             )
-            
-            if results.boxes.id is not None:
-                boxes = results.boxes.xyxy.cpu().numpy()
-                track_ids = results.boxes.id.cpu().numpy().astype(int)
-                cls_ids = results.boxes.cls.cpu().numpy().astype(int)
-
-                person_classes = self.config.get('person_classes', [0])
-                bag_classes = self.config.get('bag_classes', [24, 26, 28])
-
-                people = []
-                bags = []
-                for i in range(len(track_ids)):
-                    item = {'box': boxes[i], 'id': track_ids[i]}
-                    if cls_ids[i] in person_classes:
-                        people.append(item)
-                    if cls_ids[i] in bag_classes:
-                        bags.append(item)
-
-                associated_bags = self._associate_bags_to_people(people, bags)
-
-                sack_points = []
-                for b in associated_bags:
-                    bx1, by1, bx2, by2 = b['box']
-                    bcx, bcy = (bx1 + bx2) / 2, (by1 + by2) / 2
-                    coord = bcy if self.orientation == Orientation.HORIZONTAL else bcx
-                    sack_points.append((b['id'], coord))
-                
-                cin, cout = self.detector.update(sack_points)
-                self.count_in += cin
-                self.count_out += cout
-                
-                if writer or self.config.get('show_preview'):
-                    detection_data = []
-                    for p in people:
-                        color = (0, 255, 0) if p['has_bag'] else (255, 0, 0)
-                        label = "Worker (Bag)" if p['has_bag'] else "Person"
-                        detection_data.append({'box': p['box'], 'id': p['id'], 'color': color, 'label': label})
-                    
-                    for b in bags:
-                        if b['associated']:
-                            detection_data.append({'box': b['box'], 'id': b['id'], 'color': (0, 255, 255), 'label': 'Sack'})
-                    
-                    frame = self.visualizer.draw_detections(frame, detection_data)
-
-            if writer or self.config.get('show_preview'):
-                frame = self.visualizer.draw_hud(frame, self.count_in, self.count_out, frame_idx)
-                if writer:
-                    writer.write(frame)
-                if self.config.get('show_preview'):
-                    cv2.imshow("AI-BagCounter", frame)
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
-
-        cap.release()
-        if writer:
-            writer.release()
-        cv2.destroyAllWindows()
-        
+            frame = self.visualizer.draw_detections(frame, detection_data)
+        return self.visualizer.draw_hud(frame, result.count_in, result.count_out, result.frame_idx, result.gate_counts)
+
+    def stream_video(self, video_path: str, sinks: Optional[List[FrameSink]] = None):
+        """Generator that yields processed video frames as JPEG bytes. Extra `sinks` run alongside the encoder."""
+        self.pipeline = make_pipeline(self, [MJPEGSink()] + list(sinks or []), self.config)
+        for result in self.pipeline.run(video_path):
+            if result.encoded:
+                yield result.encoded
+
+    def stream_frames(self, video_path: str, sinks: Optional[List[FrameSink]] = None):
+        """Generator that yields annotated frames, leaving encoding to the caller (e.g. per-viewer quality tiers)."""
+        self.pipeline = make_pipeline(self, [AnnotatedFrameSink()] + list(sinks or []), self.config)
+        for result in self.pipeline.run(video_path):
+            if result.annotated is not None:
+                yield result.annotated
+
+    def process_video(self, video_path: str, output_path: str = None, events_path: str = None,
+                      sinks: Optional[List[FrameSink]] = None) -> Dict[str, int]:
+        """Processes a video file and counts bag crossings. Extra `sinks` (e.g. progress reporting) run alongside."""
+        if not is_live_source(video_path, self.config) and not os.path.exists(video_path):
+            logger.error(f"Video not found: {video_path}")
+            return {"in": 0, "out": 0}
+
+        extra = list(sinks or [])
+        sinks = [CountSink()]
+        if output_path:
+            sinks.append(VideoWriterSink(video_path, output_path, VideoIOOptions.from_config(self.config)))
+        if events_path:
+            sinks.append(EventLogSink(events_path, meta={"video": video_path}))
+        if self.config.get('show_preview'):
+            sinks.append(PreviewSink())
+        sinks.extend(extra)
+
+        self.pipeline = make_pipeline(self, sinks, self.config)
+        for _ in self.pipeline.run(video_path):
+            pass
+
         logger.info(f"Processing complete for {video_path}. IN: {self.count_in}, OUT: {self.count_out}")
+        logger.info(f"Pipeline stats: {self.pipeline.stats()}")
+        if self.gates:
+            logger.info(f"Per-gate counts: {self.gate_counts}")
+            return {"in": self.count_in, "out": self.count_out, "gates": self.gate_counts}
         return {"in": self.count_in, "out": self.count_out}
@@ -0,0 +1,119 @@
+import cv2
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+MJPEG_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+MJPEG_TRAILER = b'\r\n'
+
+@dataclass(frozen=True)
+class StreamTier:
+    """Output settings of one MJPEG stream: width in pixels (0 = source), JPEG quality, max fps (0 = unlimited)."""
+    width: int = 0
+    quality: int = 95
+    max_fps: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"w{self.width or 'src'}-q{self.quality}-{self.max_fps or 'max'}fps"
+
+    @classmethod
+    def from_request(cls, args: Mapping[str, Any], config: Dict[str, Any]) -> "StreamTier":
+        """
+        Builds the tier from ?width=&quality=&fps= query parameters, falling back to the stream_* config
+        defaults and clamping to stream_max_width / stream_max_quality / stream_max_fps.
+        Widths are rounded down to a multiple of 16 so similar requests share one encoder.
+        """
+        def number(key: str, default: float) -> float:
+            try:
+                return float(args.get(key, default))
+            except (TypeError, ValueError):
+                return default
+
+        max_width = int(config.get('stream_max_width', 0))
+        max_quality = int(config.get('stream_max_quality', 95))
+        max_fps = float(config.get('stream_max_fps', 0))
+
+        width = max(0, int(number('width', config.get('stream_width', 0))))
+        if max_width:
+            width = min(width, max_width) if width else max_width
+        if width:
+            width = max(64, width // 16 * 16)
+
+        quality = int(min(max(number('quality', config.get('stream_quality', 80)), 10), max_quality))
+
+        fps = max(0.0, number('fps', config.get('stream_fps', 0)))
+        if max_fps:
+            fps = min(fps, max_fps) if fps else max_fps
+        return cls(width=width, quality=quality, max_fps=round(fps, 1))
+
+class TierEncoder:
+    """
+    Downscales and JPEG-encodes frames for one tier into multipart MJPEG chunks.
+    Resize buffers are allocated once per source size and reused, and encode time and output bytes are tracked
+    so each tier can report its cost.
+    """
+
+    def __init__(self, tier: StreamTier):
+        self.tier = tier
+        self.params = [int(cv2.IMWRITE_JPEG_QUALITY), tier.quality]
+        self._steps: List[Tuple[Tuple[int, int], int, np.ndarray]] = []
+        self._planned_for: Optional[Tuple[Any, Any]] = None
+        self.frames = 0
+        self.bytes = 0
+        self.encode_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def _plan(self, frame: np.ndarray) -> None:
+        """
+        Works out the resize steps for this frame size and allocates their output buffers once.
+        OpenCV's INTER_AREA is only fast for an exact 2x, so the frame is halved with it while the
+        target is at most half the current size, and the last (< 2x) step is bilinear.
+        """
+        h, w = frame.shape[:2]
+        target = (self.tier.width, max(2, int(round(h * self.tier.width / w / 2)) * 2))
+        steps = []
+        cw, ch = w, h
+        while target[0] * 2 <= cw:
+            cw, ch = cw // 2, ch // 2
+            steps.append(((cw, ch), cv2.INTER_AREA))
+        if (cw, ch) != target:
+            steps.append((target, cv2.INTER_LINEAR))
+        self._steps = [(size, interp, np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype))
+                       for size, interp in steps]
+        self._planned_for = (frame.shape, frame.dtype)
+
+    def _scale(self, frame: np.ndarray) -> np.ndarray:
+        if not self.tier.width or self.tier.width >= frame.shape[1]:
+            return frame
+        if self._planned_for != (frame.shape, frame.dtype):
+            self._plan(frame)
+        for size, interp, buffer in self._steps:
+            frame = cv2.resize(frame, size, dst=buffer, interpolation=interp)
+        return frame
+
+    def encode(self, frame: np.ndarray) -> Optional[bytes]:
+        """Returns one multipart chunk, or None if encoding failed."""
+        start = time.perf_counter()
+        ok, buffer = cv2.imencode('.jpg', self._scale(frame), self.params)
+        self.encode_seconds += time.perf_counter() - start
+        if not ok:
+            return None
+        chunk = b''.join((MJPEG_HEADER, buffer.data, MJPEG_TRAILER))
+        self.frames += 1
+        self.bytes += len(chunk)
+        return chunk
+
+    __call__ = encode
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "tier": self.tier.name,
+            "frames": self.frames,
+            "fps": round(self.frames / elapsed, 2),
+            "bytes_per_s": round(self.bytes / elapsed),
+            "bytes_per_frame": round(self.bytes / self.frames) if self.frames else 0,
+            "encode_ms": round(1000 * self.encode_seconds / self.frames, 3) if self.frames else 0.0
+        }
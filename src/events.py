@@ -0,0 +1,148 @@
+import os
+import csv
+import glob
+import json
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+DIRECTION_CODES = {"in": 1, "out": -1}
+
+@dataclass
+class CrossingEvent:
+    """One bag crossing the counting line."""
+    frame_idx: int
+    timestamp: float          # seconds from the start of the video (Unix capture time for live sources)
+    track_id: int
+    direction: str            # "in" | "out"
+    person_id: int            # track id of the associated worker, -1 if none
+    box: Tuple[float, float, float, float]
+    confidence: float
+    gate: str = "line"        # name of the gate that was crossed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# Column layout of the on-disk log
+_COLUMNS = {
+    "frame_idx": np.int64,
+    "timestamp": np.float64,
+    "track_id": np.int64,
+    "direction": np.int8,     # +1 in, -1 out
+    "person_id": np.int64,
+    "box": np.float32,        # (K, 4)
+    "confidence": np.float32,
+    "gate": np.str_
+}
+
+class EventLogWriter:
+    """
+    Append-only columnar event log: a directory of numbered .npz chunks, one array per field.
+    Events are buffered and written `chunk_size` at a time; a finished chunk is never rewritten.
+    Opening a path starts a new log there, dropping any earlier chunks; with `append` the log
+    already at the path is continued, and its meta must match `meta`.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1024, meta: Optional[Dict[str, Any]] = None,
+                 append: bool = False):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer: List[CrossingEvent] = []
+        os.makedirs(path, exist_ok=True)
+        chunks = glob.glob(os.path.join(path, "chunk_*.npz"))
+        meta_path = os.path.join(path, "meta.json")
+        if append and chunks and meta is not None and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                stored = json.load(f)
+            if stored != json.loads(json.dumps(meta)):
+                raise ValueError(f"Event log {path} was written for {stored}, not {meta}; "
+                                 f"append to it only from the same source")
+        if not append:
+            for chunk in chunks:
+                os.remove(chunk)
+            chunks = []
+        self.next_chunk = len(chunks)
+        if meta is not None:
+            with open(meta_path, "w") as f:
+                json.dump(meta, f, indent=2)
+
+    def append(self, event: CrossingEvent) -> None:
+        self.buffer.append(event)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        events = self.buffer
+        columns = {
+            "frame_idx": [e.frame_idx for e in events],
+            "timestamp": [e.timestamp for e in events],
+            "track_id": [e.track_id for e in events],
+            "direction": [DIRECTION_CODES[e.direction] for e in events],
+            "person_id": [e.person_id for e in events],
+            "box": [e.box for e in events],
+            "confidence": [e.confidence for e in events],
+            "gate": [e.gate for e in events]
+        }
+        arrays = {name: np.asarray(values, dtype=_COLUMNS[name]) for name, values in columns.items()}
+        chunk_path = os.path.join(self.path, f"chunk_{self.next_chunk:06d}.npz")
+        # Write then rename so readers never see a half-written chunk
+        tmp_path = os.path.join(self.path, f".chunk_{self.next_chunk:06d}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, chunk_path)
+        self.next_chunk += 1
+        self.buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+def read_event_log(path: str) -> Dict[str, np.ndarray]:
+    """Loads every chunk of an event log and returns one concatenated array per column."""
+    chunks = sorted(glob.glob(os.path.join(path, "chunk_*.npz")))
+    if not chunks:
+        return {name: np.empty((0, 4) if name == "box" else 0, dtype=dtype) for name, dtype in _COLUMNS.items()}
+    loaded = [np.load(c) for c in chunks]
+    # Logs written before gates existed have no gate column: everything crossed the single line
+    return {name: np.concatenate([chunk[name] if name in chunk.files else np.full(len(chunk["frame_idx"]), "line")
+                                  for chunk in loaded]) for name in _COLUMNS}
+
+def load_ground_truth(path: str) -> Dict[Tuple[str, int], int]:
+    """Reads scenario_id,bag_id,gt_crossed labels into {(scenario_id, bag_id): gt_crossed}."""
+    labels = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            labels[(str(row["scenario_id"]), int(row["bag_id"]))] = int(row["gt_crossed"])
+    return labels
+
+def bag_event_rows(logs: Dict[str, str], ground_truth: Dict[Tuple[str, int], int]) -> List[Dict[str, Any]]:
+    """
+    Joins per-scenario event logs with ground-truth labels into bag_events.csv rows.
+    A track that crossed is pred_crossed=1 with its best crossing confidence as score; labelled bags
+    that never crossed are pred_crossed=0, and crossings with no label count as gt_crossed=0.
+    """
+    predicted: Dict[Tuple[str, int], float] = {}
+    for scenario_id, path in logs.items():
+        log = read_event_log(path)
+        for track_id, conf in zip(log["track_id"].tolist(), log["confidence"].tolist()):
+            key = (str(scenario_id), int(track_id))
+            predicted[key] = max(predicted.get(key, 0.0), float(conf))
+
+    rows = []
+    for key in sorted(set(ground_truth) | set(predicted)):
+        scenario_id, bag_id = key
+        rows.append({
+            "scenario_id": scenario_id,
+            "bag_id": bag_id,
+            "gt_crossed": ground_truth.get(key, 0),
+            "pred_crossed": int(key in predicted),
+            "score": round(predicted.get(key, 0.0), 4)
+        })
+    return rows
+
+def write_bag_events(rows: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=["scenario_id", "bag_id", "gt_crossed", "pred_crossed", "score"])
+        writer.writeheader()
+        writer.writerows(rows)
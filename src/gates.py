@@ -0,0 +1,255 @@
+import numpy as np
+from enum import Enum
+from typing import Any, Dict, List, Sequence, Tuple
+from .line_crossing import Direction, Orientation, TrackState
+
+class GateDirection(Enum):
+    IN = "in"
+    OUT = "out"
+    BOTH = "both"
+
+def _cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """z component of the 2D cross product, broadcasting over leading axes."""
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+def point_segment_distance(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distance from each point to the segment a-b, with points/a/b broadcasting to (..., 2)."""
+    ab = b - a
+    denom = np.maximum((ab * ab).sum(axis=-1), 1e-12)
+    t = np.clip(((points - a) * ab).sum(axis=-1) / denom, 0.0, 1.0)
+    closest = a + t[..., None] * ab
+    return np.linalg.norm(points - closest, axis=-1)
+
+class Gate:
+    """
+    A named counting gate: a polyline in pixel coordinates.
+    Walking the points in order (image coordinates, y down), IN is crossing from the left-hand
+    side to the right-hand side and OUT the reverse.
+    """
+
+    def __init__(self, name: str, points: Sequence[Sequence[float]], direction: GateDirection = GateDirection.BOTH):
+        self.name = name
+        self.points = np.asarray(points, dtype=np.float64)
+        if self.points.ndim != 2 or self.points.shape[1] != 2 or len(self.points) < 2:
+            raise ValueError(f"Gate '{name}' needs at least two [x, y] points")
+        self.direction = direction
+        self.count_in_allowed = direction in (GateDirection.IN, GateDirection.BOTH)
+        self.count_out_allowed = direction in (GateDirection.OUT, GateDirection.BOTH)
+
+    @property
+    def segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(starts, ends) of the polyline segments, each (S, 2)."""
+        return self.points[:-1], self.points[1:]
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        x0, y0 = self.points.min(axis=0)
+        x1, y1 = self.points.max(axis=0)
+        return float(x0), float(y0), float(x1), float(y1)
+
+    @classmethod
+    def from_line(cls, line_coord: int, orientation: Orientation, direction: Direction, width: int, height: int,
+                  name: str = "line") -> "Gate":
+        """The classic full-frame horizontal/vertical line as a gate with the same IN/OUT sense."""
+        if orientation == Orientation.HORIZONTAL:
+            # Left to right: the right-hand side is below the line, so top -> bottom is IN
+            points = [[-width, line_coord], [2 * width, line_coord]]
+        else:
+            # Bottom to top: the right-hand side is right of the line, so left -> right is IN
+            points = [[line_coord, 2 * height], [line_coord, -height]]
+        if direction in (Direction.TOP_TO_BOTTOM, Direction.LEFT_TO_RIGHT):
+            gate_direction = GateDirection.IN
+        elif direction in (Direction.BOTTOM_TO_TOP, Direction.RIGHT_TO_LEFT):
+            gate_direction = GateDirection.OUT
+        else:
+            gate_direction = GateDirection.BOTH
+        return cls(name, points, gate_direction)
+
+def gates_from_config(config: Dict[str, Any], width: int, height: int) -> List[Gate]:
+    """
+    Builds the `gates` list: [{name, points, direction}], points as fractions of the frame or pixels.
+    Returns an empty list when no gates are configured (the single counting line is used instead).
+    """
+    gates = []
+    for i, entry in enumerate(config.get('gates') or []):
+        pts = np.asarray(entry['points'], dtype=np.float64)
+        # Fractions of the frame unless any coordinate is clearly in pixels
+        if pts.max() <= 1.0:
+            pts = pts * [width, height]
+        gates.append(Gate(entry.get('name', f"gate{i + 1}"), pts, GateDirection(entry.get('direction', 'both'))))
+    names = [g.name for g in gates]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Gate names must be unique: {names}")
+    return gates
+
+class GateGrid:
+    """
+    Uniform grid of buckets over the frame listing the gate segments passing within `pad` pixels
+    of each cell. A summed-area table of bucket occupancy answers "is anything near this box"
+    for all tracks at once, so only tracks close to a gate pay for segment tests.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, width: int, height: int, cell: int = 64, pad: float = 0.0):
+        self.cell = float(cell)
+        self.shape = (int(np.ceil(height / self.cell)) + 1, int(np.ceil(width / self.cell)) + 1)
+        gh, gw = self.shape
+        self.buckets: Dict[int, np.ndarray] = {}
+        reach = pad + self.cell * np.sqrt(0.5)  # cell centre to corner, so the test is conservative
+
+        members: Dict[int, List[int]] = {}
+        for s, (a, b) in enumerate(zip(starts, ends)):
+            lo = np.floor((np.minimum(a, b) - reach) / self.cell).astype(int)
+            hi = np.floor((np.maximum(a, b) + reach) / self.cell).astype(int)
+            xs = np.arange(max(0, lo[0]), min(gw - 1, hi[0]) + 1)
+            ys = np.arange(max(0, lo[1]), min(gh - 1, hi[1]) + 1)
+            if not len(xs) or not len(ys):
+                continue
+            cx, cy = np.meshgrid(xs, ys)
+            centers = np.stack(((cx + 0.5) * self.cell, (cy + 0.5) * self.cell), axis=-1)
+            near = point_segment_distance(centers, a, b) <= reach
+            for cell_id in (cy[near] * gw + cx[near]).tolist():
+                members.setdefault(cell_id, []).append(s)
+        self.buckets = {k: np.asarray(v, dtype=np.intp) for k, v in members.items()}
+
+        occupied = np.zeros(self.shape, dtype=np.int32)
+        for cell_id in self.buckets:
+            occupied[divmod(cell_id, gw)] = 1
+        self.integral = np.zeros((gh + 1, gw + 1), dtype=np.int32)
+        self.integral[1:, 1:] = occupied.cumsum(axis=0).cumsum(axis=1)
+
+    def _cells(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        gh, gw = self.shape
+        c0 = np.floor(lo / self.cell).astype(int)
+        c1 = np.floor(hi / self.cell).astype(int)
+        c0[:, 0], c1[:, 0] = np.clip(c0[:, 0], 0, gw - 1), np.clip(c1[:, 0], 0, gw - 1)
+        c0[:, 1], c1[:, 1] = np.clip(c0[:, 1], 0, gh - 1), np.clip(c1[:, 1], 0, gh - 1)
+        return c0, c1
+
+    def candidates(self, p0: np.ndarray, p1: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate (row, segment) pairs for the boxes spanned by p0[i] -> p1[i] (each (K, 2)).
+        Rows whose box touches no occupied cell are rejected without visiting any bucket.
+        """
+        if not len(p0):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        c0, c1 = self._cells(np.minimum(p0, p1), np.maximum(p0, p1))
+        ii = self.integral
+        hits = (ii[c1[:, 1] + 1, c1[:, 0] + 1] - ii[c0[:, 1], c1[:, 0] + 1]
+                - ii[c1[:, 1] + 1, c0[:, 0]] + ii[c0[:, 1], c0[:, 0]]) > 0
+
+        rows, segs = [], []
+        gw = self.shape[1]
+        for i in np.flatnonzero(hits).tolist():
+            found = [self.buckets[cy * gw + cx]
+                     for cy in range(c0[i, 1], c1[i, 1] + 1)
+                     for cx in range(c0[i, 0], c1[i, 0] + 1)
+                     if cy * gw + cx in self.buckets]
+            unique = np.unique(np.concatenate(found))
+            rows.append(np.full(len(unique), i, dtype=np.intp))
+            segs.append(unique)
+        if not rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(rows), np.concatenate(segs)
+
+class GateCrossingDetector(TrackState):
+    """
+    Counts tracks crossing any of several named polyline gates.
+
+    Each track keeps an anchor: its last centroid that was not within `line_margin` of a gate.
+    A crossing is a proper intersection between the anchor -> current centroid step and a gate
+    segment; with one full-frame line this is exactly the side-flip test of LineCrossingDetector.
+    Cooldowns are per (track, gate).
+    """
+
+    _STATE = TrackState._STATE + ("_anchor", "_has_anchor")
+
+    def __init__(self, gates: List[Gate], width: int, height: int, cooldown_frames: int = 30,
+                 line_margin: float = 0, ttl_frames: int = 900, capacity: int = 64, grid_cell: int = 64):
+        if not gates:
+            raise ValueError("GateCrossingDetector needs at least one gate")
+        self.gates = gates
+        self.line_margin = line_margin
+        starts, ends, owner = [], [], []
+        for g, gate in enumerate(gates):
+            a, b = gate.segments
+            starts.append(a)
+            ends.append(b)
+            owner.append(np.full(len(a), g, dtype=np.intp))
+        self.seg_a = np.concatenate(starts)
+        self.seg_b = np.concatenate(ends)
+        self.seg_gate = np.concatenate(owner)
+        self.grid = GateGrid(self.seg_a, self.seg_b, width, height, cell=grid_cell, pad=line_margin)
+        self.in_allowed = np.array([g.count_in_allowed for g in gates])
+        self.out_allowed = np.array([g.count_out_allowed for g in gates])
+        self.last_crossings: List[Tuple[int, str, str]] = []  # (track_id, "in" | "out", gate name)
+        super().__init__(cooldown_frames, ttl_frames, capacity)
+
+    def _alloc(self, capacity: int) -> None:
+        super()._alloc(capacity)
+        self._cooldown_until = np.zeros((capacity, len(self.gates)), dtype=np.int64)
+        self._anchor = np.zeros((capacity, 2), dtype=np.float64)
+        self._has_anchor = np.zeros(capacity, dtype=bool)
+
+    def _clear_slot(self, slot: int) -> None:
+        super()._clear_slot(slot)
+        self._has_anchor[slot] = False
+
+    def near_gate(self, points: np.ndarray) -> np.ndarray:
+        """Mask of points within line_margin of any gate segment."""
+        near = np.zeros(len(points), dtype=bool)
+        if self.line_margin <= 0:
+            return near
+        rows, segs = self.grid.candidates(points, points)
+        if len(rows):
+            close = point_segment_distance(points[rows], self.seg_a[segs], self.seg_b[segs]) <= self.line_margin
+            near[rows[close]] = True
+        return near
+
+    def update_points(self, track_ids: Any, points: Any) -> Tuple[int, int]:
+        """
+        Vectorized update for a whole frame. track_ids: (K,) ints, points: (K, 2) centroids.
+        Returns (count_in, count_out) summed over all gates.
+        """
+        self._tick()
+        track_ids = np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(track_ids) == 0:
+            return 0, 0
+
+        slots = self._slots_for(track_ids)
+        settled = ~self.near_gate(points)
+        moving = np.flatnonzero(settled & self._has_anchor[slots])
+        p0, p1 = self._anchor[slots[moving]], points[moving]
+
+        count_in = count_out = 0
+        rows, segs = self.grid.candidates(p0, p1)
+        if len(rows):
+            a, b = self.seg_a[segs], self.seg_b[segs]
+            step = p1[rows] - p0[rows]
+            d0 = _cross(b - a, p0[rows] - a)
+            d1 = _cross(b - a, p1[rows] - a)
+            e0 = _cross(step, a - p0[rows])
+            e1 = _cross(step, b - p0[rows])
+            hit = (d0 * d1 < 0) & (e0 * e1 <= 0)
+
+            # One crossing per (track, gate) per frame, even through a shared polyline vertex
+            pairs = {}
+            for r, s, into in zip(rows[hit].tolist(), segs[hit].tolist(), (d1[hit] > 0).tolist()):
+                pairs.setdefault((r, int(self.seg_gate[s])), into)
+            for (r, g), into in pairs.items():
+                slot = slots[moving[r]]
+                allowed = self.in_allowed[g] if into else self.out_allowed[g]
+                if not allowed or self._cooldown_until[slot, g] > self.frame:
+                    continue
+                self._cooldown_until[slot, g] = self.frame + self.cooldown_frames
+                self.last_crossings.append((int(track_ids[moving[r]]), "in" if into else "out", self.gates[g].name))
+                if into:
+                    count_in += 1
+                else:
+                    count_out += 1
+
+        # Anchors only move outside the margin so jitter on a gate cannot flip sides
+        self._anchor[slots[settled]] = points[settled]
+        self._has_anchor[slots[settled]] = True
+        self._last_seen[slots] = self.frame
+        return count_in, count_out
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DIGESTS: Dict[Tuple[str, int, float], str] = {}
+_DIGESTS_LOCK = threading.Lock()
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, memoized on (path, size, mtime) so large videos are read once."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+    with _DIGESTS_LOCK:
+        if memo_key in _DIGESTS:
+            return _DIGESTS[memo_key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _DIGESTS_LOCK:
+        _DIGESTS[memo_key] = digest
+    return digest
+
+def config_digest(config: Dict[str, Any]) -> str:
+    """Order-independent hash of a config dict."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+def cache_key(video_path: str, config: Dict[str, Any], model_path: str) -> str:
+    """Key of a deterministic output: hash of the video bytes, the config and the model weights."""
+    parts = [file_digest(video_path), config_digest(config), file_digest(model_path)]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:24]
+
+class OutputCache:
+    """
+    Directory of finished outputs named by cache key, kept under `max_bytes` by evicting the least
+    recently used files first. Reads refresh a file's mtime, which is what the LRU order is based on.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".mp4"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def temp_path_for(self, key: str) -> str:
+        # Same suffix so VideoWriter picks the right container; the leading dot keeps it out of the cache listing
+        return os.path.join(self.directory, f".{key}.{uuid.uuid4().hex[:8]}.tmp{self.suffix}")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        with self.lock:
+            if not os.path.exists(path):
+                return None
+            os.utime(path)
+        return path
+
+    def put(self, key: str, temp_path: str) -> str:
+        """Moves a finished temp file into the cache, then evicts older entries down to max_bytes."""
+        path = self.path_for(key)
+        with self.lock:
+            os.replace(temp_path, path)
+            os.utime(path)
+        self.evict(protect={path})
+        return path
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(path, size, mtime) of cached files, least recently used first."""
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(".") or not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found.append((path, stat.st_size, stat.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, protect: Optional[set] = None) -> List[str]:
+        """Deletes least recently used entries until the cache fits in max_bytes. Returns the removed paths."""
+        removed = []
+        with self.lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if protect and path in protect:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed.append(path)
+        for path in removed:
+            logger.info(f"Evicted cached output {path}")
+        return removed
+
+@dataclass
+class Job:
+    """One asynchronous render, as reported by the job API."""
+    id: str
+    key: str
+    label: str
+    status: str = "queued"      # queued | running | done | failed
+    frames_done: int = 0
+    total_frames: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+    created: float = 0.0
+    finished: Optional[float] = None
+    output: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("output")
+        data["progress"] = round(self.frames_done / self.total_frames, 4) if self.total_frames else 0.0
+        return data
+
+class JobManager:
+    """
+    Runs renders on a small thread pool, one job per cache key: a request for an output that is
+    already cached completes immediately, and one that is already being rendered joins that job.
+    `render(job, temp_path)` writes the output and updates job.frames_done as it goes.
+    """
+
+    def __init__(self, cache: OutputCache, render: Callable[[Job, str], None], workers: int = 1, history: int = 100):
+        self.cache = cache
+        self.render = render
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="render")
+        self.jobs: Dict[str, Job] = {}
+        self.active: Dict[str, Job] = {}
+        self.history = history
+        self.lock = threading.Lock()
+
+    def submit(self, key: str, total_frames: int = 0, label: str = "") -> Job:
+        with self.lock:
+            if key in self.active:
+                return self.active[key]
+            job = Job(id=uuid.uuid4().hex[:12], key=key, label=label, total_frames=total_frames, created=time.time())
+            cached = self.cache.get(key)
+            if cached:
+                job.status, job.cached, job.output = "done", True, cached
+                job.frames_done, job.finished = total_frames, time.time()
+            else:
+                self.active[key] = job
+                self.executor.submit(self._run, job)
+            self._remember(job)
+            return job
+
+    def _remember(self, job: Job) -> None:
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.history:
+            oldest = next(iter(self.jobs))
+            if self.jobs[oldest].status in ("queued", "running"):
+                break
+            del self.jobs[oldest]
+
+    def _run(self, job: Job) -> None:
+        temp_path = self.cache.temp_path_for(job.key)
+        job.status = "running"
+        try:
+            self.render(job, temp_path)
+            if not os.path.exists(temp_path):
+                raise RuntimeError("Render produced no output")
+            job.output = self.cache.put(job.key, temp_path)
+            job.status = "done"
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            job.finished = time.time()
+            with self.lock:
+                self.active.pop(job.key, None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def file(self, job: Job) -> Optional[str]:
+        """Path of a finished job's output, refreshing its LRU position; None if it was evicted meanwhile."""
+        return self.cache.get(job.key) if job.status == "done" else None
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
@@ -1,6 +1,7 @@
 import logging
+import numpy as np
 from enum import Enum
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +18,157 @@ class Orientation(Enum):
     HORIZONTAL = "horizontal"
     VERTICAL = "vertical"
 
-class LineCrossingDetector:
+class TrackState:
+    """
+    Per-track state kept in parallel NumPy arrays indexed through a dense slot map (track_id -> slot).
+    Cooldowns are stored as the frame on which they expire, and tracks not seen for `ttl_frames`
+    are evicted so memory stays flat on long streams. Subclasses list their arrays in `_STATE`
+    and create them in `_alloc`.
+    """
+
+    _STATE: Tuple[str, ...] = ("_track_id", "_cooldown_until", "_last_seen")
+
+    def __init__(self, cooldown_frames: int = 30, ttl_frames: int = 900, capacity: int = 64):
+        self.cooldown_frames = cooldown_frames
+        self.ttl_frames = ttl_frames
+        self._capacity = capacity
+        self.reset()
+
+    def _alloc(self, capacity: int) -> None:
+        self._track_id = np.zeros(capacity, dtype=np.int64)
+        self._cooldown_until = np.zeros(capacity, dtype=np.int64)  # first frame a new crossing may count
+        self._last_seen = np.zeros(capacity, dtype=np.int64)
+
+    def _clear_slot(self, slot: int) -> None:
+        self._cooldown_until[slot] = 0
+
+    def reset(self) -> None:
+        """Forgets every track."""
+        self.frame = 0
+        self.slots: Dict[int, int] = {}
+        self._free: List[int] = list(range(self._capacity - 1, -1, -1))
+        self._alloc(self._capacity)
+        self.last_crossings = []
+
+    @property
+    def tracks_cooldown(self) -> Dict[int, int]:
+        """Snapshot of {track_id: frames left} for tracks still cooling down."""
+        until = self._cooldown_until if self._cooldown_until.ndim == 1 else self._cooldown_until.max(axis=1)
+        return {tid: int(until[s] - self.frame) for tid, s in self.slots.items() if until[s] > self.frame}
+
+    def _grow(self) -> None:
+        old = len(self._track_id)
+        new = old * 2
+        for name in self._STATE:
+            arr = getattr(self, name)
+            grown = np.zeros((new,) + arr.shape[1:], dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def _slots_for(self, track_ids: np.ndarray) -> np.ndarray:
+        """Returns the slot of each id, allocating slots for unseen tracks."""
+        slots = np.empty(len(track_ids), dtype=np.intp)
+        for i, tid in enumerate(track_ids.tolist()):
+            slot = self.slots.get(tid)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._free.pop()
+                self.slots[tid] = slot
+                self._track_id[slot] = tid
+                self._clear_slot(slot)
+            slots[i] = slot
+        return slots
+
+    def _tick(self) -> None:
+        """Advances the frame clock and periodically evicts stale tracks."""
+        self.frame += 1
+        self.last_crossings = []
+        if self.ttl_frames and self.frame % max(1, self.ttl_frames // 4) == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops tracks unseen for more than ttl_frames whose cooldown has expired. Returns how many."""
+        if not self.slots:
+            return 0
+        used = np.fromiter(self.slots.values(), dtype=np.intp, count=len(self.slots))
+        cooling = self._cooldown_until[used]
+        if cooling.ndim > 1:
+            cooling = cooling.max(axis=1)
+        stale = used[(self.frame - self._last_seen[used] > self.ttl_frames) & (cooling <= self.frame)]
+        for slot in stale.tolist():
+            del self.slots[int(self._track_id[slot])]
+            self._free.append(slot)
+        return len(stale)
+
+class LineCrossingDetector(TrackState):
     """Detects if tracked objects cross a virtual line (horizontal or vertical)."""
+
+    _STATE = TrackState._STATE + ("_side",)
     
-    def __init__(self, line_coord: int, direction: Direction, orientation: Orientation, cooldown_frames: int = 30, line_margin: int = 0):
+    def __init__(self, line_coord: int, direction: Direction, orientation: Orientation, cooldown_frames: int = 30,
+                 line_margin: int = 0, ttl_frames: int = 900, capacity: int = 64):
         self.line_coord = line_coord
         self.direction = direction
         self.orientation = orientation
-        self.cooldown_frames = cooldown_frames
         self.line_margin = line_margin  # pixels: require clear crossing to reduce jitter
-        self.tracks_history: Dict[int, float] = {}
-        self.tracks_cooldown: Dict[int, int] = {}
+        self.count_in_allowed = direction in [Direction.TOP_TO_BOTTOM, Direction.LEFT_TO_RIGHT, Direction.BOTH]
+        self.count_out_allowed = direction in [Direction.BOTTOM_TO_TOP, Direction.RIGHT_TO_LEFT, Direction.BOTH]
+        self.last_crossings: List[Tuple[int, str]] = []  # (track_id, "in" | "out") from the latest update
+        super().__init__(cooldown_frames, ttl_frames, capacity)
+
+    def _alloc(self, capacity: int) -> None:
+        super()._alloc(capacity)
+        self._side = np.zeros(capacity, dtype=np.int8)  # -1 / 1 last side outside the margin, 0 unknown
+
+    def _clear_slot(self, slot: int) -> None:
+        super()._clear_slot(slot)
+        self._side[slot] = 0
+
+    @property
+    def tracks_history(self) -> Dict[int, int]:
+        """Snapshot of {track_id: side} for tracks with a known side."""
+        return {tid: int(self._side[s]) for tid, s in self.slots.items() if self._side[s] != 0}
+
+    def classify(self, coords: np.ndarray) -> np.ndarray:
+        """Side of the line for each coordinate: -1 below the margin, 0 inside it, 1 above it."""
+        m = self.line_margin
+        return np.where(coords < self.line_coord - m, -1, np.where(coords > self.line_coord + m, 1, 0)).astype(np.int8)
+
+    def update_arrays(self, track_ids: Any, coords: Any) -> Tuple[int, int]:
+        """Vectorized update for a whole frame. track_ids: (K,) ints, coords: (K,) center coordinates."""
+        self._tick()
+        track_ids = np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1)
+        if len(track_ids) == 0:
+            return 0, 0
+
+        slots = self._slots_for(track_ids)
+        curr = self.classify(coords)
+        prev = self._side[slots]
+        ready = self._cooldown_until[slots] <= self.frame
+
+        # Crossing from below to above / above to below
+        crossed_in = (prev == -1) & (curr == 1) & ready & self.count_in_allowed
+        crossed_out = (prev == 1) & (curr == -1) & ready & self.count_out_allowed
+        crossed = crossed_in | crossed_out
+
+        if crossed.any():
+            self._cooldown_until[slots[crossed]] = self.frame + self.cooldown_frames
+            for tid, is_in in zip(track_ids[crossed].tolist(), crossed_in[crossed].tolist()):
+                self.last_crossings.append((tid, "in" if is_in else "out"))
+                logger.debug(f"Track {tid} crossed line: {'IN (side -1 -> 1)' if is_in else 'OUT (side 1 -> -1)'}")
+
+        # Only update history outside the margin zone to preserve the previous side
+        self._side[slots] = np.where(curr != 0, curr, prev)
+        self._last_seen[slots] = self.frame
+        return int(crossed_in.sum()), int(crossed_out.sum())
+
+    def update_points(self, track_ids: Any, points: Any) -> Tuple[int, int]:
+        """Same as update_arrays, taking (K, 2) centroids and using the axis the line is on."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return self.update_arrays(track_ids, points[:, 1 if self.orientation == Orientation.HORIZONTAL else 0])
 
     def update(self, tracks: List[Tuple[int, float]]) -> Tuple[int, int]:
         """
@@ -35,48 +176,7 @@ class LineCrossingDetector:
         tracks: List of (track_id, center_coord)
         Returns: (count_in, count_out)
         """
-        count_in = 0
-        count_out = 0
-        m = self.line_margin
-        
-        for track_id in list(self.tracks_cooldown.keys()):
-            self.tracks_cooldown[track_id] -= 1
-            if self.tracks_cooldown[track_id] <= 0:
-                del self.tracks_cooldown[track_id]
-
-        for track_id, curr_coord in tracks:
-            # Determine current side: -1 (below margin), 0 (inside margin), 1 (above margin)
-            if curr_coord < self.line_coord - m:
-                curr_side = -1
-            elif curr_coord > self.line_coord + m:
-                curr_side = 1
-            else:
-                curr_side = 0
-
-            if track_id in self.tracks_history:
-                prev_side = self.tracks_history[track_id]
-                
-                if track_id not in self.tracks_cooldown:
-                    # Crossing from below to above
-                    if prev_side == -1 and curr_side == 1:
-                        if self.direction in [Direction.TOP_TO_BOTTOM, Direction.LEFT_TO_RIGHT, Direction.BOTH]:
-                            count_in += 1
-                            logger.info(f"Track {track_id} crossed line: IN (side -1 -> 1)")
-                            self.tracks_cooldown[track_id] = self.cooldown_frames
-                    
-                    # Crossing from above to below
-                    elif prev_side == 1 and curr_side == -1:
-                        if self.direction in [Direction.BOTTOM_TO_TOP, Direction.RIGHT_TO_LEFT, Direction.BOTH]:
-                            count_out += 1
-                            logger.info(f"Track {track_id} crossed line: OUT (side 1 -> -1)")
-                            self.tracks_cooldown[track_id] = self.cooldown_frames
-                
-                # Only update history if we are outside the margin zone to preserve "prev_side"
-                if curr_side != 0:
-                    self.tracks_history[track_id] = curr_side
-            else:
-                # Initialize history if outside margin
-                if curr_side != 0:
-                    self.tracks_history[track_id] = curr_side
-            
-        return count_in, count_out
+        if not tracks:
+            return self.update_arrays(np.empty(0, dtype=np.int64), np.empty(0))
+        track_ids, coords = zip(*tracks)
+        return self.update_arrays(track_ids, coords)
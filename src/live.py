@@ -0,0 +1,188 @@
+import cv2
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STREAM_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+def is_live_source(source: str, config: Optional[Dict[str, Any]] = None) -> bool:
+    """Camera URLs and device indices are live; a file is only treated as one with `live_source: true`."""
+    if config and config.get('live_source'):
+        return True
+    return source.isdigit() or source.lower().startswith(STREAM_SCHEMES)
+
+def open_capture(source: str, timeout: float = 10.0) -> cv2.VideoCapture:
+    """Opens a stream with open/read timeouts, so a stalled camera fails a read instead of blocking forever."""
+    ms = int(timeout * 1000)
+    params = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, ms]
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source, cv2.CAP_ANY, params)
+    # Keep the backend's own queue as short as it allows; the grabber thread does the rest
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+class LiveSource:
+    """
+    Reads a camera or stream on a grabber thread that keeps only the newest frame, so a slow consumer
+    processes what the camera sees now instead of working through a backlog. A frame replaced before it was
+    read counts as dropped. Each frame gets the wall-clock time it was grabbed. When the stream fails, stalls
+    for `stale_timeout` seconds or ends, the grabber reconnects with exponential backoff
+    (up to `max_reconnects` times in a row; None retries forever).
+
+    It is read like a cv2.VideoCapture: `read()` blocks until a frame newer than the last one is available,
+    and returns (False, None) once the source is released or has given up.
+    """
+
+    def __init__(self, source: str, reconnect_initial: float = 0.5, reconnect_max: float = 30.0,
+                 max_reconnects: Optional[int] = None, stale_timeout: float = 10.0, pace_fps: float = 0.0,
+                 capture_factory: Optional[Callable[[str], Any]] = None, history: int = 256):
+        self.source = source
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.max_reconnects = max_reconnects
+        self.stale_timeout = stale_timeout
+        self.pace = 1.0 / pace_fps if pace_fps > 0 else 0.0  # plays a file stand-in at camera speed
+        self.capture_factory = capture_factory or (lambda src: open_capture(src, stale_timeout))
+        self.history = history
+
+        self.cond = threading.Condition()
+        self.frame: Any = None
+        self.frame_time = 0.0
+        self.seq = 0              # frames grabbed since start
+        self.read_seq = 0         # seq of the frame last handed out
+        self.returned = 0         # frames handed out (the pipeline's frame index)
+        self.times: "OrderedDict[int, float]" = OrderedDict()
+        self.props: Dict[str, Any] = {}
+
+        self.grabbed = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.connected = False
+        self.closed = False
+        self.thread = threading.Thread(target=self._grab_loop, name=f"grabber-{source}", daemon=True)
+
+    def start(self, timeout: float = 30.0) -> bool:
+        """Starts grabbing and waits for the first frame; False if none arrived within `timeout`."""
+        self.thread.start()
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > 0 or self.closed, timeout=timeout)
+            return self.seq > 0
+
+    def _connect(self) -> Optional[Any]:
+        cap = self.capture_factory(self.source)
+        if cap is not None and cap.isOpened():
+            return cap
+        if cap is not None:
+            cap.release()
+        return None
+
+    def _grab_loop(self) -> None:
+        delay = self.reconnect_initial
+        attempts = 0
+        while not self.closed:
+            cap = self._connect()
+            if cap is None:
+                self.failures += 1
+            else:
+                if not self.props:
+                    fps = cap.get(cv2.CAP_PROP_FPS)
+                    # Cameras often report 0 or nonsense; treat the rate as unknown then
+                    self.props["fps"] = fps if 1.0 <= fps <= 240.0 else None
+                self.connected = True
+                logger.info(f"Connected to {self.source}")
+                if self._read_until_failure(cap):
+                    delay, attempts = self.reconnect_initial, 0
+                cap.release()
+                self.connected = False
+            if self.closed:
+                break
+            attempts += 1
+            if self.max_reconnects is not None and attempts > self.max_reconnects:
+                logger.error(f"Giving up on {self.source} after {attempts - 1} reconnect attempt(s)")
+                break
+            logger.warning(f"Lost {self.source}; reconnecting in {delay:.2f}s")
+            with self.cond:
+                self.cond.wait_for(lambda: self.closed, timeout=delay)
+            delay = min(delay * 2, self.reconnect_max)
+            self.reconnects += 1
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def _read_until_failure(self, cap: Any) -> bool:
+        """Grabs until the stream fails (or times out, or a file stand-in ends). True if any frame was read."""
+        got_any = False
+        next_at = time.time()
+        while not self.closed:
+            if self.pace:
+                next_at += self.pace
+                time.sleep(max(0.0, next_at - time.time()))
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                self.failures += 1
+                return got_any
+            got_any = True
+            now = time.time()
+            with self.cond:
+                if self.seq > self.read_seq:
+                    self.dropped += 1  # the previous frame was never read
+                if not self.props.get("width"):
+                    self.props.update(height=frame.shape[0], width=frame.shape[1])
+                self.frame, self.frame_time = frame, now
+                self.seq += 1
+                self.grabbed += 1
+                self.cond.notify_all()
+        return got_any
+
+    def isOpened(self) -> bool:
+        return not self.closed or self.seq > self.read_seq
+
+    def read(self) -> Tuple[bool, Any]:
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > self.read_seq or self.closed)
+            if self.seq <= self.read_seq:
+                return False, None
+            self.read_seq = self.seq
+            self.returned += 1
+            self.times[self.returned] = self.frame_time
+            if len(self.times) > self.history:
+                self.times.popitem(last=False)
+            return True, self.frame
+
+    def timestamp_of(self, frame_idx: int) -> Optional[float]:
+        """Wall-clock grab time of the `frame_idx`-th frame handed out by `read()` (recent frames only)."""
+        return self.times.get(frame_idx)
+
+    def release(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.thread.is_alive() and threading.current_thread() is not self.thread:
+            self.thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "connected": self.connected,
+            "grabbed": self.grabbed,
+            "processed": self.returned,
+            "dropped": self.dropped,
+            "drop_ratio": round(self.dropped / self.grabbed, 4) if self.grabbed else 0.0,
+            "reconnects": self.reconnects,
+            "failures": self.failures
+        }
+
+    @classmethod
+    def from_config(cls, source: str, config: Dict[str, Any]) -> "LiveSource":
+        return cls(
+            source,
+            reconnect_initial=config.get('live_reconnect_initial_s', 0.5),
+            reconnect_max=config.get('live_reconnect_max_s', 30.0),
+            max_reconnects=config.get('live_max_reconnects'),
+            stale_timeout=config.get('live_stale_timeout_s', 10.0),
+            pace_fps=config.get('live_pace_fps', 0.0)
+        )
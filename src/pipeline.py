@@ -0,0 +1,522 @@
+import os
+import cv2
+import time
+import queue
+import logging
+import threading
+import numpy as np
+from enum import Enum
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .association import Association
+from .events import CrossingEvent, EventLogWriter
+from .encoding import StreamTier, TierEncoder
+from .live import LiveSource, is_live_source
+from .profiling import Profiler
+from .utils import create_output_writer
+from .video_io import VideoIOOptions, open_video
+
+logger = logging.getLogger(__name__)
+
+class SinkNeeds(Enum):
+    EVENTS = "events"        # counts and crossings only, no pixels
+    RAW = "raw"              # the decoded frame, untouched
+    ANNOTATED = "annotated"  # the frame with detections and HUD drawn
+
+@dataclass
+class FrameResult:
+    """Everything the counting core produced for one frame."""
+    frame_idx: int
+    frame: Any
+    count_in: int = 0          # running totals
+    count_out: int = 0
+    crossed_in: int = 0        # crossings registered on this frame
+    crossed_out: int = 0
+    skipped: bool = False      # detection was skipped by the motion scheduler
+    gate_counts: Optional[Dict[str, Dict[str, int]]] = None  # running per-gate totals when gates are configured
+    events: List[CrossingEvent] = field(default_factory=list)
+    boxes: Optional[np.ndarray] = None
+    track_ids: Optional[np.ndarray] = None
+    person_idx: Optional[np.ndarray] = None
+    bag_idx: Optional[np.ndarray] = None
+    association: Optional[Association] = None
+    annotated: Any = None
+    encoded: Optional[bytes] = None  # multipart JPEG chunk, set by MJPEGSink
+
+class FrameSink:
+    """Base class for pipeline outputs. Subclasses declare what they consume via `needs`."""
+    needs = SinkNeeds.EVENTS
+    done = False  # set to True to ask the pipeline to stop early
+
+    def open(self, props: Dict[str, Any]) -> None:
+        pass
+
+    def consume(self, result: FrameResult) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class CountSink(FrameSink):
+    """Keeps only the final counts."""
+
+    def __init__(self):
+        self.counts = {"in": 0, "out": 0}
+
+    def consume(self, result: FrameResult) -> None:
+        self.counts = {"in": result.count_in, "out": result.count_out}
+
+class VideoWriterSink(FrameSink):
+    """Writes annotated frames to a video file."""
+    needs = SinkNeeds.ANNOTATED
+
+    def __init__(self, video_path: str, output_path: str, options: Optional[VideoIOOptions] = None):
+        self.video_path = video_path
+        self.output_path = output_path
+        self.options = options
+        self.writer = None
+
+    def open(self, props: Dict[str, Any]) -> None:
+        # Live sources may not know their frame rate
+        self.writer = create_output_writer(self.video_path, self.output_path, props['fps'] or 25.0,
+                                           props['width'], props['height'], self.options)
+
+    def consume(self, result: FrameResult) -> None:
+        self.writer.write(result.annotated)
+
+    def close(self) -> None:
+        if self.writer:
+            self.writer.release()
+            self.writer = None
+
+class MJPEGSink(FrameSink):
+    """Encodes annotated frames as multipart JPEG chunks; the latest one is kept in `chunk`."""
+    needs = SinkNeeds.ANNOTATED
+
+    def __init__(self, tier: Optional[StreamTier] = None):
+        self.encoder = TierEncoder(tier or StreamTier())
+        self.chunk = None
+
+    def consume(self, result: FrameResult) -> None:
+        self.chunk = self.encoder.encode(result.annotated)
+        result.encoded = self.chunk
+
+class AnnotatedFrameSink(FrameSink):
+    """Turns drawing on for callers that take `result.annotated` straight from `run()`."""
+    needs = SinkNeeds.ANNOTATED
+
+class PreviewSink(FrameSink):
+    """Shows annotated frames in an OpenCV window; pressing 'q' stops the pipeline."""
+    needs = SinkNeeds.ANNOTATED
+
+    def consume(self, result: FrameResult) -> None:
+        cv2.imshow("AI-BagCounter", result.annotated)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self.done = True
+
+    def close(self) -> None:
+        cv2.destroyAllWindows()
+
+class EventLogSink(FrameSink):
+    """Collects structured crossing events and, given a path, writes them to a new columnar event log."""
+
+    def __init__(self, path: Optional[str] = None, chunk_size: int = 1024, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.meta = meta
+        self.writer: Optional[EventLogWriter] = None
+        self.events: List[Dict[str, Any]] = []
+
+    def open(self, props: Dict[str, Any]) -> None:
+        if self.path:
+            self.writer = EventLogWriter(self.path, chunk_size=self.chunk_size, meta={**(self.meta or {}), **props})
+
+    def consume(self, result: FrameResult) -> None:
+        for event in result.events:
+            self.events.append(event.to_dict())
+            if self.writer:
+                self.writer.append(event)
+
+    def close(self) -> None:
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+class UpdateSink(FrameSink):
+    """
+    Pushes running totals and crossing events to `publish` as they happen, e.g. for Server-Sent Events.
+    A "start" message opens the run. After that, a "counts" message (totals plus this frame's deltas) is
+    sent only on frames where something crossed, followed by one "crossing" message per event.
+    `tags` (scenario, session) are added to every message.
+    """
+
+    def __init__(self, publish: Callable[[Dict[str, Any]], None], tags: Optional[Dict[str, Any]] = None):
+        self.publish = publish
+        self.tags = tags or {}
+
+    def open(self, props: Dict[str, Any]) -> None:
+        self.publish({"type": "start", **self.tags, **props})
+
+    def consume(self, result: FrameResult) -> None:
+        if not (result.crossed_in or result.crossed_out or result.events):
+            return
+        message = {
+            "type": "counts", **self.tags,
+            "frame_idx": result.frame_idx,
+            "in": result.count_in,
+            "out": result.count_out,
+            "total": result.count_in + result.count_out,
+            "delta_in": result.crossed_in,
+            "delta_out": result.crossed_out
+        }
+        if result.gate_counts is not None:
+            message["gates"] = result.gate_counts
+        self.publish(message)
+        for event in result.events:
+            self.publish({"type": "crossing", **self.tags, **event.to_dict()})
+
+class ProgressSink(FrameSink):
+    """Reports the index of every processed frame to `callback`, e.g. for a job's progress bar."""
+
+    def __init__(self, callback: Callable[[int], None]):
+        self.callback = callback
+
+    def consume(self, result: FrameResult) -> None:
+        self.callback(result.frame_idx)
+
+class StageTimer:
+    """Accumulates busy time and frame count for one pipeline stage."""
+
+    def __init__(self):
+        self.frames = 0
+        self.busy = 0.0
+
+    def add(self, seconds: float, frames: int = 1) -> None:
+        self.frames += frames
+        self.busy += seconds
+
+    def summary(self) -> Dict[str, float]:
+        ms = self.busy / self.frames * 1000.0 if self.frames else 0.0
+        return {"frames": self.frames, "busy_s": round(self.busy, 4), "ms_per_frame": round(ms, 3)}
+
+class FramePipeline:
+    """
+    Single read -> track -> associate -> cross -> draw loop shared by every BagCounter output.
+    Drawing only happens when an attached sink needs annotated frames.
+    With a `profiler`, stage latencies are also kept per call, down to the model, association, crossing,
+    drawing and each sink.
+    """
+    stages = ("decode", "infer", "render")
+
+    def __init__(self, counter: Any, sinks: List[FrameSink], batch_size: int = 1, max_batch_latency_ms: float = 200.0,
+                 profiler: Optional[Profiler] = None):
+        self.counter = counter
+        self.sinks = sinks
+        self.needs = {s.needs for s in sinks}
+        self.timers = {name: StageTimer() for name in self.stages}
+        self.profiler = profiler
+        # Frames are grouped for one detection pass until the batch is full or the oldest
+        # frame has waited max_batch_latency_ms.
+        self.batch_size = max(1, batch_size)
+        self.max_batch_latency = max_batch_latency_ms / 1000.0
+        self.source: Optional[LiveSource] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage timings; the stage with the highest ms_per_frame limits throughput."""
+        stats = {"stages": {name: t.summary() for name, t in self.timers.items()}}
+        if getattr(self.counter, 'scheduler', None):
+            stats["motion"] = self.counter.scheduler.stats()
+        if getattr(self.counter, 'resolution', None):
+            stats["resolution"] = self.counter.resolution.stats()
+        if self.source is not None:
+            stats["source"] = self.source.stats()
+        if self.profiler is not None:
+            stats["profile"] = self.profiler.summary()
+        return stats
+
+    def _open(self, video_path: str) -> Optional[Any]:
+        config = getattr(self.counter, 'config', {})
+        self.source = None
+        if is_live_source(video_path, config):
+            self.source = LiveSource.from_config(video_path, config)
+            if not self.source.start(timeout=config.get('live_open_timeout_s', 30.0)):
+                logger.error(f"No frames from live source {video_path}")
+                self.source.release()
+                return None
+            # Live streams have no length, and their frame rate is often unknown
+            props = {**self.source.props, "total_frames": 0, "live": True}
+            self.counter.setup(props['width'], props['height'], props['fps'], clock=self.source.timestamp_of)
+        else:
+            if not os.path.exists(video_path):
+                logger.error(f"Video not found: {video_path}")
+                return None
+            cap = open_video(video_path, VideoIOOptions.from_config(config))
+            props = cap.props
+            self.counter.setup(props['width'], props['height'], props['fps'], video_path=video_path)
+        self.timers = {name: StageTimer() for name in self.stages}
+        self._frames_read = 0
+        self._eof = False
+
+        self._annotate = SinkNeeds.ANNOTATED in self.needs
+        # Drawing is in place, so keep a clean copy only if someone wants both versions
+        self._copy_raw = self._annotate and SinkNeeds.RAW in self.needs
+
+        for sink in self.sinks:
+            sink.open(props)
+        if self.profiler is not None:
+            self.profiler.start(self.counter, self.sinks, video_path)
+        if self.source is not None:
+            return self.source
+        # Replayed tracks need no pixels unless a sink does, so decoding is skipped entirely
+        replay = getattr(self.counter, 'replay', None)
+        if replay is not None and not self._annotate and SinkNeeds.RAW not in self.needs:
+            cap.release()
+            return replay.capture()
+        return cap
+
+    def _close(self, cap: Any) -> None:
+        cap.release()
+        finish = getattr(self.counter, 'finish_video', None)
+        if finish:
+            finish(self._frames_read if self._eof else None)
+        for sink in self.sinks:
+            sink.close()
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def _read(self, cap: Any) -> Optional[Any]:
+        start = time.perf_counter()
+        success, frame = cap.read()
+        if not success:
+            self._eof = True
+            return None
+        self._frames_read += 1
+        elapsed = time.perf_counter() - start
+        self.timers["decode"].add(elapsed)
+        if self.profiler is not None:
+            self.profiler.add("decode", elapsed)
+        return frame
+
+    def _infer(self, batch: List[Tuple[int, Any]]) -> List[FrameResult]:
+        start = time.perf_counter()
+        # A batched run sends every batch, even a partial one, through the batch path, so one tracker sees all frames
+        if self.batch_size == 1:
+            frame_idx, frame = batch[0]
+            results = [self.counter.process_frame(frame, frame_idx)]
+        else:
+            results = self.counter.process_frames([frame for _, frame in batch], batch[0][0])
+        elapsed = time.perf_counter() - start
+        self.timers["infer"].add(elapsed, len(batch))
+        if self.profiler is not None:
+            self.profiler.add("infer", elapsed)
+        return results
+
+    def _batch_due(self, batch: List[Tuple[int, Any]], started: float) -> bool:
+        return len(batch) >= self.batch_size or time.perf_counter() - started >= self.max_batch_latency
+
+    def _render(self, result: FrameResult) -> None:
+        start = time.perf_counter()
+        if self._annotate:
+            canvas = result.frame.copy() if self._copy_raw else result.frame
+            result.annotated = self.counter.annotate(canvas, result)
+
+        for sink in self.sinks:
+            sink.consume(result)
+        elapsed = time.perf_counter() - start
+        self.timers["render"].add(elapsed)
+        if self.profiler is not None:
+            self.profiler.add("render", elapsed)
+            self.profiler.frame()
+
+    def run(self, video_path: str) -> Iterator[FrameResult]:
+        """Processes the video, feeding every sink, and yields each FrameResult after the sinks saw it."""
+        cap = self._open(video_path)
+        if cap is None:
+            return
+
+        frame_idx = 0
+        batch: List[Tuple[int, Any]] = []
+        started = 0.0
+        try:
+            while cap.isOpened():
+                frame = self._read(cap)
+                if frame is None:
+                    break
+
+                frame_idx += 1
+                if not batch:
+                    started = time.perf_counter()
+                batch.append((frame_idx, frame))
+                if not self._batch_due(batch, started):
+                    continue
+
+                for result in self._infer(batch):
+                    self._render(result)
+                    yield result
+                    if any(s.done for s in self.sinks):
+                        return
+                batch = []
+
+            for result in self._infer(batch) if batch else []:
+                self._render(result)
+                yield result
+                if any(s.done for s in self.sinks):
+                    return
+        finally:
+            self._close(cap)
+
+_END = object()
+
+class ThreadedFramePipeline(FramePipeline):
+    """
+    Runs decode, inference and render/encode on separate threads joined by bounded queues.
+    Inference stays on a single thread and sees frames in order, so ByteTrack's persisted
+    state is exactly what the sequential pipeline would build.
+    """
+
+    def __init__(self, counter: Any, sinks: List[FrameSink], queue_size: int = 4, batch_size: int = 1,
+                 max_batch_latency_ms: float = 200.0, profiler: Optional[Profiler] = None):
+        super().__init__(counter, sinks, batch_size=batch_size, max_batch_latency_ms=max_batch_latency_ms,
+                         profiler=profiler)
+        self.queue_size = queue_size
+        self.queues: Dict[str, queue.Queue] = {}
+        self._depths: Dict[str, tuple] = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage timings plus queue depths. A queue that sits full means the stage after it is the bottleneck."""
+        stats = super().stats()
+        stats["queues"] = {}
+        for name, q in self.queues.items():
+            total, samples, peak = self._depths[name]
+            stats["queues"][name] = {
+                "depth": q.qsize(),
+                "mean_depth": round(total / samples, 2) if samples else 0.0,
+                "max_depth": peak,
+                "capacity": q.maxsize
+            }
+        return stats
+
+    def _put(self, name: str, item: Any, stop: threading.Event) -> bool:
+        # Blocking put that gives up once the pipeline is being torn down
+        q = self.queues[name]
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            depth = q.qsize()
+            total, samples, peak = self._depths[name]
+            self._depths[name] = (total + depth, samples + 1, max(peak, depth))
+            return True
+        return False
+
+    def _get(self, q: queue.Queue, stop: threading.Event) -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def run(self, video_path: str) -> Iterator[FrameResult]:
+        cap = self._open(video_path)
+        if cap is None:
+            return
+
+        self.queues = {
+            "decoded": queue.Queue(maxsize=self.queue_size),
+            "inferred": queue.Queue(maxsize=self.queue_size),
+            "rendered": queue.Queue(maxsize=self.queue_size)
+        }
+        self._depths = {name: (0, 0, 0) for name in self.queues}
+        decoded, inferred, rendered = self.queues["decoded"], self.queues["inferred"], self.queues["rendered"]
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        def stage(body):
+            def target():
+                try:
+                    body()
+                except BaseException as e:
+                    errors.append(e)
+                    stop.set()
+            return threading.Thread(target=target, daemon=True)
+
+        def reader():
+            frame_idx = 0
+            while cap.isOpened() and not stop.is_set():
+                frame = self._read(cap)
+                if frame is None:
+                    break
+                frame_idx += 1
+                if not self._put("decoded", (frame_idx, frame), stop):
+                    return
+            self._put("decoded", _END, stop)
+
+        def inference():
+            done = False
+            while not done:
+                item = self._get(decoded, stop)
+                if item is _END:
+                    break
+                batch, started = [item], time.perf_counter()
+                while not self._batch_due(batch, started):
+                    try:
+                        wait = self.max_batch_latency - (time.perf_counter() - started)
+                        item = decoded.get(timeout=max(wait, 0.001))
+                    except queue.Empty:
+                        break
+                    if item is _END:
+                        done = True
+                        break
+                    batch.append(item)
+                for result in self._infer(batch):
+                    if not self._put("inferred", result, stop):
+                        return
+            self._put("inferred", _END, stop)
+
+        def renderer():
+            while True:
+                result = self._get(inferred, stop)
+                if result is _END:
+                    break
+                self._render(result)
+                if not self._put("rendered", result, stop):
+                    return
+            self._put("rendered", _END, stop)
+
+        threads = [stage(reader), stage(inference), stage(renderer)]
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                result = self._get(rendered, stop)
+                if result is _END:
+                    break
+                yield result
+                if any(s.done for s in self.sinks):
+                    break
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+            self._close(cap)
+
+        if errors:
+            raise errors[0]
+
+def make_pipeline(counter: Any, sinks: List[FrameSink], config: Dict[str, Any]) -> FramePipeline:
+    """Builds the pipeline selected by `pipeline_mode` (sequential | threaded), profiled when `profiling` is on."""
+    options = {
+        "batch_size": config.get('batch_size', 1),
+        "max_batch_latency_ms": config.get('batch_max_latency_ms', 200.0),
+        "profiler": Profiler.from_config(config)
+    }
+    if config.get('pipeline_mode', 'sequential') == 'threaded':
+        if any(isinstance(s, PreviewSink) for s in sinks):
+            # HighGUI windows must be driven from the main thread
+            logger.warning("show_preview is not supported in threaded mode; using the sequential pipeline")
+            return FramePipeline(counter, sinks, **options)
+        return ThreadedFramePipeline(counter, sinks, queue_size=config.get('queue_size', 4), **options)
+    return FramePipeline(counter, sinks, **options)
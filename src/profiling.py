@@ -0,0 +1,269 @@
+import os
+import re
+import sys
+import time
+import logging
+import threading
+import numpy as np
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_STAGES = ("decode", "infer", "render")  # timed by the pipeline; together they are all the work per frame
+MODEL_STAGE = "model"                            # TrackerWrapper.track / track_batch, inside "infer"
+
+class StageStats:
+    """Call count and total time for one stage, plus its last `window` durations for rolling percentiles."""
+    __slots__ = ("window", "samples", "calls", "total")
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.samples = np.zeros(window)
+        self.calls = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.samples[self.calls % self.window] = seconds
+        self.calls += 1
+        self.total += seconds
+
+    def summary(self) -> Dict[str, float]:
+        recent = self.samples[:min(self.calls, self.window)] * 1000.0
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0, 0.0, 0.0)
+        return {
+            "calls": self.calls,
+            "total_s": round(self.total, 4),
+            "mean_ms": round(self.total / self.calls * 1000.0, 3) if self.calls else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3)
+        }
+
+class StackSampler:
+    """
+    Records every other thread's Python stack each `interval` seconds, as folded stacks: one
+    `thread;outer;...;inner count` line per distinct stack, the input of flamegraph.pl, inferno and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """
+    Per-stage latency for one pipeline run. The pipeline reports its decode / infer / render stages; `start`
+    wraps the counter's model call, association, line crossing and drawing, and every sink's `consume`
+    (JPEG encoding, video writing), in timers, and `stop` unwraps them. A pipeline built without a profiler
+    never wraps anything, so disabled profiling costs nothing.
+
+    With `profile_frames` set, a StackSampler runs for that many frames from the start of the run and its
+    folded stacks are written to `profile_path` (default `output_dir/profile_<video>.folded`).
+    """
+
+    def __init__(self, window: int = 1024, profile_frames: int = 0, profile_interval: float = 0.005,
+                 profile_path: Optional[str] = None, output_dir: str = "outputs"):
+        self.window = window
+        self.profile_frames = profile_frames
+        self.profile_interval = profile_interval
+        self.profile_path = profile_path
+        self.output_dir = output_dir
+        self.stages: Dict[str, StageStats] = {}
+        self.frames = 0
+        self.first_frame_at: Optional[float] = None
+        self.last_frame_at: Optional[float] = None
+        self.sampler: Optional[StackSampler] = None
+        self.written: Optional[str] = None
+        self._wrapped: List[Tuple[Any, str]] = []
+        self._path: Optional[str] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats(self.window)
+        stats.add(seconds)
+
+    def _wrap(self, obj: Any, name: str, stage: str) -> None:
+        # Wraps the class's method, so starting again replaces rather than stacks a previous wrapper
+        method = getattr(type(obj), name).__get__(obj, type(obj))
+        add, clock = self.add, time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                add(stage, clock() - start)
+
+        setattr(obj, name, timed)
+        self._wrapped.append((obj, name))
+
+    def start(self, counter: Any, sinks: List[Any], video_path: Optional[str] = None) -> None:
+        """Resets the statistics and instruments a counter that has been set up for the video."""
+        self.stop()
+        self.stages = {}
+        self.frames = 0
+        self.first_frame_at = self.last_frame_at = None
+        self.written = None
+
+        tracker, detector = getattr(counter, 'tracker', None), getattr(counter, 'detector', None)
+        for obj, name, stage in ((tracker, "track", MODEL_STAGE), (tracker, "track_batch", MODEL_STAGE),
+                                 (counter, "_associate_tracks", "associate"), (detector, "update_points", "cross"),
+                                 (counter, "annotate", "draw")):
+            if obj is not None and hasattr(type(obj), name):
+                self._wrap(obj, name, stage)
+        for sink in sinks:
+            self._wrap(sink, "consume", f"sink:{type(sink).__name__}")
+
+        if self.profile_frames > 0:
+            stem = os.path.splitext(os.path.basename(str(video_path or "run")))[0]
+            name = re.sub(r"[^A-Za-z0-9.-]+", "_", stem).strip("_") or "run"
+            self._path = self.profile_path or os.path.join(self.output_dir, f"profile_{name}.folded")
+            self.sampler = StackSampler(self.profile_interval)
+            self.sampler.start()
+
+    def frame(self) -> None:
+        """Marks one frame as fully processed."""
+        now = time.perf_counter()
+        if self.first_frame_at is None:
+            self.first_frame_at = now
+        self.last_frame_at = now
+        self.frames += 1
+        if self.sampler is not None and self.frames >= self.profile_frames:
+            self._finish_sampling()
+
+    def _finish_sampling(self) -> None:
+        sampler, self.sampler = self.sampler, None
+        sampler.stop()
+        sampler.write(self._path)
+        self.written = self._path
+        logger.info(f"Wrote {sampler.samples} stack samples over {self.frames} frames to {self._path}")
+
+    def stop(self) -> None:
+        """Removes the timers from the counter and sinks, and writes the stack profile if one is still running."""
+        for obj, name in self._wrapped:
+            obj.__dict__.pop(name, None)
+        self._wrapped = []
+        if self.sampler is not None:
+            self._finish_sampling()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Stage percentiles, end-to-end frames per second, and model vs. host time: model is the tracker call,
+        host everything else the pipeline stages spent (decode, association, crossing, drawing, sinks).
+        """
+        elapsed = (self.last_frame_at - self.first_frame_at) if self.frames > 1 else 0.0
+        model = self.stages[MODEL_STAGE].total if MODEL_STAGE in self.stages else 0.0
+        busy = sum(self.stages[s].total for s in PIPELINE_STAGES if s in self.stages)
+        summary = {
+            "frames": self.frames,
+            "fps": round((self.frames - 1) / elapsed, 2) if elapsed > 0 else 0.0,
+            "stages": {name: stats.summary() for name, stats in self.stages.items()},
+            "model_s": round(model, 4),
+            "host_s": round(max(busy - model, 0.0), 4),
+            "model_fraction": round(model / busy, 3) if busy else 0.0
+        }
+        if self.written:
+            summary["stack_profile"] = self.written
+        return summary
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["Profiler"]:
+        """A profiler when `profiling` is on, else None."""
+        if not config.get('profiling'):
+            return None
+        return cls(
+            window=config.get('profile_window', 1024),
+            profile_frames=config.get('profile_frames', 0),
+            profile_interval=config.get('profile_interval_ms', 5.0) / 1000.0,
+            profile_path=config.get('profile_output'),
+            output_dir=config.get('output_dir', 'outputs')
+        )
+
+def _labels(**labels: Any) -> str:
+    def escape(value: Any) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+def prometheus_text(sources: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Renders pipeline `stats()` per source (e.g. per scenario) in the Prometheus text exposition format:
+    stage busy time and frames, queue depths, and with profiling on, stage latency quantiles, fps and
+    model vs. host time.
+    """
+    metrics: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def emit(name: str, kind: str, help_text: str, labels: Dict[str, Any], value: float) -> None:
+        metrics.setdefault(name, (kind, help_text, []))[2].append(f"{name}{_labels(**labels)} {value}")
+
+    for source, stats in sources.items():
+        for stage, s in stats.get("stages", {}).items():
+            emit("bagcounter_stage_busy_seconds_total", "counter", "Time spent in each pipeline stage",
+                 {"source": source, "stage": stage}, s["busy_s"])
+            emit("bagcounter_stage_frames_total", "counter", "Frames through each pipeline stage",
+                 {"source": source, "stage": stage}, s["frames"])
+        for name, q in stats.get("queues", {}).items():
+            emit("bagcounter_queue_depth", "gauge", "Items waiting between threaded stages",
+                 {"source": source, "queue": name}, q["depth"])
+            emit("bagcounter_queue_max_depth", "gauge", "Deepest a stage queue has been this run",
+                 {"source": source, "queue": name}, q["max_depth"])
+            emit("bagcounter_queue_capacity", "gauge", "Bound of each stage queue",
+                 {"source": source, "queue": name}, q["capacity"])
+        profile = stats.get("profile")
+        if not profile:
+            continue
+        for stage, s in profile["stages"].items():
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                emit("bagcounter_stage_latency_seconds", "summary", "Per-call stage latency over the recent window",
+                     {"source": source, "stage": stage, "quantile": quantile}, s[key] / 1000.0)
+            metrics["bagcounter_stage_latency_seconds"][2].extend([
+                f"bagcounter_stage_latency_seconds_sum{_labels(source=source, stage=stage)} {s['total_s']}",
+                f"bagcounter_stage_latency_seconds_count{_labels(source=source, stage=stage)} {s['calls']}"
+            ])
+        emit("bagcounter_fps", "gauge", "Frames fully processed per second", {"source": source}, profile["fps"])
+        emit("bagcounter_model_seconds_total", "counter", "Time spent in the model (tracker) call",
+             {"source": source}, profile["model_s"])
+        emit("bagcounter_host_seconds_total", "counter", "Pipeline time outside the model call",
+             {"source": source}, profile["host_s"])
+
+    lines = []
+    for name, (kind, help_text, samples) in metrics.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
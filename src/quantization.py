@@ -0,0 +1,211 @@
+import os
+import re
+import json
+import time
+import logging
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+from .backends import Backend, Preprocessor, export_model, require
+from .calibration import GroundTruth, score_trial
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp16", "int8")
+
+def variant_path(weights: str, precision: str, imgsz: int = 640) -> str:
+    """Where the `precision` variant of `weights` lives: next to them, like the FP32 export."""
+    return f"{os.path.splitext(weights)[0]}_{imgsz}_{precision}.onnx"
+
+def registry_path(weights: str) -> str:
+    return f"{os.path.splitext(weights)[0]}_variants.json"
+
+def load_registry(weights: str) -> Dict[str, Any]:
+    path = registry_path(weights)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def resolve_model(weights: str, precision: Optional[str] = "fp32", imgsz: int = 640) -> str:
+    """
+    The model file to load for `model_precision`. FP32 is the weights themselves; a reduced-precision
+    variant is only returned once the accuracy gate accepted it for these weights and input size.
+    """
+    if not precision or precision == "fp32":
+        return weights
+    if precision not in PRECISIONS:
+        raise ValueError(f"model_precision must be fp32, {' or '.join(PRECISIONS)}, got {precision!r}")
+    entry = load_registry(weights).get(f"{precision}_{imgsz}")
+    if not entry or entry.get("status") != "accepted" or not os.path.exists(entry["path"]):
+        reason = f" (rejected: {entry['reason']})" if entry and entry.get("status") == "rejected" else ""
+        raise ValueError(f"No accepted {precision} variant of {weights} at {imgsz}px{reason}; "
+                         f"run scripts/quantize.py first")
+    return entry["path"]
+
+def register_variant(weights: str, precision: str, imgsz: int, entry: Dict[str, Any]) -> None:
+    registry = load_registry(weights)
+    registry[f"{precision}_{imgsz}"] = {**entry, "updated": time.time()}
+    temp = f"{registry_path(weights)}.tmp"
+    with open(temp, "w") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(temp, registry_path(weights))
+
+def sample_frames(videos: Sequence[str], count: int) -> List[np.ndarray]:
+    """`count` frames spread evenly over all the videos, so calibration sees every camera and lighting."""
+    per_video = max(1, count // max(len(videos), 1))
+    frames = []
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for index in np.unique(np.linspace(0, max(total - 1, 0), per_video).astype(int)):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ok, frame = cap.read()
+            if ok:
+                frames.append(frame)
+        cap.release()
+    return frames[:count]
+
+def _calibration_reader(frames: List[np.ndarray], input_name: str, imgsz: int) -> Any:
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class FrameReader(CalibrationDataReader):
+        """Feeds the sampled frames through the same letterbox as inference, one at a time."""
+
+        def __init__(self):
+            self.frames = iter(frames)
+            self.preprocess = Preprocessor(imgsz)
+
+        def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+            frame = next(self.frames, None)
+            if frame is None:
+                return None
+            return {input_name: self.preprocess([frame])[0].copy()}
+
+    return FrameReader()
+
+def head_nodes(model: Any) -> List[str]:
+    """
+    Non-convolution nodes of the last module (the YOLOv8 Detect head): the DFL box decode and the class
+    sigmoid. They hold pixel-scale values that INT8 cannot represent, so they stay in float.
+    """
+    modules = [int(m.group(1)) for node in model.graph.node if (m := re.match(r"/model\.(\d+)/", node.name))]
+    if not modules:
+        return []
+    prefix = f"/model.{max(modules)}/"
+    return [n.name for n in model.graph.node
+            if n.name.startswith(prefix) and n.op_type != "Conv" and "/cv2." not in n.name and "/cv3." not in n.name]
+
+def quantize_int8(fp32_path: str, out_path: str, frames: List[np.ndarray], imgsz: int = 640) -> str:
+    """Static INT8 quantization (QDQ, per-channel weights) calibrated with min/max ranges on `frames`."""
+    import onnx
+    require(Backend.ONNX)
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+    model = onnx.load(fp32_path)
+    quantize_static(
+        fp32_path, out_path, _calibration_reader(frames, model.graph.input[0].name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=head_nodes(model)
+    )
+    return out_path
+
+def convert_fp16(fp32_path: str, out_path: str) -> str:
+    """Half-precision weights and activations, keeping float32 inputs and outputs."""
+    import onnx
+    require(Backend.ONNX)
+    from onnxruntime.transformers.float16 import convert_float_to_float16
+
+    onnx.save(convert_float_to_float16(onnx.load(fp32_path), keep_io_types=True), out_path)
+    return out_path
+
+def run_model(video: str, model_path: str, config: Dict[str, Any], event_log: Optional[str] = None) -> Dict[str, Any]:
+    """Counts one video with an ONNX model; returns the totals, crossing events and FPS."""
+    from .counter import BagCounter
+    from .pipeline import CountSink, EventLogSink, FramePipeline
+
+    counter = BagCounter({**config, 'model': model_path, 'model_precision': 'fp32', 'inference_backend': 'onnx',
+                          'track_cache_dir': None, 'show_preview': False})
+    events = EventLogSink(event_log)
+    frames = 0
+    start = time.perf_counter()
+    for _ in FramePipeline(counter, [CountSink(), events]).run(video):
+        frames += 1
+    seconds = time.perf_counter() - start
+    return {
+        "in": counter.count_in,
+        "out": counter.count_out,
+        "events": [(e["frame_idx"], e["direction"]) for e in events.events],
+        "fps": round(frames / seconds, 2) if seconds > 0 else 0.0
+    }
+
+def compare(baseline: Dict[str, Any], variant: Dict[str, Any], tolerance: int) -> Dict[str, Any]:
+    """Count drift and crossing-by-crossing agreement of a variant's run, taking the FP32 run as the truth."""
+    truth = GroundTruth(count_in=baseline["in"], count_out=baseline["out"], events=baseline["events"])
+    metrics = score_trial(variant["in"], variant["out"], variant["events"], truth, tolerance)
+    return {"count_drift": metrics["count_error"], "event_f1": metrics["f1"],
+            "in": variant["in"], "out": variant["out"], "fps": variant["fps"]}
+
+def judge(results: List[Dict[str, Any]], max_count_drift: int, min_event_f1: float) -> Optional[str]:
+    """None if the variant passes on every video, otherwise why it was rejected."""
+    drift = sum(r["count_drift"] for r in results)
+    if drift > max_count_drift:
+        return f"count drift {drift} > {max_count_drift}"
+    worst = min((r["event_f1"] for r in results), default=1.0)
+    if worst < min_event_f1:
+        return f"event F1 {worst:.3f} < {min_event_f1}"
+    return None
+
+def quantize_and_gate(weights: str, videos: Sequence[str], config: Dict[str, Any],
+                      precisions: Sequence[str] = PRECISIONS, calibration_frames: int = 200,
+                      event_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Builds each reduced-precision variant of `weights`, counts every video with it and with the FP32 export,
+    and registers the variant as accepted only if its counts and crossings stay within the configured
+    tolerances. A rejected variant's file is deleted so it cannot be loaded by mistake.
+    With `event_dir`, every run's crossing log is kept there for scripts/evaluate_bag_metrics.py.
+    """
+    imgsz = config.get('imgsz', 640)
+    tolerance = config.get('quantization_event_tolerance', 5)
+    max_drift = config.get('quantization_max_count_drift', 0)
+    min_f1 = config.get('quantization_min_event_f1', 0.95)
+    fp32 = export_model(weights, Backend.ONNX, imgsz)
+
+    def log_path(name: str, video: str) -> Optional[str]:
+        if not event_dir:
+            return None
+        return os.path.join(event_dir, name, f"events_{os.path.splitext(os.path.basename(video))[0]}")
+
+    baseline = {video: run_model(video, fp32, config, log_path("fp32", video)) for video in videos}
+    report: Dict[str, Any] = {
+        "weights": weights, "imgsz": imgsz,
+        "baseline": {os.path.basename(v): {k: r[k] for k in ("in", "out", "fps")} for v, r in baseline.items()},
+        "variants": {}
+    }
+    frames = sample_frames(videos, calibration_frames) if "int8" in precisions else []
+    for precision in precisions:
+        path = variant_path(weights, precision, imgsz)
+        start = time.perf_counter()
+        if precision == "int8":
+            quantize_int8(fp32, path, frames, imgsz)
+        else:
+            convert_fp16(fp32, path)
+        build_seconds = time.perf_counter() - start
+
+        results = [{"video": os.path.basename(video),
+                    **compare(baseline[video], run_model(video, path, config, log_path(precision, video)), tolerance)}
+                   for video in videos]
+        reason = judge(results, max_drift, min_f1)
+        entry = {"path": path, "status": "rejected" if reason else "accepted", "reason": reason,
+                 "size_mb": round(os.path.getsize(path) / 2 ** 20, 2), "build_seconds": round(build_seconds, 2),
+                 "calibration_frames": len(frames) if precision == "int8" else None, "results": results}
+        if reason:
+            os.remove(path)
+            logger.warning(f"Rejected {precision} variant of {weights}: {reason}")
+        register_variant(weights, precision, imgsz, entry)
+        report["variants"][precision] = entry
+    return report
@@ -0,0 +1,124 @@
+import logging
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STRIDE = 32  # YOLOv8 input sizes must be multiples of the largest feature stride
+
+@dataclass
+class ResolutionDecision:
+    """One input-size change: when it was decided and applied, and what triggered it."""
+    decided_at: int
+    applied_at: int
+    previous: int
+    imgsz: int
+    reason: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class ResolutionController:
+    """
+    Chooses the inference input size from a ladder of tiers, one window of frames at a time.
+    It steps up a tier when a box shorter than `small_object` of the inferred image's longer side shows up,
+    or when mean detection confidence drops below `low_confidence`. It steps down when the window held at most
+    `few_objects` boxes per frame, all at least `large_object` tall, at `high_confidence` or better.
+
+    A change takes effect only when `observe` reports the counting zone clear, so no object near the line jumps
+    between box scales while its crossing is decided; after `max_defer` frames it is applied regardless.
+    ByteTrack's state lives in frame pixels, so its tracks carry over a change unaltered.
+    """
+
+    def __init__(self, tiers: Sequence[int], initial: Optional[int] = None, window: int = 15,
+                 small_object: float = 0.05, large_object: float = 0.15, few_objects: int = 3,
+                 low_confidence: float = 0.5, high_confidence: float = 0.65, max_defer: int = 30):
+        bad = [t for t in tiers if t % STRIDE]
+        if not tiers or bad:
+            raise ValueError(f"imgsz_tiers must be multiples of {STRIDE}, got {list(tiers)}")
+        self.tiers = sorted(set(tiers))
+        start = initial if initial is not None else self.tiers[len(self.tiers) // 2]
+        self.imgsz = min(self.tiers, key=lambda t: abs(t - start))
+        self.window = window
+        self.small_object = small_object
+        self.large_object = large_object
+        self.few_objects = few_objects
+        self.low_confidence = low_confidence
+        self.high_confidence = high_confidence
+        self.max_defer = max_defer
+        self.decisions: List[ResolutionDecision] = []
+        self.frames_at: Dict[int, int] = {t: 0 for t in self.tiers}
+        self._reset_window()
+        self.pending: Optional[Dict[str, Any]] = None
+
+    def _reset_window(self) -> None:
+        self.frames = 0
+        self.max_count = 0
+        self.smallest = np.inf
+        self.conf_sum = 0.0
+        self.conf_n = 0
+
+    def observe(self, frame_idx: int, heights: np.ndarray, confs: np.ndarray, extent: int, zone_clear: bool) -> int:
+        """
+        Adds one inferred frame: its box heights (pixels), confidences, the longer side of the image that was
+        inferred, and whether no object is near the counting line. Returns the input size for the next frame.
+        """
+        self.frames += 1
+        self.frames_at[self.imgsz] += 1
+        if len(heights):
+            self.max_count = max(self.max_count, len(heights))
+            self.smallest = min(self.smallest, float(np.min(heights)) / extent)
+            self.conf_sum += float(np.sum(confs))
+            self.conf_n += len(confs)
+
+        if self.pending is None and self.frames >= self.window:
+            self.pending = self._evaluate(frame_idx)
+            self._reset_window()
+        if self.pending is not None and (zone_clear or frame_idx - self.pending["decided_at"] >= self.max_defer):
+            self._apply(frame_idx)
+        return self.imgsz
+
+    def _evaluate(self, frame_idx: int) -> Optional[Dict[str, Any]]:
+        if not self.conf_n:
+            return None  # nothing seen: no evidence either way
+        conf = self.conf_sum / self.conf_n
+        index = self.tiers.index(self.imgsz)
+        if index + 1 < len(self.tiers) and self.smallest < self.small_object:
+            target, reason = self.tiers[index + 1], f"smallest box {self.smallest:.1%} of the image"
+        elif index + 1 < len(self.tiers) and conf < self.low_confidence:
+            target, reason = self.tiers[index + 1], f"mean confidence {conf:.2f}"
+        elif (index > 0 and self.max_count <= self.few_objects and self.smallest >= self.large_object
+              and conf >= self.high_confidence):
+            target = self.tiers[index - 1]
+            reason = f"{self.max_count} object(s), smallest {self.smallest:.1%}, confidence {conf:.2f}"
+        else:
+            return None
+        return {"decided_at": frame_idx, "imgsz": target, "reason": reason}
+
+    def _apply(self, frame_idx: int) -> None:
+        pending, self.pending = self.pending, None
+        decision = ResolutionDecision(decided_at=pending["decided_at"], applied_at=frame_idx, previous=self.imgsz,
+                                      imgsz=pending["imgsz"], reason=pending["reason"])
+        self.decisions.append(decision)
+        logger.info(f"imgsz {decision.previous} -> {decision.imgsz} at frame {frame_idx} ({decision.reason}"
+                    f"{f', deferred {frame_idx - decision.decided_at} frames' if frame_idx > decision.decided_at else ''})")
+        self.imgsz = decision.imgsz
+
+    def stats(self) -> Dict[str, Any]:
+        return {"imgsz": self.imgsz, "frames_at": dict(self.frames_at),
+                "decisions": [d.to_dict() for d in self.decisions]}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ResolutionController":
+        return cls(
+            config.get('imgsz_tiers', [320, 480, 640, 960]),
+            initial=config.get('imgsz', 640),
+            window=config.get('imgsz_window', 15),
+            small_object=config.get('imgsz_small_object', 0.05),
+            large_object=config.get('imgsz_large_object', 0.15),
+            few_objects=config.get('imgsz_few_objects', 3),
+            low_confidence=config.get('imgsz_low_confidence', 0.5),
+            high_confidence=config.get('imgsz_high_confidence', 0.65),
+            max_defer=config.get('imgsz_max_defer', 30)
+        )
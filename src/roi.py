@@ -0,0 +1,68 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Vectorized even-odd ray casting. points: (K, 2), polygon: (V, 2). Returns a (K,) bool mask."""
+    x, y = points[:, 0:1], points[:, 1:2]
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_at_y = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(crosses & (x < x_at_y), axis=1) % 2 == 1
+
+class RegionOfInterest:
+    """
+    Rectangular inference crop, optionally refined by a polygon.
+    The frame is cropped with plain slicing (a view, no copy) before tracking, and boxes are
+    shifted back to full-frame coordinates afterwards. With a polygon the crop is its bounding
+    rectangle and detections whose centroid falls outside the polygon are dropped.
+    """
+
+    def __init__(self, width: int, height: int, x_min: float = 0.0, x_max: float = 1.0,
+                 y_min: float = 0.0, y_max: float = 1.0, polygon: Optional[Sequence[Sequence[float]]] = None):
+        self.polygon = None
+        if polygon:
+            pts = np.asarray(polygon, dtype=np.float64)
+            # Fractions of the frame unless any coordinate is clearly in pixels
+            if pts.max() <= 1.0:
+                pts = pts * [width, height]
+            self.polygon = pts
+            x_min, y_min = max(x_min, pts[:, 0].min() / width), max(y_min, pts[:, 1].min() / height)
+            x_max, y_max = min(x_max, pts[:, 0].max() / width), min(y_max, pts[:, 1].max() / height)
+
+        self.x0, self.x1 = int(width * x_min), int(np.ceil(width * x_max))
+        self.y0, self.y1 = int(height * y_min), int(np.ceil(height * y_max))
+        if self.x1 <= self.x0 or self.y1 <= self.y0:
+            raise ValueError(f"Empty ROI: x {x_min}-{x_max}, y {y_min}-{y_max}")
+        self.offset = np.array([self.x0, self.y0, self.x0, self.y0], dtype=np.float32)
+        self.area_fraction = (self.x1 - self.x0) * (self.y1 - self.y0) / float(width * height)
+
+    def crop(self, frame: Any) -> Any:
+        """Returns a view of the frame restricted to the ROI rectangle."""
+        return frame[self.y0:self.y1, self.x0:self.x1]
+
+    def to_frame(self, boxes: np.ndarray) -> np.ndarray:
+        """Maps (K, 4) xyxy boxes from crop coordinates back to full-frame coordinates."""
+        return boxes + self.offset
+
+    def keep(self, boxes: np.ndarray) -> np.ndarray:
+        """Mask of full-frame boxes whose centroid lies inside the polygon (all True without one)."""
+        if self.polygon is None:
+            return np.ones(len(boxes), dtype=bool)
+        centers = np.stack(((boxes[:, 0] + boxes[:, 2]) * 0.5, (boxes[:, 1] + boxes[:, 3]) * 0.5), axis=1)
+        return points_in_polygon(centers, self.polygon)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], width: int, height: int) -> Optional["RegionOfInterest"]:
+        """Builds the ROI from roi_{x,y}_{min,max} and roi_polygon; None when it covers the whole frame."""
+        bounds = {
+            "x_min": config.get('roi_x_min', 0.0),
+            "x_max": config.get('roi_x_max', 1.0),
+            "y_min": config.get('roi_y_min', 0.0),
+            "y_max": config.get('roi_y_max', 1.0)
+        }
+        polygon: Optional[List[List[float]]] = config.get('roi_polygon')
+        if not polygon and bounds == {"x_min": 0.0, "x_max": 1.0, "y_min": 0.0, "y_max": 1.0}:
+            return None
+        return cls(width, height, polygon=polygon, **bounds)
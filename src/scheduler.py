@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+from .line_crossing import Orientation
+
+class MotionScheduler:
+    """
+    Decides per frame whether detection has to run, using cheap downscaled frame differencing.
+
+    - Motion near the counting line (or the configured gates): run every frame, and keep doing so for `hold_frames`.
+    - Motion elsewhere in the ROI band: run every `stride` frames.
+    - Static scene: skip detection, except for a keyframe every `idle_stride` frames (0 = never).
+    """
+
+    def __init__(self, width: int, height: int, line_coord: int, orientation: Orientation,
+                 roi_y_min: float = 0.0, roi_y_max: float = 1.0, threshold: float = 2.0,
+                 line_zone: float = 0.1, stride: int = 3, idle_stride: int = 0, hold_frames: int = 15,
+                 sample_width: int = 160, zone_box: Optional[Tuple[float, float, float, float]] = None):
+        self.scale = min(1.0, sample_width / float(width))
+        self.size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+        sw, sh = self.size
+
+        # ROI band and the zone around the line, in downscaled pixel coordinates
+        y0, y1 = int(sh * roi_y_min), max(int(sh * roi_y_min) + 1, int(sh * roi_y_max))
+        self.band = (slice(y0, y1), slice(0, sw))
+        half = max(1, int((sh if orientation == Orientation.HORIZONTAL else sw) * line_zone / 2))
+        lc = int(line_coord * self.scale)
+        if zone_box is not None:
+            # Gates: the zone is their bounding box (full-frame pixels) grown by the line zone
+            gx0, gy0, gx1, gy1 = (int(v * self.scale) for v in zone_box)
+            zs, ze = max(y0, gy0 - half), min(y1, gy1 + half)
+            self.zone = (slice(zs, max(zs, ze)), slice(max(0, gx0 - half), min(sw, gx1 + half)))
+        elif orientation == Orientation.HORIZONTAL:
+            zs, ze = max(y0, lc - half), min(y1, lc + half)
+            self.zone = (slice(zs, max(zs, ze)), slice(0, sw))
+        else:
+            self.zone = (slice(y0, y1), slice(max(0, lc - half), min(sw, lc + half)))
+
+        self.threshold = threshold
+        self.stride = max(1, stride)
+        self.idle_stride = idle_stride
+        self.hold_frames = hold_frames
+
+        self.prev: Optional[np.ndarray] = None
+        self.last_run = -10**9
+        self.active_until = -1
+        self.frames = 0
+        self.inferred = 0
+
+    def motion(self, frame: Any) -> Optional[Tuple[float, float]]:
+        """
+        Returns (band_score, line_zone_score), the mean absolute difference to the previous frame,
+        or None for the first frame.
+        """
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        prev, self.prev = self.prev, gray
+        if prev is None:
+            return None
+        diff = cv2.absdiff(gray, prev)
+        band, zone = diff[self.band], diff[self.zone]
+        return float(band.mean()) if band.size else 0.0, float(zone.mean()) if zone.size else 0.0
+
+    def should_infer(self, frame: Any, frame_idx: int) -> bool:
+        """Scores the frame and decides whether detection runs on it."""
+        self.frames += 1
+        scores = self.motion(frame)
+        band_score, zone_score = scores if scores else (0.0, 0.0)
+
+        if zone_score > self.threshold:
+            self.active_until = frame_idx + self.hold_frames
+
+        gap = frame_idx - self.last_run
+        if scores is None or frame_idx <= self.active_until:
+            run = True
+        elif band_score > self.threshold:
+            run = gap >= self.stride
+        else:
+            run = bool(self.idle_stride) and gap >= self.idle_stride
+
+        if run:
+            self.last_run = frame_idx
+            self.inferred += 1
+        return run
+
+    def stats(self) -> Dict[str, Any]:
+        """Share of frames on which detection was skipped."""
+        skipped = self.frames - self.inferred
+        return {
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skipped": skipped,
+            "skip_ratio": round(skipped / self.frames, 4) if self.frames else 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], width: int, height: int, line_coord: int,
+                    orientation: Orientation,
+                    zone_box: Optional[Tuple[float, float, float, float]] = None) -> "MotionScheduler":
+        return cls(
+            width, height, line_coord, orientation,
+            roi_y_min=config.get('roi_y_min', 0.0),
+            roi_y_max=config.get('roi_y_max', 1.0),
+            threshold=config.get('motion_threshold', 2.0),
+            line_zone=config.get('motion_line_zone', 0.1),
+            stride=config.get('motion_stride', 3),
+            idle_stride=config.get('motion_idle_stride', 0),
+            hold_frames=config.get('motion_hold_frames', 15),
+            zone_box=zone_box
+        )
@@ -0,0 +1,299 @@
+import os
+import csv
+import time
+import cv2
+import numpy as np
+from dataclasses import dataclass, asdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from .backends import ArrayResult
+from .calibration import GroundTruth, score_trial
+
+@dataclass
+class SceneSpec:
+    """
+    A synthetic warehouse scene: workers walk across the counting line, most of them carrying a sack.
+    Sizes are fractions of the frame, speeds pixels per frame, and the `*_fraction` knobs the share of
+    workers each effect applies to.
+    """
+    width: int = 1280
+    height: int = 720
+    fps: float = 25.0
+    frames: int = 1500
+    orientation: str = "horizontal"     # line orientation; workers walk across it
+    line_position: float = 0.5
+    workers_per_minute: float = 20.0    # mean arrival rate (Poisson)
+    carry_fraction: float = 0.8         # workers carrying a sack; the others must never be counted
+    in_fraction: float = 0.5            # workers walking in the IN direction (down / right)
+    speed_min: float = 4.0
+    speed_max: float = 10.0
+    worker_size: float = 0.22           # worker box height, as a fraction of the frame height
+    jitter: float = 1.5                 # std of per-frame box centre noise, pixels
+    hesitate_fraction: float = 0.0      # workers who stop on the line and sway across it before going on
+    hesitate_frames: int = 20
+    hesitate_amplitude: float = 12.0    # pixels either side of the line
+    occlusion_fraction: float = 0.0     # workers hidden (no boxes) for a stretch of their walk
+    occlusion_min: int = 5
+    occlusion_max: int = 20
+    id_switch_fraction: float = 0.0     # workers whose (and whose sack's) track ids change near the line
+    id_switch_window: int = 3           # frames either side of the crossing the switch falls in
+    person_class: int = 0
+    bag_class: int = 24
+    seed: int = 0
+
+class Scene:
+    """
+    Generated tracker output for every frame (1-based, like the pipeline's frame indices) in flat columns, the
+    rendering of each worker and sack, and the ground truth: one crossing per carried sack, at the frame its
+    noise-free centre first gets past the line.
+    """
+
+    def __init__(self, spec: SceneSpec, frame_of: np.ndarray, boxes: np.ndarray, ids: np.ndarray, cls: np.ndarray,
+                 conf: np.ndarray, visible: np.ndarray, agents: List[Dict[str, Any]]):
+        order = np.argsort(frame_of, kind="stable")
+        self.spec = spec
+        self.frame_of, self.boxes, self.ids = frame_of[order], boxes[order], ids[order]
+        self.cls, self.conf, self.visible = cls[order], conf[order], visible[order]
+        self.offsets = np.searchsorted(self.frame_of, np.arange(spec.frames + 2))
+        self.agents = agents
+        events = sorted((a["crossed_at"], a["direction"]) for a in agents
+                        if a["carrying"] and a["crossed_at"] is not None)
+        self.truth = GroundTruth(count_in=sum(d == "in" for _, d in events),
+                                 count_out=sum(d == "out" for _, d in events), events=events)
+        self._background: Optional[np.ndarray] = None
+
+    @property
+    def line_coord(self) -> int:
+        extent = self.spec.height if self.spec.orientation == "horizontal" else self.spec.width
+        return int(extent * self.spec.line_position)
+
+    def result(self, frame_idx: int) -> ArrayResult:
+        """What the tracker reports on a frame: visible boxes only, and no ids when nothing is tracked."""
+        if not 1 <= frame_idx <= self.spec.frames:
+            return ArrayResult(np.empty((0, 4), np.float32), None, np.empty(0), np.empty(0, np.float32))
+        a, b = self.offsets[frame_idx], self.offsets[frame_idx + 1]
+        keep = self.visible[a:b]
+        ids = self.ids[a:b][keep]
+        return ArrayResult(self.boxes[a:b][keep], ids.astype(float) if len(ids) else None,
+                           self.cls[a:b][keep].astype(float), self.conf[a:b][keep])
+
+    def config(self, **overrides: Any) -> Dict[str, Any]:
+        """
+        Counting config matching the scene's line and classes, with everything SceneModel cannot serve turned off
+        (ROI crop, motion gating, gates, batched detection, the track cache); laid over a base config it keeps
+        the base's counting knobs.
+        """
+        return {
+            'line_orientation': self.spec.orientation,
+            'line_position': self.spec.line_position,
+            'count_direction': 'both',
+            'track_classes': [self.spec.person_class, self.spec.bag_class],
+            'person_classes': [self.spec.person_class],
+            'bag_classes': [self.spec.bag_class],
+            'roi_x_min': 0.0, 'roi_x_max': 1.0, 'roi_y_min': 0.0, 'roi_y_max': 1.0, 'roi_polygon': None,
+            'motion_gating': False,
+            'dynamic_imgsz': False,
+            'gates': None,
+            'batch_size': 1,
+            'track_cache_dir': None,
+            **overrides
+        }
+
+    def model(self) -> "SceneModel":
+        return SceneModel(self)
+
+    def render(self, frame_idx: int) -> np.ndarray:
+        """
+        A BGR frame: workers as dark figures, sacks as jute-coloured blocks, and stacked pallets in front of
+        any worker who is occluded on this frame.
+        """
+        if self._background is None:
+            # A shaded concrete floor; the texture is smooth, as per-pixel noise would make encoding the video slow
+            h, w = self.spec.height, self.spec.width
+            stains = np.random.default_rng(self.spec.seed).normal(0, 6, (max(h // 32, 2), max(w // 32, 2)))
+            floor = np.linspace(70, 110, h, dtype=np.float32)[:, None] + cv2.resize(stains, (w, h))
+            self._background = np.clip(floor[..., None] * np.array([1.0, 1.0, 1.05]), 0, 255).astype(np.uint8)
+        frame = self._background.copy()
+        a, b = self.offsets[frame_idx], self.offsets[frame_idx + 1]
+        covered = []
+        for box, cls, visible in zip(self.boxes[a:b], self.cls[a:b], self.visible[a:b]):
+            x1, y1, x2, y2 = (int(round(v)) for v in box)
+            if cls == self.spec.person_class:
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (90, 60, 40), -1)
+                cv2.circle(frame, ((x1 + x2) // 2, y1 + (x2 - x1) // 3), max((x2 - x1) // 4, 2), (120, 150, 190), -1)
+                if not visible:
+                    covered.append((x1, y1, x2, y2))
+            else:
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (90, 160, 200), -1)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (60, 110, 150), 2)
+        for x1, y1, x2, y2 in covered:
+            pad = (x2 - x1) // 2
+            cv2.rectangle(frame, (x1 - pad, y1 - pad), (x2 + pad, y2 + pad), (40, 80, 120), -1)
+            for y in range(y1 - pad, y2 + pad, max((y2 - y1) // 4, 4)):
+                cv2.line(frame, (x1 - pad, y), (x2 + pad, y), (30, 60, 90), 2)
+        return frame
+
+    def write_video(self, path: str, fourcc: str = "MJPG") -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), self.spec.fps,
+                                 (self.spec.width, self.spec.height))
+        for frame_idx in range(1, self.spec.frames + 1):
+            writer.write(self.render(frame_idx))
+        writer.release()
+        return path
+
+    def write_truth(self, path: str) -> str:
+        """The true crossings as a frame_idx,direction CSV, as read by GroundTruth.from_events_csv."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame_idx", "direction"])
+            writer.writerows(self.truth.events)
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "spec": asdict(self.spec),
+            "workers": len(self.agents),
+            "carrying": sum(a["carrying"] for a in self.agents),
+            "hesitating": sum(a["hesitate"] for a in self.agents),
+            "occluded": sum(a["occluded"] for a in self.agents),
+            "id_switches": sum(a["id_switch"] for a in self.agents),
+            "boxes": int(self.visible.sum()),
+            "truth": {"in": self.truth.count_in, "out": self.truth.count_out}
+        }
+
+class SceneModel:
+    """
+    Stands in for the YOLO model behind TrackerWrapper: each `track` call returns the scene's next frame(s).
+    It follows call order, not pixels, so every frame must reach it: no motion gating and no ROI crop.
+    """
+
+    def __init__(self, scene: Scene):
+        self.scene = scene
+        self.cursor = 0
+        # TrackerWrapper.reset() resets the predictor's trackers; for a scene that means starting over
+        self.predictor = SimpleNamespace(trackers=[self])
+
+    def reset(self) -> None:
+        self.cursor = 0
+
+    def track(self, source: Any, **kwargs: Any) -> List[ArrayResult]:
+        frames = source if isinstance(source, list) else [source]
+        results = [self.scene.result(self.cursor + 1 + i) for i in range(len(frames))]
+        self.cursor += len(frames)
+        return results
+
+def _walk(spec: SceneSpec, rng: np.random.Generator, direction: str, hesitate: bool) -> np.ndarray:
+    """Noise-free centre coordinate along the counting axis for each frame of one worker's walk."""
+    extent = spec.height if spec.orientation == "horizontal" else spec.width
+    line = extent * spec.line_position
+    start, end = (0.05 * extent, 0.95 * extent) if direction == "in" else (0.95 * extent, 0.05 * extent)
+    step = rng.uniform(spec.speed_min, spec.speed_max) * (1 if direction == "in" else -1)
+    if not hesitate:
+        return np.arange(start, end, step)
+    before = np.arange(start, line, step)
+    sway = line + spec.hesitate_amplitude * np.sin(np.linspace(0, 3 * np.pi, spec.hesitate_frames) + np.pi / 2)
+    return np.concatenate([before, sway, np.arange(line, end, step)])
+
+def generate_scene(spec: SceneSpec) -> Scene:
+    """Builds a scene deterministically from `spec.seed`."""
+    rng = np.random.default_rng(spec.seed)
+    horizontal = spec.orientation == "horizontal"
+    lateral_extent = spec.width if horizontal else spec.height
+    line = (spec.height if horizontal else spec.width) * spec.line_position
+    worker_h = spec.worker_size * spec.height
+    worker_w = 0.4 * worker_h
+    sack_w, sack_h = 0.6 * worker_w, 0.3 * worker_h
+
+    columns: Dict[str, List[np.ndarray]] = {k: [] for k in ("frame", "box", "id", "cls", "conf", "visible")}
+    agents = []
+    next_id = 1
+    rate = spec.workers_per_minute / 60.0 / spec.fps  # arrivals per frame
+    t = 1 + rng.exponential(1 / rate) if rate > 0 else spec.frames + 1
+    while t <= spec.frames:
+        direction = "in" if rng.random() < spec.in_fraction else "out"
+        hesitate = rng.random() < spec.hesitate_fraction
+        along = _walk(spec, rng, direction, hesitate)
+        n = len(along)
+        frames = int(t) + np.arange(n)
+        lateral = rng.uniform(0.1, 0.9) * lateral_extent + np.linspace(0, rng.normal(0, 0.03 * lateral_extent), n)
+
+        # Ground truth: the first frame the sack's noise-free centre is past the line in the walking direction;
+        # swaying back and forth across it afterwards is still the one crossing
+        beyond = (along - line) * (1 if direction == "in" else -1) > 0
+        entries = np.flatnonzero(beyond[1:] & ~beyond[:-1]) + 1
+        first = int(entries[0]) if len(entries) else None
+        crossed_at = int(frames[first]) if first is not None and frames[first] <= spec.frames else None
+
+        carrying = rng.random() < spec.carry_fraction
+        visible = np.ones(n, dtype=bool)
+        occluded = rng.random() < spec.occlusion_fraction
+        if occluded:
+            length = min(int(rng.integers(spec.occlusion_min, spec.occlusion_max + 1)), n)
+            start = int(rng.integers(0, n - length + 1))
+            visible[start:start + length] = False
+        # Trackers mostly swap ids where boxes crowd together, so switches fall around the crossing
+        id_switch = rng.random() < spec.id_switch_fraction and first is not None
+        switch_at = n
+        if id_switch:
+            offset = int(rng.integers(-spec.id_switch_window, spec.id_switch_window + 1))
+            switch_at = int(np.clip(first + offset, 1, n - 1))
+        worker_ids = np.where(np.arange(n) < switch_at, next_id, next_id + 2)
+        sack_ids = worker_ids + 1
+        next_id += 4 if id_switch else 2
+
+        cx, cy = (lateral, along) if horizontal else (along, lateral)
+        parts = [(cx, cy, worker_w, worker_h, worker_ids, spec.person_class)]
+        if carrying:
+            parts.append((cx + 0.15 * worker_w, cy, sack_w, sack_h, sack_ids, spec.bag_class))
+        for px, py, w, h, ids, cls in parts:
+            px = px + rng.normal(0, spec.jitter, n)
+            py = py + rng.normal(0, spec.jitter, n)
+            columns["frame"].append(frames)
+            columns["box"].append(np.column_stack([px - w / 2, py - h / 2, px + w / 2, py + h / 2]))
+            columns["id"].append(ids)
+            columns["cls"].append(np.full(n, cls))
+            columns["conf"].append(np.clip(rng.uniform(0.55, 0.95) + rng.normal(0, 0.03, n), 0.3, 1.0))
+            columns["visible"].append(visible)
+
+        agents.append({"id": int(worker_ids[0]), "start": int(t), "direction": direction, "carrying": carrying,
+                       "crossed_at": crossed_at, "hesitate": hesitate, "occluded": occluded, "id_switch": id_switch})
+        t += rng.exponential(1 / rate)
+
+    if not agents:
+        empty = np.empty(0)
+        return Scene(spec, empty.astype(np.int64), np.empty((0, 4), np.float32), empty.astype(np.int64),
+                     empty.astype(np.int16), empty.astype(np.float32), empty.astype(bool), [])
+    frame_of = np.concatenate(columns["frame"])
+    keep = frame_of <= spec.frames
+    return Scene(
+        spec,
+        frame_of[keep].astype(np.int64),
+        np.concatenate(columns["box"])[keep].astype(np.float32),
+        np.concatenate(columns["id"])[keep].astype(np.int64),
+        np.concatenate(columns["cls"])[keep].astype(np.int16),
+        np.concatenate(columns["conf"])[keep].astype(np.float32),
+        np.concatenate(columns["visible"])[keep],
+        agents
+    )
+
+def run_scene(counter: Any, scene: Scene, tolerance: int = 5) -> Dict[str, Any]:
+    """
+    Counts a scene without decoding anything: sets the counter up for the scene's frame size and feeds it one
+    placeholder frame per scene frame, so a counter built on `scene.model()` times only tracking output handling,
+    association and line crossing. Returns the counts, the score against the scene's truth, and throughput.
+    """
+    spec = scene.spec
+    counter.setup(spec.width, spec.height, spec.fps)
+    counter.reset()
+    blank = np.empty((0, 0, 3), dtype=np.uint8)
+    events = []
+    start = time.perf_counter()
+    for frame_idx in range(1, spec.frames + 1):
+        counter.process_frame(blank, frame_idx)
+        events.extend((frame_idx, direction) for _, direction, *_ in counter.detector.last_crossings)
+    elapsed = time.perf_counter() - start
+    score = score_trial(counter.count_in, counter.count_out, events, scene.truth, tolerance)
+    return {"in": counter.count_in, "out": counter.count_out, "events": events, "score": score,
+            "fps": round(spec.frames / elapsed, 1) if elapsed > 0 else 0.0}
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from .jobs import file_digest
+from .backends import ArrayResult
+
+logger = logging.getLogger(__name__)
+
+# Config keys that change what the tracker returns; everything else (line, margins, cooldown,
+# direction, association) only affects the counting stage and can be replayed.
+INFERENCE_KEYS = ("confidence", "track_classes", "roi_y_min", "roi_y_max", "roi_x_min", "roi_x_max", "roi_polygon",
+                  "inference_backend", "imgsz")
+# Where the counting zone is; the motion scheduler and the resolution controller both watch it
+LINE_KEYS = ("line_position", "line_orientation", "gates")
+RESOLUTION_KEYS = ("imgsz_tiers", "imgsz_window", "imgsz_small_object", "imgsz_large_object", "imgsz_few_objects",
+                   "imgsz_low_confidence", "imgsz_high_confidence", "imgsz_max_defer", "motion_line_zone") + LINE_KEYS
+MOTION_KEYS = ("motion_threshold", "motion_line_zone", "motion_stride", "motion_idle_stride",
+               "motion_hold_frames") + LINE_KEYS
+
+_COLUMNS = ("frames", "tracked", "offsets", "boxes", "ids", "cls", "conf")
+
+def model_identity(model: Any) -> str:
+    """Content hash of the model weights when they are a file on disk, otherwise the best available name."""
+    path = model if isinstance(model, str) else getattr(model, 'ckpt_path', None) or getattr(model, 'model_name', None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return file_digest(path)
+    return str(path) if path else type(model).__name__
+
+def track_cache_key(video_path: str, model: Any, config: Dict[str, Any]) -> str:
+    """Key of one recording: video contents, model, and the config keys that feed inference."""
+    inputs = {k: config.get(k) for k in INFERENCE_KEYS}
+    if config.get('motion_gating'):
+        # Which frames get detection (and so what ByteTrack sees) depends on the motion settings and the zone
+        inputs.update({k: config.get(k) for k in MOTION_KEYS}, motion_gating=True)
+    if config.get('dynamic_imgsz'):
+        # The size each frame is inferred at follows the controller, which watches the counting zone
+        inputs.update({k: config.get(k) for k in RESOLUTION_KEYS}, dynamic_imgsz=True)
+    parts = [file_digest(video_path), model_identity(model), json.dumps(inputs, sort_keys=True, default=str)]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:24]
+
+class TrackRecorder:
+    """Collects per-frame tracker output during a run and writes it as one cache entry when the video is complete."""
+
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.meta = meta
+        self.frames: List[int] = []
+        self.tracked: List[bool] = []
+        self.counts: List[int] = [0]
+        self.rows: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def add(self, frame_idx: int, results: Any) -> None:
+        boxes = results.boxes
+        self.frames.append(frame_idx)
+        self.tracked.append(boxes.id is not None)
+        if boxes.id is None:
+            # Untracked detections are never counted, so they need not be stored
+            self.counts.append(self.counts[-1])
+            return
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.float32)
+        conf = boxes.conf.cpu().numpy() if boxes.conf is not None else np.ones(len(xyxy))
+        self.rows.append((xyxy, boxes.id.cpu().numpy().astype(np.int64),
+                          boxes.cls.cpu().numpy().astype(np.int16), conf.astype(np.float32)))
+        self.counts.append(self.counts[-1] + len(xyxy))
+
+    def close(self, total_frames: int) -> None:
+        """Writes the entry to a temporary directory and renames it into place, so readers never see half of one."""
+        columns = {
+            "frames": np.asarray(self.frames, dtype=np.int64),
+            "tracked": np.asarray(self.tracked, dtype=bool),
+            "offsets": np.asarray(self.counts, dtype=np.int64),
+            "boxes": np.concatenate([r[0] for r in self.rows]) if self.rows else np.empty((0, 4), np.float32),
+            "ids": np.concatenate([r[1] for r in self.rows]) if self.rows else np.empty(0, np.int64),
+            "cls": np.concatenate([r[2] for r in self.rows]) if self.rows else np.empty(0, np.int16),
+            "conf": np.concatenate([r[3] for r in self.rows]) if self.rows else np.empty(0, np.float32)
+        }
+        temp = f"{self.path}.{uuid.uuid4().hex[:8]}.tmp"
+        os.makedirs(temp)
+        for name, array in columns.items():
+            np.save(os.path.join(temp, f"{name}.npy"), array)
+        with open(os.path.join(temp, "meta.json"), "w") as f:
+            json.dump({**self.meta, "total_frames": total_frames, "created": time.time()}, f, indent=2)
+        try:
+            os.rename(temp, self.path)
+        except OSError:
+            # Another run recorded the same key first; its entry is equivalent
+            shutil.rmtree(temp, ignore_errors=True)
+            return
+        logger.info(f"Recorded tracks of {len(self.frames)} frames to {self.path}")
+
+class TrackReplay:
+    """A recorded entry, memory-mapped. `result(frame_idx)` is None for frames on which detection did not run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in _COLUMNS}
+        self.tracked, self.offsets = columns["tracked"], columns["offsets"]
+        self.boxes, self.ids, self.cls, self.conf = columns["boxes"], columns["ids"], columns["cls"], columns["conf"]
+        self.total_frames = int(self.meta["total_frames"])
+        self.rows = np.full(self.total_frames + 1, -1, dtype=np.int64)
+        self.rows[columns["frames"]] = np.arange(len(columns["frames"]))
+
+    def result(self, frame_idx: int) -> Optional[ArrayResult]:
+        row = self.rows[frame_idx] if frame_idx < len(self.rows) else -1
+        if row < 0:
+            return None
+        a, b = self.offsets[row], self.offsets[row + 1]
+        ids = self.ids[a:b] if self.tracked[row] else None
+        return ArrayResult(self.boxes[a:b], ids, self.cls[a:b], self.conf[a:b])
+
+    def capture(self) -> "ReplayCapture":
+        return ReplayCapture(self.total_frames)
+
+class ReplayCapture:
+    """
+    Stands in for cv2.VideoCapture when a replayed run needs no pixels: it "reads" the recorded number of
+    frames without decoding anything, each one an empty placeholder image.
+    """
+    blank = np.empty((0, 0, 3), dtype=np.uint8)
+
+    def __init__(self, total_frames: int):
+        self.remaining = total_frames
+        self.opened = True
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.opened or self.remaining <= 0:
+            return False, None
+        self.remaining -= 1
+        return True, self.blank
+
+    def release(self) -> None:
+        self.opened = False
+
+class TrackCache:
+    """Directory of recorded tracker outputs, one subdirectory of .npy columns per key."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def open(self, key: str) -> Optional[TrackReplay]:
+        path = self.path_for(key)
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+        return TrackReplay(path)
+
+    def recorder(self, key: str, meta: Dict[str, Any]) -> TrackRecorder:
+        return TrackRecorder(self.path_for(key), meta)
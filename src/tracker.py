@@ -1,23 +1,115 @@
+import os
+import yaml
+import numpy as np
 from ultralytics import YOLO
-from typing import List, Any
+from typing import Any, Dict, List, Optional
+from .backends import ArrayResult, Backend, Detections, backend_for, load_detector
 
 class TrackerWrapper:
     """Wrapper for YOLOv8 ByteTrack tracking."""
-    
-    def __init__(self, model_path_or_model: Any = "yolov8n.pt"):
-        if isinstance(model_path_or_model, str):
-            self.model = YOLO(model_path_or_model)
-        else:
-            self.model = model_path_or_model
-
-    def track(self, frame: Any, conf: float = 0.4, classes: List[int] = [0]) -> Any:
-        """Runs tracking on a single frame."""
+
+    def __init__(self, model_path_or_model: Any = "yolov8n.pt", backend: str = "torch", imgsz: int = 640):
+        # A path is only loaded on first use, so runs replayed from the track cache never load a model
+        self.source = model_path_or_model
+        self.backend = backend_for(model_path_or_model, backend)
+        self.imgsz = imgsz
+        self._model = None if isinstance(model_path_or_model, str) else model_path_or_model
+        self._detectors: Dict[int, Any] = {}
+        self._byte = None
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            self._model = YOLO(self.source)
+        return self._model
+
+    def detector(self, imgsz: Optional[int] = None) -> Any:
+        """
+        The exported-model detector of the onnx/openvino backends for an input size, exported and opened on
+        first use. Exported files have one fixed size, so every size maps to the same detector for them.
+        """
+        source = self.source if isinstance(self.source, str) else getattr(self.source, 'ckpt_path', None)
+        size = (imgsz or self.imgsz) if isinstance(source, str) and source.endswith(".pt") else 0
+        if size not in self._detectors:
+            if not source or not os.path.exists(source):
+                raise ValueError(f"inference_backend: {self.backend.value} needs model weights on disk, got {source!r}")
+            self._detectors[size] = load_detector(source, self.backend, size or self.imgsz)
+        return self._detectors[size]
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None or bool(self._detectors)
+
+    def reset(self) -> None:
+        """Clears the persisted ByteTrack state so a shared model can start a new video."""
+        predictor = getattr(self._model, 'predictor', None)
+        for tracker in getattr(predictor, 'trackers', None) or []:
+            tracker.reset()
+        self._byte = None
+
+    def _bytetrack(self) -> Any:
+        if self._byte is None:
+            from ultralytics.trackers.byte_tracker import BYTETracker
+            from ultralytics.utils import IterableSimpleNamespace
+            from ultralytics.utils.checks import check_yaml
+            # Read with PyYAML: ultralytics' own loader was renamed (yaml_load -> YAML.load) after the pinned 8.2
+            with open(check_yaml("bytetrack.yaml")) as f:
+                self._byte = BYTETracker(IterableSimpleNamespace(**yaml.safe_load(f)))
+        return self._byte
+
+    def _update_tracks(self, frames: List[Any], detections: List[Any]) -> List[Any]:
+        """Feeds each frame's detections, in order, through the wrapper's one ByteTrack instance."""
+        byte = self._bytetrack()
+        results = []
+        for frame, dets in zip(frames, detections):
+            tracks = byte.update(dets, frame)
+            if len(tracks) == 0:
+                # Like ultralytics: no confirmed tracks leaves the detections without IDs
+                results.append(ArrayResult(dets.xyxy, None, dets.cls, dets.conf))
+                continue
+            tracks = np.asarray(tracks, dtype=np.float32)
+            results.append(ArrayResult(tracks[:, :4], tracks[:, 4], tracks[:, 6], tracks[:, 5]))
+        return results
+
+    def _track_exported(self, frames: List[Any], conf: float, classes: List[int], imgsz: Optional[int]) -> List[Any]:
+        """Detection on the exported model, then the same ByteTrack update ultralytics runs after predict."""
+        return self._update_tracks(frames, self.detector(imgsz)(frames, conf=conf, classes=classes))
+
+    def track(self, frame: Any, conf: float = 0.4, classes: List[int] = [0], imgsz: Optional[int] = None) -> Any:
+        """
+        Runs tracking on a single frame at `imgsz` (default: the configured size). The size may change between
+        calls: ByteTrack keeps its state in frame pixels, which every input size maps back to.
+        """
+        if self.backend != Backend.TORCH:
+            return self._track_exported([frame], conf, classes, imgsz)[0]
         results = self.model.track(
-            frame, 
-            persist=True, 
-            conf=conf, 
-            classes=classes, 
+            frame,
+            persist=True,
+            conf=conf,
+            classes=classes,
+            imgsz=imgsz or self.imgsz,
             tracker="bytetrack.yaml",
             verbose=False
         )
         return results[0]
+
+    def track_batch(self, frames: List[Any], conf: float = 0.4, classes: List[int] = [0],
+                    imgsz: Optional[int] = None) -> List[Any]:
+        """
+        Runs detection on several frames in one forward pass, then ByteTrack frame by frame in order.
+        Batched `model.track` can't be used: the pinned ultralytics 8.2 gives each batch slot its own tracker,
+        so IDs would differ between frames of a batch. A run should use either this or `track`, not both;
+        each keeps its own tracker state.
+        """
+        if self.backend != Backend.TORCH:
+            return self._track_exported(list(frames), conf, classes, imgsz)
+        results = self.model.predict(
+            list(frames),
+            conf=conf,
+            classes=classes,
+            imgsz=imgsz or self.imgsz,
+            verbose=False
+        )
+        detections = [Detections(r.boxes.xyxy.cpu().numpy(), r.boxes.conf.cpu().numpy(), r.boxes.cls.cpu().numpy())
+                      for r in results]
+        return self._update_tracks(list(frames), detections)
@@ -1,8 +1,8 @@
 import os
 import yaml
 import logging
-import cv2
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from .video_io import VideoIOOptions, open_writer, probe_video
 
 def setup_logging(level: int = logging.INFO) -> None:
     """Sets up the logging configuration."""
@@ -21,23 +21,12 @@ def load_config(config_path: str) -> Dict[str, Any]:
         config = yaml.safe_load(f)
     return config
 
-def get_video_properties(video_path: str) -> Dict[str, Any]:
-    """Gathers basic properties of a video file."""
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"Could not open video: {video_path}")
-    
-    props = {
-        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-        "fps": cap.get(cv2.CAP_PROP_FPS),
-        "total_frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    }
-    cap.release()
-    return props
+def get_video_properties(video_path: str, options: Optional[VideoIOOptions] = None) -> Dict[str, Any]:
+    """Gathers basic properties of a video file, through the configured decoder (OpenCV by default)."""
+    return probe_video(video_path, options)
 
-def create_output_writer(video_path: str, output_path: str, fps: float, width: int, height: int) -> cv2.VideoWriter:
-    """Creates a cv2.VideoWriter object for saving the output."""
+def create_output_writer(video_path: str, output_path: str, fps: float, width: int, height: int,
+                         options: Optional[VideoIOOptions] = None) -> Any:
+    """Creates the writer for saving the output: a cv2.VideoWriter (mp4v) unless `options` pick another."""
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    return cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    return open_writer(output_path, fps, width, height, options)
@@ -0,0 +1,268 @@
+import os
+import cv2
+import shutil
+import importlib
+import subprocess
+import numpy as np
+from enum import Enum
+from fractions import Fraction
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+class Decoder(Enum):
+    OPENCV = "opencv"   # cv2.VideoCapture with the default backend and settings
+    FFMPEG = "ffmpeg"   # cv2.VideoCapture pinned to FFmpeg, with decode threads and optional hardware decoding
+    PYAV = "pyav"       # PyAV (libav* bindings), frame-threaded decoding
+
+class Writer(Enum):
+    OPENCV = "opencv"   # cv2.VideoWriter with `output_fourcc`
+    FFMPEG = "ffmpeg"   # raw BGR frames piped to an ffmpeg process (libx264 by default)
+    PYAV = "pyav"       # PyAV encoder in-process (libx264 by default)
+    JPEG = "jpeg"       # one JPEG file per frame in a directory named after the output
+
+@dataclass
+class VideoIOOptions:
+    """How videos are decoded and annotated output is encoded; the defaults are the plain OpenCV path."""
+    decoder: Decoder = Decoder.OPENCV
+    decode_threads: int = 0           # 0 = the decoder's choice
+    hw_decode: bool = False           # ffmpeg decoder: use a hardware decoder when one is available
+    writer: Writer = Writer.OPENCV
+    fourcc: str = "mp4v"              # opencv writer
+    codec: str = "libx264"            # ffmpeg / pyav writers
+    preset: str = "veryfast"          # x264/x265 speed preset
+    crf: int = 23                     # x264/x265 constant rate factor (lower = better quality, larger files)
+    jpeg_quality: int = 90
+    ffmpeg_binary: str = "ffmpeg"
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "VideoIOOptions":
+        return cls(
+            decoder=Decoder(config.get('video_decoder', 'opencv')),
+            decode_threads=config.get('decode_threads', 0),
+            hw_decode=config.get('hw_decode', False),
+            writer=Writer(config.get('video_writer', 'opencv')),
+            fourcc=config.get('output_fourcc', 'mp4v'),
+            codec=config.get('output_codec', 'libx264'),
+            preset=config.get('output_preset', 'veryfast'),
+            crf=config.get('output_crf', 23),
+            jpeg_quality=config.get('output_jpeg_quality', 90),
+            ffmpeg_binary=config.get('ffmpeg_binary', 'ffmpeg')
+        )
+
+def require_pyav(setting: str) -> Any:
+    """Imports PyAV, with an error naming the setting that asked for it and the package to install."""
+    try:
+        return importlib.import_module("av")
+    except ImportError as e:
+        raise ImportError(f"{setting}: pyav needs the av package") from e
+
+class CaptureReader:
+    """
+    A cv2.VideoCapture behind the reader interface. `read` is the capture's own bound method, so reading
+    costs nothing over using the capture directly.
+    """
+
+    def __init__(self, cap: cv2.VideoCapture, path: str):
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {path}")
+        self.cap = cap
+        self.read = cap.read
+        self.isOpened = cap.isOpened
+
+    @property
+    def props(self) -> Dict[str, Any]:
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "total_frames": int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        }
+
+    def seek(self, frame_idx: int) -> None:
+        """
+        Positions the reader at frame `frame_idx` (0-based) through OpenCV's frame positioning. It is exact for
+        MJPG, XVID and mp4v, but can land one frame early on AVI streams with reordered frames (MPEG-1);
+        the pyav decoder seeks by timestamp instead.
+        """
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
+    def release(self) -> None:
+        self.cap.release()
+
+class PyAVReader:
+    """
+    Decodes with PyAV. Frame threading lets libavcodec decode several frames at once; `seek` jumps to the
+    keyframe before the target and decodes forward to it, so it is frame-accurate.
+    """
+
+    def __init__(self, path: str, threads: int = 0):
+        av = require_pyav("video_decoder")
+        self.container = av.open(path)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self.stream.thread_count = threads
+        self._frames = self.container.decode(self.stream)
+        self._pending = None
+
+    def isOpened(self) -> bool:
+        return self.container is not None
+
+    @property
+    def props(self) -> Dict[str, Any]:
+        rate = self.stream.average_rate or self.stream.guessed_rate
+        return {
+            "width": self.stream.codec_context.width,
+            "height": self.stream.codec_context.height,
+            "fps": float(rate) if rate else 0.0,
+            "total_frames": self.stream.frames
+        }
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame, self._pending = self._pending, None
+        if frame is None:
+            frame = next(self._frames, None)
+        if frame is None:
+            return False, None
+        return True, frame.to_ndarray(format="bgr24")
+
+    def seek(self, frame_idx: int) -> None:
+        """Positions the reader so the next `read` returns frame `frame_idx` (0-based)."""
+        rate = self.stream.average_rate or self.stream.guessed_rate
+        start = self.stream.start_time or 0
+        target = start + int(Fraction(frame_idx) / rate / self.stream.time_base)
+        self.container.seek(target, stream=self.stream, backward=True, any_frame=False)
+        self._frames = self.container.decode(self.stream)
+        self._pending = None
+        for frame in self._frames:
+            if frame.pts is None or frame.pts >= target:
+                self._pending = frame
+                break
+
+    def release(self) -> None:
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+def open_video(path: str, options: Optional[VideoIOOptions] = None) -> Any:
+    """
+    Opens a video file for reading with the configured decoder. Readers are used like a cv2.VideoCapture
+    (`isOpened`, `read` returning (ok, BGR frame), `release`) and add `props` and frame-accurate `seek`.
+    """
+    options = options or VideoIOOptions()
+    if options.decoder == Decoder.PYAV:
+        return PyAVReader(path, options.decode_threads)
+    if options.decoder == Decoder.FFMPEG:
+        params = [cv2.CAP_PROP_N_THREADS, options.decode_threads]
+        if options.hw_decode:
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        return CaptureReader(cv2.VideoCapture(path, cv2.CAP_FFMPEG, params), path)
+    return CaptureReader(cv2.VideoCapture(path), path)
+
+def probe_video(path: str, options: Optional[VideoIOOptions] = None) -> Dict[str, Any]:
+    """Frame size, FPS and frame count, as reported by the configured decoder."""
+    reader = open_video(path, options)
+    try:
+        return reader.props
+    finally:
+        reader.release()
+
+def _x264_options(codec: str, preset: str, crf: int) -> Dict[str, str]:
+    return {"preset": preset, "crf": str(crf)} if codec.startswith(("libx264", "libx265")) else {}
+
+class FFmpegPipeWriter:
+    """
+    Encodes by streaming raw BGR frames into an ffmpeg process. Each frame's buffer is written to the pipe
+    as is (no tobytes copy), and encoding runs in ffmpeg's own threads alongside the pipeline.
+    """
+
+    def __init__(self, path: str, fps: float, width: int, height: int, codec: str = "libx264",
+                 preset: str = "veryfast", crf: int = 23, binary: str = "ffmpeg"):
+        executable = shutil.which(binary)
+        if executable is None:
+            raise FileNotFoundError(f"video_writer: ffmpeg needs the {binary} executable on PATH")
+        self.path = path
+        self.shape = (height, width, 3)
+        command = [executable, "-loglevel", "error", "-y",
+                   "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-",
+                   "-an", "-c:v", codec]
+        for key, value in _x264_options(codec, preset, crf).items():
+            command += [f"-{key}", value]
+        command += ["-pix_fmt", "yuv420p", path]
+        self.proc = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match the writer's {self.shape}")
+        self.proc.stdin.write(np.ascontiguousarray(frame).data)
+
+    def release(self) -> None:
+        if self.proc is None:
+            return
+        self.proc.stdin.close()
+        code = self.proc.wait()
+        self.proc = None
+        if code != 0:
+            raise RuntimeError(f"ffmpeg exited with status {code} while writing {self.path}")
+
+class PyAVWriter:
+    """Encodes in-process with PyAV; frames are converted to the codec's pixel format by libswscale."""
+
+    def __init__(self, path: str, fps: float, width: int, height: int, codec: str = "libx264",
+                 preset: str = "veryfast", crf: int = 23):
+        self.av = require_pyav("video_writer")
+        self.container = self.av.open(path, mode="w")
+        self.stream = self.container.add_stream(codec, rate=Fraction(fps).limit_denominator(1001))
+        self.stream.width, self.stream.height = width, height
+        self.stream.pix_fmt = "yuv420p"
+        self.stream.options = _x264_options(codec, preset, crf)
+        self.stream.thread_type = "AUTO"
+
+    def write(self, frame: np.ndarray) -> None:
+        for packet in self.stream.encode(self.av.VideoFrame.from_ndarray(frame, format="bgr24")):
+            self.container.mux(packet)
+
+    def release(self) -> None:
+        if self.container is None:
+            return
+        for packet in self.stream.encode(None):
+            self.container.mux(packet)
+        self.container.close()
+        self.container = None
+
+class JpegFrameWriter:
+    """
+    Writes every frame as its own JPEG (000001.jpg, ...) into a directory named after the output file without
+    its extension. Frames are intra-coded, so no encoder state is kept and any frame can be read on its own.
+    """
+
+    def __init__(self, path: str, quality: int = 90):
+        self.directory = os.path.splitext(path)[0]
+        os.makedirs(self.directory, exist_ok=True)
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.frames = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        ok, buf = cv2.imencode(".jpg", frame, self.params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        self.frames += 1
+        with open(os.path.join(self.directory, f"{self.frames:06d}.jpg"), "wb") as f:
+            f.write(buf.data)
+
+    def release(self) -> None:
+        pass
+
+def open_writer(path: str, fps: float, width: int, height: int, options: Optional[VideoIOOptions] = None) -> Any:
+    """Opens the configured writer; every writer has `write(frame)` and `release()` like cv2.VideoWriter."""
+    options = options or VideoIOOptions()
+    if options.writer == Writer.FFMPEG:
+        return FFmpegPipeWriter(path, fps, width, height, options.codec, options.preset, options.crf,
+                                options.ffmpeg_binary)
+    if options.writer == Writer.PYAV:
+        return PyAVWriter(path, fps, width, height, options.codec, options.preset, options.crf)
+    if options.writer == Writer.JPEG:
+        return JpegFrameWriter(path, options.jpeg_quality)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*options.fourcc), fps, (width, height))
+    if not writer.isOpened():
+        raise ValueError(f"Could not open a {options.fourcc} video writer for {path}")
+    return writer
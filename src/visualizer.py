@@ -1,37 +1,168 @@
 import cv2
 import numpy as np
-from typing import Any, List, Tuple, Dict
+from collections import OrderedDict
+from typing import Any, List, Tuple, Dict, Optional
 from .line_crossing import Orientation
 
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+HUD_BOX = (10, 10, 250, 140)  # x1, y1, x2, y2 (inclusive) of the shaded HUD panel
+HUD_ALPHA = 0.6               # opacity of the panel's black fill
+
+class Sprite:
+    """
+    A pre-rendered layer: the pixels of its bounding box as drawn on black (so premultiplied by coverage) and an
+    alpha mask of how much of each pixel it covers. Pasting touches only the layer, clipped to the frame: fully
+    opaque layers (lines, which may run diagonally across most of the frame) scatter just their covered pixels,
+    antialiased ones (text, a small box) are blended over their box.
+    """
+    __slots__ = ("x", "y", "pixels", "alpha", "opaque", "points", "colors")
+
+    def __init__(self, x: int, y: int, pixels: np.ndarray, alpha: np.ndarray):
+        self.x, self.y = x, y
+        self.pixels = pixels
+        self.alpha = alpha
+        self.opaque = bool(np.isin(alpha, (0, 255)).all())
+        self.points = np.nonzero(alpha) if self.opaque else None
+        self.colors = pixels[self.points] if self.opaque else None
+
+    @classmethod
+    def render(cls, x0: int, y0: int, width: int, height: int, draw: Any) -> Optional["Sprite"]:
+        """Runs `draw(canvas, color_or_None)` on a scratch canvas of the given box and keeps what it touched."""
+        pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        alpha = np.zeros((height, width), dtype=np.uint8)
+        draw(pixels, None)
+        draw(alpha, 255)
+        ys, xs = np.nonzero(alpha)
+        if len(xs) == 0:
+            return None
+        ya, yb, xa, xb = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        return cls(x0 + xa, y0 + ya, pixels[ya:yb, xa:xb].copy(), alpha[ya:yb, xa:xb].copy())
+
+    def paste(self, frame: np.ndarray, dx: int = 0, dy: int = 0) -> None:
+        x, y = self.x + dx, self.y + dy
+        h, w = self.alpha.shape
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1, fy1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        if self.opaque:
+            ys, xs, colors = self.points[0] + y, self.points[1] + x, self.colors
+            if fx1 - fx0 < w or fy1 - fy0 < h:
+                inside = (ys >= fy0) & (ys < fy1) & (xs >= fx0) & (xs < fx1)
+                ys, xs, colors = ys[inside], xs[inside], colors[inside]
+            frame[ys, xs] = colors
+            return
+        sy, sx = slice(fy0 - y, fy1 - y), slice(fx0 - x, fx1 - x)
+        region = frame[fy0:fy1, fx0:fx1]
+        keep = 255 - self.alpha[sy, sx, None].astype(np.uint16)
+        region[...] = self.pixels[sy, sx] + (region * keep + 127) // 255
+
+class TextCache:
+    """putText results as sprites positioned relative to the text origin, keyed by text and style."""
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.sprites: "OrderedDict[Tuple, Optional[Sprite]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def draw(self, frame: np.ndarray, text: str, org: Tuple[int, int], scale: float, color: Tuple[int, int, int],
+             thickness: int) -> None:
+        key = (text, scale, color, thickness)
+        if key in self.sprites:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+        else:
+            self.misses += 1
+            (w, h), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+            pad = thickness + 2
+            # Rendered with the origin at (pad, pad + h), so glyph pixels match drawing straight onto the frame
+            self.sprites[key] = Sprite.render(
+                -pad, -pad - h, w + 2 * pad, h + baseline + 2 * pad,
+                lambda canvas, fill: cv2.putText(canvas, text, (pad, pad + h), FONT, scale,
+                                                 color if fill is None else fill, thickness))
+            if len(self.sprites) > self.size:
+                self.sprites.popitem(last=False)
+        sprite = self.sprites[key]
+        if sprite is not None:
+            sprite.paste(frame, *org)
+
 class Visualizer:
-    """Handles drawing of HUD, bounding boxes, and counting line."""
-    
-    def __init__(self, line_coord: int, orientation: Orientation, width: int, height: int):
+    """
+    Handles drawing of HUD, bounding boxes, and counting line.
+    The line and gate shapes never change, so they are rendered once into sprites; count labels are cached
+    until the counts change; the HUD panel is shaded in place over its own pixels only.
+    """
+
+    def __init__(self, line_coord: int, orientation: Orientation, width: int, height: int, gates: Optional[List[Any]] = None):
         self.line_coord = line_coord
         self.orientation = orientation
         self.width = width
         self.height = height
+        self.gates = gates or []
+        self.text = TextCache()
+        self.static_layers = self._render_static_layers()
 
-    def draw_hud(self, frame: Any, count_in: int, count_out: int, frame_idx: int) -> Any:
-        """Draws the counting line and HUD overlay."""
-        # Draw counting line
-        if self.orientation == Orientation.HORIZONTAL:
-            cv2.line(frame, (0, self.line_coord), (self.width, self.line_coord), (0, 0, 255), 3)
+    def _render_static_layers(self) -> List[Sprite]:
+        """One sprite per counting line or gate (polyline and IN arrow), each cropped to what it covers."""
+        layers = []
+        if self.gates:
+            for gate in self.gates:
+                layers.append(Sprite.render(0, 0, self.width, self.height,
+                                            lambda canvas, fill, g=gate: self._draw_gate_shape(canvas, g, fill)))
+        elif self.orientation == Orientation.HORIZONTAL:
+            layers.append(Sprite.render(0, 0, self.width, self.height, lambda canvas, fill: cv2.line(
+                canvas, (0, self.line_coord), (self.width, self.line_coord), fill or (0, 0, 255), 3)))
         else:
-            cv2.line(frame, (self.line_coord, 0), (self.line_coord, self.height), (0, 0, 255), 3)
-        
-        # HUD Background
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (250, 140), (0, 0, 0), -1)
-        alpha = 0.6
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
-        
-        # HUD Text
-        cv2.putText(frame, f"Frame: {frame_idx}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(frame, f"IN: {count_in}", (20, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        cv2.putText(frame, f"OUT: {count_out}", (20, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-        cv2.putText(frame, f"TOTAL: {count_in + count_out}", (20, 135), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-        
+            layers.append(Sprite.render(0, 0, self.width, self.height, lambda canvas, fill: cv2.line(
+                canvas, (self.line_coord, 0), (self.line_coord, self.height), fill or (0, 0, 255), 3)))
+        return [layer for layer in layers if layer is not None]
+
+    @staticmethod
+    def _draw_gate_shape(canvas: np.ndarray, gate: Any, fill: Optional[int]) -> None:
+        pts = np.round(gate.points).astype(np.int32)
+        cv2.polylines(canvas, [pts.reshape(-1, 1, 2)], False, fill or (0, 0, 255), 3)
+
+        # IN points to the right-hand side of the first segment
+        a, b = gate.points[0], gate.points[1]
+        mid = (a + b) / 2
+        d = (b - a) / max(np.linalg.norm(b - a), 1e-6)
+        normal = np.array([-d[1], d[0]])
+        tip = mid + normal * 30
+        cv2.arrowedLine(canvas, tuple(int(v) for v in mid), tuple(int(v) for v in tip), fill or (0, 255, 0), 2,
+                        tipLength=0.3)
+
+    def draw_gates(self, frame: Any, gate_counts: Optional[Dict[str, Dict[str, int]]] = None) -> Any:
+        """Draws each gate polyline with an arrow towards its IN side and its running totals."""
+        for layer in self.static_layers:
+            layer.paste(frame)
+        for gate in self.gates:
+            counts = (gate_counts or {}).get(gate.name, {"in": 0, "out": 0})
+            label = f"{gate.name} IN {counts['in']} OUT {counts['out']}"
+            x, y = int(round(gate.points[0][0])), int(round(gate.points[0][1])) - 10
+            self.text.draw(frame, label, (max(0, x), max(20, y)), 0.6, (0, 255, 255), 2)
+        return frame
+
+    def draw_hud(self, frame: Any, count_in: int, count_out: int, frame_idx: int,
+                 gate_counts: Optional[Dict[str, Dict[str, int]]] = None) -> Any:
+        """Draws the counting line (or gates) and HUD overlay."""
+        if self.gates:
+            self.draw_gates(frame, gate_counts)
+        else:
+            for layer in self.static_layers:
+                layer.paste(frame)
+
+        # HUD background: blending with a black panel only scales the panel's own pixels
+        x1, y1, x2, y2 = HUD_BOX
+        panel = frame[y1:y2 + 1, x1:x2 + 1]
+        panel[...] = cv2.addWeighted(panel, 1 - HUD_ALPHA, panel, 0, 0)
+
+        # HUD text; the count lines are cached until a count changes
+        cv2.putText(frame, f"Frame: {frame_idx}", (20, 40), FONT, 0.8, (255, 255, 255), 2)
+        self.text.draw(frame, f"IN: {count_in}", (20, 75), 0.8, (0, 255, 0), 2)
+        self.text.draw(frame, f"OUT: {count_out}", (20, 105), 0.8, (0, 0, 255), 2)
+        self.text.draw(frame, f"TOTAL: {count_in + count_out}", (20, 135), 0.8, (0, 255, 255), 2)
+
         return frame
 
     def draw_detections(self, frame: Any, detection_data: List[Dict[str, Any]]) -> Any:
@@ -44,14 +175,14 @@ class Visualizer:
             track_id = data['id']
             color = data['color']
             label = data.get('label', 'Object')
-            
+
             x1, y1, x2, y2 = map(int, box)
             # Draw box
             cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
             # Draw ID and Label
-            cv2.putText(frame, f"{label} ID: {track_id}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+            cv2.putText(frame, f"{label} ID: {track_id}", (x1, y1 - 10), FONT, 0.6, color, 2)
             # Draw center point
             cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
             cv2.circle(frame, (cx, cy), 5, color, -1)
-            
+
         return frame
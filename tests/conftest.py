@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+import pytest
+
+class _Attr:
+    def __init__(self, val):
+        self.val = val
+    def cpu(self):
+        return self
+    def numpy(self):
+        return self.val
+
+class _Boxes:
+    def __init__(self, xyxy, ids, cls, conf):
+        self.xyxy = _Attr(xyxy)
+        self.id = _Attr(ids) if ids is not None else None
+        self.cls = _Attr(cls)
+        self.conf = _Attr(conf)
+
+class _Results:
+    def __init__(self, xyxy, ids, cls, conf):
+        self.boxes = _Boxes(xyxy, ids, cls, conf)
+
+class StubModel:
+    """
+    Stands in for an ultralytics model. The bright blob drawn by `synthetic_video` is reported
+    as a worker (id 1, class 0) carrying a sack (id 2, class 24) with the same box.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.frames_seen = 0
+
+    def detect(self, frame):
+        mask = frame.max(axis=2) > 200 if frame.ndim == 3 else frame > 200
+        ys, xs = np.nonzero(mask)
+        if len(xs) == 0:
+            return _Results(np.empty((0, 4), np.float32), None, np.empty(0), np.empty(0))
+        box = [xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]
+        xyxy = np.array([box, box], dtype=np.float32)
+        return _Results(xyxy, np.array([1.0, 2.0]), np.array([0.0, 24.0]), np.array([0.9, 0.8], dtype=np.float32))
+
+    def track(self, source, **kwargs):
+        frames = source if isinstance(source, list) else [source]
+        self.calls += 1
+        self.frames_seen += len(frames)
+        self.last_shape = frames[-1].shape
+        return [self.detect(frame) for frame in frames]
+
+    def predict(self, source, **kwargs):
+        """Detections without track ids; the batched path runs ByteTrack on them itself."""
+        return [_Results(r.boxes.xyxy.val, None, r.boxes.cls.val, r.boxes.conf.val)
+                for r in self.track(source, **kwargs)]
+
+def write_video(path, frames, fps=10.0):
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+def moving_blob_frames(n=30, width=320, height=240, size=30, idle=0):
+    """A blob moving left to right across the frame, followed by `idle` empty frames."""
+    frames = []
+    for i in range(n):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        x = int(10 + (width - size - 20) * i / max(n - 1, 1))
+        y = height // 2
+        frame[y:y + size, x:x + size] = 255
+        frames.append(frame)
+    frames.extend(np.zeros((height, width, 3), dtype=np.uint8) for _ in range(idle))
+    return frames
+
+@pytest.fixture
+def synthetic_video(tmp_path):
+    return write_video(tmp_path / "synthetic.avi", moving_blob_frames())
+
+@pytest.fixture
+def stub_model():
+    return StubModel()
+
+@pytest.fixture
+def stub_config():
+    return {
+        'line_position': 0.5,
+        'line_orientation': 'vertical',
+        'count_direction': 'both',
+        'cooldown_frames': 5,
+        'track_classes': [0, 24],
+        'person_classes': [0],
+        'bag_classes': [24]
+    }
@@ -0,0 +1,62 @@
+import sys
+import numpy as np
+import pytest
+from src.association import AssociationMode, associate, box_centroids, split_classes
+
+def test_box_centroids():
+    centers = box_centroids([[0, 0, 10, 20], [10, 10, 30, 30]])
+    assert np.allclose(centers, [[5, 10], [20, 20]])
+
+def test_greedy_picks_nearest_person_within_threshold():
+    people = [[0, 0, 10, 10], [100, 0, 110, 10]]
+    bags = [[98, 0, 108, 10], [500, 500, 510, 510]]
+
+    result = associate(people, bags, threshold=50)
+    assert result.bag_to_person.tolist() == [1, -1]
+    assert result.bag_mask.tolist() == [True, False]
+    assert result.person_has_bag.tolist() == [False, True]
+
+def test_greedy_allows_shared_person():
+    people = [[0, 0, 10, 10], [200, 0, 210, 10]]
+    bags = [[2, 0, 12, 10], [4, 0, 14, 10]]
+
+    result = associate(people, bags, threshold=150)
+    assert result.bag_to_person.tolist() == [0, 0]
+
+def test_optimal_assigns_one_bag_per_person():
+    # Both bags are closest to person 0, but person 1 is still within range of bag 1
+    people = [[0, 0, 10, 10], [100, 0, 110, 10]]
+    bags = [[2, 0, 12, 10], [40, 0, 50, 10]]
+
+    result = associate(people, bags, threshold=150, mode=AssociationMode.OPTIMAL)
+    assert result.bag_to_person.tolist() == [0, 1]
+    assert result.person_has_bag.tolist() == [True, True]
+
+def test_optimal_respects_threshold():
+    people = [[0, 0, 10, 10]]
+    bags = [[2, 0, 12, 10], [4, 0, 14, 10], [900, 0, 910, 10]]
+
+    result = associate(people, bags, threshold=150, mode=AssociationMode.OPTIMAL)
+    assert result.bag_mask.sum() == 1
+    assert result.bag_to_person[2] == -1
+
+def test_optimal_without_scipy_names_the_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "scipy.optimize", None)
+    with pytest.raises(ImportError, match="association_mode: optimal needs the scipy package"):
+        associate([[0, 0, 10, 10]], [[2, 0, 12, 10]], mode=AssociationMode.OPTIMAL)
+    # Greedy matching never needs it
+    assert associate([[0, 0, 10, 10]], [[2, 0, 12, 10]]).bag_mask.tolist() == [True]
+
+def test_empty_inputs():
+    result = associate(np.empty((0, 4)), [[0, 0, 10, 10]])
+    assert result.bag_to_person.tolist() == [-1]
+    assert result.person_has_bag.shape == (0,)
+
+    result = associate([[0, 0, 10, 10]], np.empty((0, 4)))
+    assert result.bag_mask.shape == (0,)
+    assert result.person_has_bag.tolist() == [False]
+
+def test_split_classes_overlapping():
+    person_mask, bag_mask = split_classes([0, 24, 5], person_classes=[0], bag_classes=[0, 24])
+    assert person_mask.tolist() == [True, False, False]
+    assert bag_mask.tolist() == [True, True, False]
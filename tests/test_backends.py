@@ -0,0 +1,127 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from src.backends import (Backend, Detections, ExportedDetector, Preprocessor, letterbox_geometry, load_detector,
+                          nms, postprocess)
+from src.counter import BagCounter
+from src.pipeline import CountSink, FramePipeline
+from src.tracker import TrackerWrapper
+from tests.conftest import moving_blob_frames
+
+NUM_CLASSES = 25
+
+class BlobDetector(ExportedDetector):
+    """
+    Exported-model stand-in: finds the bright blob in the letterboxed input tensor and emits YOLOv8 head
+    output for it, once as a person (class 0) and once as a sack (class 24).
+    """
+
+    def __init__(self, imgsz=320):
+        super().__init__("blob.onnx", imgsz)
+        self.batch_limit = 4
+
+    def _forward(self, tensor):
+        out = np.zeros((len(tensor), 4 + NUM_CLASSES, 2), dtype=np.float32)
+        for pred, image in zip(out, tensor):
+            ys, xs = np.nonzero(image.min(axis=0) > 0.9)
+            if len(xs) == 0:
+                continue
+            box = [(xs.min() + xs.max() + 1) / 2, (ys.min() + ys.max() + 1) / 2, xs.max() + 1 - xs.min(),
+                   ys.max() + 1 - ys.min()]
+            pred[:4, :] = np.array(box)[:, None]
+            pred[4 + 0, 0] = 0.9
+            pred[4 + 24, 1] = 0.8
+        return out
+
+def test_letterbox_matches_box_mapping():
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    frame[100:130, 50:80] = 255
+    tensor, gain, pad = Preprocessor(640)([frame])
+    assert tensor.shape == (1, 3, 640, 640) and tensor.dtype == np.float32
+    assert (gain, pad) == (2.0, (0, 80))
+    assert tensor[0, :, 0, 0] == pytest.approx(114 / 255)
+    ys, xs = np.nonzero(tensor[0].min(axis=0) > 0.9)
+    assert (xs.min() / gain, (ys.min() - pad[1]) / gain) == pytest.approx((50, 100), abs=1)
+
+@pytest.mark.parametrize("shape", [(1080, 1920), (720, 1280), (480, 360), (333, 517)])
+def test_letterbox_geometry_fits_the_square(shape):
+    gain, (w, h), (px, py) = letterbox_geometry(shape, 640)
+    assert max(w, h) == 640 and px + w <= 640 and py + h <= 640
+    assert abs(w - shape[1] * gain) <= 1 and abs(h - shape[0] * gain) <= 1
+
+def test_nms_matches_torchvision():
+    torch = pytest.importorskip("torch")
+    ops = pytest.importorskip("torchvision.ops")
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 600, (300, 2))
+    boxes = np.concatenate([xy, xy + rng.uniform(10, 120, (300, 2))], axis=1).astype(np.float32)
+    scores = rng.uniform(0, 1, 300).astype(np.float32)
+    expected = ops.nms(torch.from_numpy(boxes), torch.from_numpy(scores), 0.5).numpy()
+    assert np.array_equal(nms(boxes, scores, 0.5), expected)
+
+def test_postprocess_filters_suppresses_and_rescales():
+    pred = np.zeros((4 + NUM_CLASSES, 4), dtype=np.float32)
+    pred[:4, 0] = [100, 200, 40, 60]   # best box
+    pred[:4, 1] = [102, 201, 40, 60]   # duplicate of it, same class
+    pred[:4, 2] = [102, 201, 40, 60]   # same place, other class: kept
+    pred[:4, 3] = [300, 300, 20, 20]   # below the confidence threshold
+    pred[4 + 24, [0, 1]] = [0.9, 0.7]
+    pred[4 + 0, 2] = 0.6
+    pred[4 + 24, 3] = 0.2
+    dets = postprocess(pred, 0.25, [0, 24], gain=2.0, pad=(0, 80), shape=(240, 320))
+    assert len(dets) == 2
+    assert dets.cls.tolist() == [24.0, 0.0]
+    assert dets.xyxy[0].tolist() == pytest.approx([40, 45, 60, 75])
+    assert len(postprocess(pred, 0.25, [26], 2.0, (0, 80), (240, 320))) == 0
+
+def test_detections_index_like_ultralytics_boxes():
+    dets = Detections(np.array([[0, 0, 10, 20], [5, 5, 7, 9]], np.float32), np.array([0.9, 0.2], np.float32),
+                      np.array([0.0, 24.0], np.float32))
+    assert dets.xywh.tolist() == [[5, 10, 10, 20], [6, 7, 2, 4]]
+    high = dets[dets.conf > 0.5]
+    assert len(high) == 1 and high.cls.tolist() == [0.0]
+
+def test_bytetrack_adapter_builds_without_a_model():
+    tracker = TrackerWrapper("missing.pt", backend="onnx")
+    byte = tracker._bytetrack()
+    assert byte is tracker._bytetrack() and byte.args.tracker_type == "bytetrack"
+    assert 0 < byte.args.track_high_thresh <= 1 and byte.args.track_buffer > 0
+    assert not tracker.loaded
+
+def test_bytetrack_keeps_ids_on_exported_detections():
+    tracker = TrackerWrapper("missing.pt", backend="onnx")
+    tracker._detectors[640] = BlobDetector()
+    ids = [tracker.track(frame, conf=0.4, classes=[0, 24]).boxes.id.cpu().numpy().tolist()
+           for frame in moving_blob_frames()]
+    assert all(sorted(i) == sorted(ids[0]) for i in ids) and len(ids[0]) == 2
+    tracker.reset()
+    tracker._detectors[640] = BlobDetector()
+    assert tracker.track(moving_blob_frames(n=1)[0], conf=0.4, classes=[0]).boxes.id.cpu().numpy().tolist() == [1.0]
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_exported_backend_tracks_and_counts(synthetic_video, stub_config, batch_size):
+    counter = BagCounter({**stub_config, 'model': "missing.pt", 'inference_backend': 'onnx',
+                          'batch_size': batch_size})
+    counter.tracker._detectors[640] = BlobDetector()
+    for _ in FramePipeline(counter, [CountSink()]).run(synthetic_video):
+        pass
+    assert (counter.count_in, counter.count_out) == (1, 0)
+    assert counter.tracker._model is None
+
+@pytest.mark.skipif(not os.environ.get("PARITY_MODEL"), reason="set PARITY_MODEL to a .pt to compare backends")
+def test_onnx_matches_torch_within_tolerance():
+    pytest.importorskip("onnxruntime")
+    from ultralytics import YOLO
+
+    weights = os.environ["PARITY_MODEL"]
+    cap = cv2.VideoCapture("data/samples/test_mp4v_mp4.mp4")
+    ok, frame = cap.read()
+    cap.release()
+    assert ok
+    reference = YOLO(weights).predict(frame, conf=0.25, verbose=False)[0].boxes
+    dets = load_detector(weights, Backend.ONNX)([frame], conf=0.25)[0]
+    assert len(dets) == len(reference)
+    order = np.argsort(-dets.conf)
+    assert dets.xyxy[order] == pytest.approx(reference.xyxy.cpu().numpy(), abs=2.0)
+    assert dets.conf[order] == pytest.approx(reference.conf.cpu().numpy(), abs=0.02)
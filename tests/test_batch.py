@@ -0,0 +1,63 @@
+import os
+import pytest
+from src.batch import order_jobs, run_jobs
+from src.quantization import register_variant, variant_path
+from tests.conftest import StubModel, moving_blob_frames, write_video
+
+def stub_factory(model_path):
+    return StubModel()
+
+@pytest.fixture
+def jobs(tmp_path, stub_config):
+    short = write_video(tmp_path / "short.avi", moving_blob_frames(n=20))
+    long = write_video(tmp_path / "long.avi", moving_blob_frames(n=40))
+    config = {**stub_config, 'output_dir': str(tmp_path / "out")}
+    return [{"video": short, "config": config}, {"video": long, "config": config}]
+
+def test_order_jobs_largest_first(jobs):
+    ordered = order_jobs(jobs, "largest-first")
+    assert os.path.basename(ordered[0]["video"]) == "long.avi"
+    assert order_jobs(jobs, "given") == jobs
+    with pytest.raises(ValueError):
+        order_jobs(jobs, "random")
+
+def test_run_jobs_in_process(jobs):
+    results = run_jobs(jobs, workers=0, model_factory=stub_factory)
+    assert [os.path.basename(r["video"]) for r in results] == ["short.avi", "long.avi"]
+    for r in results:
+        assert r["error"] is None
+        assert (r["in"], r["out"]) == (1, 0)
+        assert len(r["events"]) == 1
+    assert results[1]["frames"] == 40
+
+def test_run_jobs_pool_reuses_model_and_reports_errors(jobs, tmp_path):
+    jobs.append({"video": str(tmp_path / "missing.avi"), "config": jobs[0]["config"]})
+    results = run_jobs(jobs, workers=2, threads_per_worker=1, model_factory=stub_factory)
+
+    assert [(r["in"], r["out"]) for r in results[:2]] == [(1, 0), (1, 0)]
+    assert results[2]["error"].startswith("FileNotFoundError")
+
+def test_run_jobs_saves_output(jobs, tmp_path):
+    jobs[0]["save_output"] = True
+    results = run_jobs(jobs[:1], workers=0, model_factory=stub_factory)
+    assert os.path.exists(results[0]["output"])
+
+def test_run_jobs_loads_the_model_precision_variant(jobs, tmp_path):
+    weights = str(tmp_path / "best.pt")
+    path = variant_path(weights, "int8")
+    open(path, "wb").close()
+    register_variant(weights, "int8", 640, {"path": path, "status": "accepted"})
+    loaded = []
+
+    def factory(model_path):
+        loaded.append(model_path)
+        return StubModel()
+
+    config = {**jobs[0]["config"], 'model': weights, 'model_precision': 'int8'}
+    results = run_jobs([{**job, "config": config} for job in jobs], workers=0, model_factory=factory)
+    assert [(r["in"], r["out"]) for r in results] == [(1, 0), (1, 0)]
+    assert loaded == [path]
+
+    results = run_jobs([{**jobs[0], "config": {**config, 'model_precision': 'fp16'}}], workers=0,
+                       model_factory=factory)
+    assert results[0]["error"].startswith("ValueError") and loaded == [path]
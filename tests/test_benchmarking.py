@@ -0,0 +1,33 @@
+import time
+from src.benchmarking import Benchmark, compare, load_results, measure, run_suite, save_results
+
+def test_measure_reports_per_item_time_and_calibrates_the_call_count():
+    calls = []
+
+    def setup():
+        calls.clear()
+        return lambda: (calls.append(1), time.sleep(0.001))
+
+    result = measure(Benchmark("sleep", setup, unit="frame", items=4), repeat=3, min_time=0.02)
+    assert result["unit"] == "frame" and result["repeat"] == 3 and len(result["samples_s"]) == 3
+    # Each round lasts at least min_time, so several calls are made per round
+    assert result["number"] >= 8
+    assert len(calls) >= 1 + 3 * result["number"]
+    assert 0.001 / 4 <= result["min_s"] <= result["median_s"] < 0.01
+    assert abs(result["per_second"] * result["median_s"] - 1.0) < 1e-9
+
+def test_results_round_trip_through_json(tmp_path):
+    report = run_suite([Benchmark("noop", lambda: (lambda: None), params={"n": 1})], repeat=2, min_time=0.001)
+    assert report["environment"]["python"] and "opencv" in report["environment"]
+    path = str(tmp_path / "runs" / "a.json")
+    save_results(report, path)
+    assert load_results(path)["results"]["noop"]["params"] == {"n": 1}
+
+def test_compare_flags_slowdowns_beyond_the_threshold():
+    def report(**times):
+        return {"results": {name: {"median_s": t, "min_s": t} for name, t in times.items()}}
+
+    rows = compare(report(a=1.0, b=1.0, c=1.0, gone=1.0), report(a=1.2, b=1.3, c=0.5, added=1.0), threshold=1.25)
+    status = {row["name"]: row["status"] for row in rows}
+    assert status == {"a": "same", "b": "slower", "c": "faster", "gone": "missing", "added": "new"}
+    assert next(row for row in rows if row["name"] == "b")["ratio"] == 1.3
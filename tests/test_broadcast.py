@@ -0,0 +1,137 @@
+import time
+import threading
+from src.broadcast import BroadcastHub, FrameRing
+
+def counting_source(calls, n=None, delay=0.005):
+    """Source factory yielding numbered frames; records how many producers were started."""
+    def factory(key, channel):
+        calls.append(key)
+        state = {"produced": 0}
+        def frames():
+            i = 0
+            while n is None or i < n:
+                time.sleep(delay)
+                state["produced"] = i + 1
+                yield i
+                i += 1
+        return state, frames()
+    return factory
+
+def wait_until(predicate, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_ring_slow_reader_skips_to_newest():
+    ring = FrameRing(size=4)
+    for i in range(10):
+        ring.publish(i)
+    assert ring.read(0) == (9, 9)
+    assert ring.dropped == 9
+    assert ring.read(7) == (7, 7)
+    ring.close()
+    assert ring.read(10) is None
+
+def test_viewers_share_one_pipeline():
+    calls = []
+    hub = BroadcastHub(counting_source(calls), grace_seconds=0)
+    a, b = hub.stream("1"), hub.stream("1")
+    first_a = [next(a) for _ in range(5)]
+    first_b = [next(b) for _ in range(5)]
+    assert calls == ["1"]
+    assert first_a == sorted(first_a) and first_b == sorted(first_b)
+    assert hub.stats()["1"]["subscribers"] == 2
+    a.close()
+    b.close()
+    channel = hub.get("1")
+    assert wait_until(lambda: not channel.running)
+
+def test_slow_viewer_does_not_stall_producer():
+    calls = []
+    hub = BroadcastHub(counting_source(calls, delay=0.001), ring_size=4, grace_seconds=0)
+    slow = hub.stream("1")
+    next(slow)
+    channel = hub.get("1")
+    assert wait_until(lambda: channel.published > 50)
+    later = next(slow)
+    assert later > 40 and channel.ring.dropped > 0
+    slow.close()
+
+def test_grace_period_then_restart():
+    calls = []
+    hub = BroadcastHub(counting_source(calls), grace_seconds=0.2)
+    viewer = hub.stream("2")
+    next(viewer)
+    viewer.close()
+    channel = hub.get("2")
+    time.sleep(0.05)
+    assert channel.running  # still inside the grace period
+
+    # Rejoining within the grace period keeps the same pipeline
+    viewer = hub.stream("2")
+    next(viewer)
+    assert calls == ["2"]
+    viewer.close()
+    assert wait_until(lambda: not channel.running)
+
+    viewer = hub.stream("2")
+    next(viewer)
+    assert calls == ["2", "2"] and hub.get("2") is not channel
+    viewer.close()
+
+def test_rejoin_restarts_the_grace_period():
+    calls = []
+    hub = BroadcastHub(counting_source(calls), grace_seconds=0.3)
+    viewer = hub.stream("3")
+    next(viewer)
+    viewer.close()
+    channel = hub.get("3")
+    time.sleep(0.2)
+
+    # Leaving again just before the first grace period ends: the channel must last a full period from now
+    viewer = hub.stream("3")
+    next(viewer)
+    viewer.close()
+    time.sleep(0.2)
+    assert channel.running and not channel.stop_event.is_set()
+    assert wait_until(lambda: not channel.running)
+    assert calls == ["3"]
+
+def test_stream_ends_with_source():
+    calls = []
+    hub = BroadcastHub(counting_source(calls, n=5), grace_seconds=0)
+    frames = list(hub.stream("3"))
+    assert frames[-1] == 4
+    assert hub.get("3").state["produced"] == 5
+
+def test_update_listeners_follow_runs():
+    started = threading.Event()
+    release = threading.Event()
+
+    def factory(key, channel):
+        def frames():
+            started.wait()
+            for i in range(3):
+                channel.publish_update({"type": "counts", "in": i + 1})
+                channel.publish_update({"type": "crossing", "track_id": i})
+                yield i
+            release.wait(2.0)
+        return None, frames()
+
+    hub = BroadcastHub(factory, grace_seconds=0)
+    listener = hub.updates("1", heartbeat=0.05)
+    assert next(listener) is None            # nothing running yet
+    viewer = hub.stream("1")
+    threading.Thread(target=lambda: list(viewer), daemon=True).start()
+
+    snapshot = next(m for m in listener if m is not None)
+    assert snapshot["type"] == "counts" and snapshot["in"] == 0
+    started.set()
+    received = [m for m in (next(listener) for _ in range(8)) if m is not None]
+    assert [m["type"] for m in received[:6]] == ["counts", "crossing"] * 3
+    assert received[4]["in"] == 3
+    release.set()
+    assert next(m for m in listener if m is not None)["type"] == "end"
@@ -0,0 +1,77 @@
+import pytest
+from src.calibration import GroundTruth, calibrate, expand_grid, match_events, parse_values, score_trial
+from src.quantization import register_variant, variant_path
+from tests.conftest import StubModel
+
+class NamedStub(StubModel):
+    ckpt_path = "missing-weights.pt"
+
+def test_parse_values():
+    assert parse_values("0.3:0.5:0.1") == [0.3, 0.4, 0.5]
+    assert parse_values("10, 25,40", int) == [10, 25, 40]
+    assert parse_values("both,left_to_right", str) == ["both", "left_to_right"]
+    assert len(expand_grid({"a": [1, 2], "b": [3, 4, 5]})) == 6
+
+def test_event_matching_respects_direction_and_tolerance():
+    truth = [(10, "in"), (50, "in"), (80, "out")]
+    assert match_events([(12, "in"), (48, "in"), (80, "out")], truth, tolerance=5) == 3
+    assert match_events([(12, "out"), (70, "in")], truth, tolerance=5) == 0
+    assert match_events([(10, "in"), (11, "in")], truth, tolerance=5) == 1
+
+    metrics = score_trial(2, 1, [(10, "in"), (11, "in"), (80, "out")], GroundTruth(3, 1, truth), tolerance=5)
+    assert metrics["count_error"] == 1
+    assert metrics["precision"] == pytest.approx(2 / 3, abs=1e-3)
+    assert metrics["recall"] == pytest.approx(2 / 3, abs=1e-3)
+
+def test_calibrate_finds_line_that_counts_the_crossing(tmp_path, synthetic_video, stub_config):
+    config = {**stub_config, 'model': NamedStub.ckpt_path}
+    axes = {"line_position": [0.05, 0.5, 0.95], "cooldown_frames": [5, 10], "count_direction": ["both", "right_to_left"]}
+    truth = GroundTruth(count_in=1, count_out=0)
+
+    report = calibrate(synthetic_video, config, axes, truth, str(tmp_path / "tracks"), workers=0, model=NamedStub())
+    assert report["sweep"]["trials"] == 12
+    assert not report["record"]["replayed"]
+    best = report["best"]
+    assert best["params"]["line_position"] == 0.5
+    assert best["params"]["count_direction"] == "both"
+    assert best["metrics"]["count_error"] == 0
+    assert best["ties"] == 2  # both cooldowns count the single crossing
+
+    # A second sweep reuses the recording
+    again = calibrate(synthetic_video, config, {"line_position": [0.5]}, truth, str(tmp_path / "tracks"), workers=0)
+    assert again["record"]["replayed"]
+
+def test_calibrate_in_worker_processes(tmp_path, synthetic_video, stub_config):
+    config = {**stub_config, 'model': NamedStub.ckpt_path}
+    report = calibrate(synthetic_video, config, {"line_position": [0.05, 0.5]}, GroundTruth(1, 0),
+                       str(tmp_path / "tracks"), workers=2, model=NamedStub())
+    assert [t["params"]["line_position"] for t in report["trials"]] == [0.5, 0.05]
+
+@pytest.mark.parametrize("setting", [{'dynamic_imgsz': True, 'imgsz_tiers': [320, 640]},
+                                     {'motion_gating': True, 'motion_idle_stride': 0}])
+def test_calibrate_sweeps_the_line_with_zone_dependent_inference(tmp_path, synthetic_video, stub_config, setting):
+    config = {**stub_config, 'model': NamedStub.ckpt_path, **setting}
+    report = calibrate(synthetic_video, config, {"line_position": [0.05, 0.5, 0.95]}, GroundTruth(1, 0),
+                       str(tmp_path / "tracks"), workers=0, model=NamedStub())
+    assert report["sweep"]["trials"] == 3
+    assert report["best"]["params"]["line_position"] == 0.5 and report["best"]["metrics"]["count_error"] == 0
+
+def test_calibrate_with_a_reduced_precision_variant(tmp_path, synthetic_video, stub_config):
+    weights = str(tmp_path / "best.pt")
+    path = variant_path(weights, "int8")
+    open(path, "wb").close()
+    register_variant(weights, "int8", 640, {"path": path, "status": "accepted"})
+    variant = NamedStub()
+    variant.ckpt_path = path
+
+    config = {**stub_config, 'model': weights, 'model_precision': 'int8'}
+    report = calibrate(synthetic_video, config, {"line_position": [0.05, 0.5]}, GroundTruth(1, 0),
+                       str(tmp_path / "tracks"), workers=0, model=variant)
+    assert report["best"]["params"]["line_position"] == 0.5
+    with pytest.raises(RuntimeError, match="model"):
+        calibrate(synthetic_video, config, {"line_position": [0.5]}, GroundTruth(1, 0), str(tmp_path / "other"),
+                  workers=0, model=NamedStub())
+
+def test_calibrate_rejects_inference_parameters(tmp_path, synthetic_video, stub_config):
+    with pytest.raises(ValueError):
+        calibrate(synthetic_video, stub_config, {"confidence": [0.3]}, GroundTruth(1, 0), str(tmp_path), workers=0)
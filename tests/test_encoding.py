@@ -0,0 +1,65 @@
+import time
+import cv2
+import numpy as np
+from src.broadcast import BroadcastHub
+from src.encoding import MJPEG_HEADER, StreamTier, TierEncoder
+
+CAPS = {'stream_width': 0, 'stream_quality': 80, 'stream_fps': 0,
+        'stream_max_width': 1280, 'stream_max_quality': 90, 'stream_max_fps': 25}
+
+def test_tier_from_request_applies_defaults_and_caps():
+    assert StreamTier.from_request({}, CAPS) == StreamTier(width=1280, quality=80, max_fps=25.0)
+    assert StreamTier.from_request({'width': '650', 'quality': '55', 'fps': '10'}, CAPS) == StreamTier(640, 55, 10.0)
+    assert StreamTier.from_request({'width': '4000', 'quality': '100', 'fps': '60'}, CAPS) == StreamTier(1280, 90, 25.0)
+    assert StreamTier.from_request({'width': 'abc', 'quality': '1'}, CAPS).quality == 10
+    assert StreamTier.from_request({}, {}) == StreamTier(width=0, quality=80, max_fps=0.0)
+
+def test_encoder_downscales_and_reuses_buffer():
+    frame = np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+    encoder = TierEncoder(StreamTier(width=640, quality=60))
+    chunk = encoder.encode(frame)
+    buffers = [b for _, _, b in encoder._steps]
+    encoder.encode(frame)
+    assert len(buffers) == 2  # 1920 -> 960 (area) -> 640 (bilinear)
+    assert all(a is b for a, (_, _, b) in zip(buffers, encoder._steps))
+
+    assert chunk.startswith(MJPEG_HEADER) and chunk.endswith(b'\r\n')
+    decoded = cv2.imdecode(np.frombuffer(chunk[len(MJPEG_HEADER):-2], np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (360, 640, 3)
+    stats = encoder.stats()
+    assert stats["frames"] == 2 and stats["bytes_per_frame"] > 0 and stats["encode_ms"] > 0
+
+def test_source_width_tier_keeps_size():
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    chunk = TierEncoder(StreamTier(width=640)).encode(frame)
+    decoded = cv2.imdecode(np.frombuffer(chunk[len(MJPEG_HEADER):-2], np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (240, 320, 3)
+
+def test_tier_views_share_encoder_and_cap_fps():
+    made = []
+
+    def factory(key, channel):
+        def frames():
+            for i in range(400):
+                time.sleep(0.0025)  # ~400 fps producer
+                yield i
+        return None, frames()
+
+    def make_transform():
+        made.append(1)
+        return lambda item: item
+
+    hub = BroadcastHub(factory, grace_seconds=0)
+    a = hub.stream("1", "slow", make_transform, max_rate=20)
+    b = hub.stream("1", "slow", make_transform, max_rate=20)
+    start = time.time()
+    got = [next(a) for _ in range(6)]
+    elapsed = time.time() - start
+    next(b)
+    assert len(made) == 1
+    assert elapsed >= 0.2                      # 6 items at <= 20/s
+    assert got == sorted(got) and got[-1] - got[0] > 10  # frames in between were skipped
+    views = hub.stats()["1"]["views"]
+    assert views["slow"]["subscribers"] == 2 and views["slow"]["skipped"] > 0
+    a.close()
+    b.close()
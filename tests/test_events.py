@@ -0,0 +1,93 @@
+import pytest
+from src.counter import BagCounter
+from src.events import (CrossingEvent, EventLogWriter, bag_event_rows, load_ground_truth, read_event_log,
+                        write_bag_events)
+from tests.conftest import StubModel
+
+def make_event(i, direction="in"):
+    return CrossingEvent(frame_idx=i, timestamp=i / 10.0, track_id=100 + i, direction=direction,
+                         person_id=i, box=(0.0, 1.0, 2.0, 3.0), confidence=0.5)
+
+def test_event_log_round_trip_in_chunks(tmp_path):
+    path = str(tmp_path / "log")
+    writer = EventLogWriter(path, chunk_size=2)
+    for i in range(5):
+        writer.append(make_event(i, "in" if i % 2 else "out"))
+    assert len(list((tmp_path / "log").glob("chunk_*.npz"))) == 2
+    writer.close()
+
+    log = read_event_log(path)
+    assert log["frame_idx"].tolist() == [0, 1, 2, 3, 4]
+    assert log["direction"].tolist() == [-1, 1, -1, 1, -1]
+    assert log["box"].shape == (5, 4)
+
+    # Appending adds new chunks rather than rewriting old ones
+    writer = EventLogWriter(path, chunk_size=2, append=True)
+    writer.append(make_event(5))
+    writer.close()
+    assert read_event_log(path)["track_id"].tolist()[-1] == 105
+
+    # Reopening without append starts over
+    writer = EventLogWriter(path, chunk_size=2)
+    writer.append(make_event(6))
+    writer.close()
+    assert read_event_log(path)["frame_idx"].tolist() == [6]
+
+def test_append_requires_matching_meta(tmp_path):
+    path = str(tmp_path / "log")
+    writer = EventLogWriter(path, meta={"video": "a.mp4", "fps": 10.0})
+    writer.append(make_event(0))
+    writer.close()
+    with pytest.raises(ValueError, match="same source"):
+        EventLogWriter(path, meta={"video": "b.mp4", "fps": 10.0}, append=True)
+    writer = EventLogWriter(path, meta={"video": "a.mp4", "fps": 10.0}, append=True)
+    writer.append(make_event(1))
+    writer.close()
+    assert read_event_log(path)["frame_idx"].tolist() == [0, 1]
+
+def test_empty_log(tmp_path):
+    log = read_event_log(str(tmp_path))
+    assert log["track_id"].shape == (0,)
+    assert log["box"].shape == (0, 4)
+
+def test_process_video_writes_event_log(tmp_path, synthetic_video, stub_config):
+    counter = BagCounter(stub_config, model=StubModel())
+    counter.process_video(synthetic_video, events_path=str(tmp_path / "events"))
+
+    log = read_event_log(str(tmp_path / "events"))
+    assert log["track_id"].tolist() == [2]
+    assert log["person_id"].tolist() == [1]
+    assert log["direction"].tolist() == [1]
+    assert log["confidence"][0] == pytest.approx(0.8)
+    # 10 fps synthetic clip: timestamp follows the frame index
+    assert log["timestamp"][0] == pytest.approx((log["frame_idx"][0] - 1) / 10.0)
+
+    # Processing the video again replaces the log instead of adding to it
+    BagCounter(stub_config, model=StubModel()).process_video(synthetic_video, events_path=str(tmp_path / "events"))
+    assert read_event_log(str(tmp_path / "events"))["track_id"].tolist() == [2]
+
+def test_bag_event_rows(tmp_path):
+    writer = EventLogWriter(str(tmp_path / "s1"))
+    writer.append(make_event(1))   # track 101, labelled as crossed
+    writer.append(make_event(3))   # track 103, unlabelled -> false positive
+    writer.close()
+
+    gt_path = tmp_path / "gt.csv"
+    gt_path.write_text("scenario_id,bag_id,gt_crossed\n1,101,1\n1,102,1\n")
+    rows = bag_event_rows({"1": str(tmp_path / "s1")}, load_ground_truth(str(gt_path)))
+
+    by_bag = {r["bag_id"]: r for r in rows}
+    assert (by_bag[101]["gt_crossed"], by_bag[101]["pred_crossed"], by_bag[101]["score"]) == (1, 1, 0.5)
+    assert (by_bag[102]["gt_crossed"], by_bag[102]["pred_crossed"]) == (1, 0)
+    assert (by_bag[103]["gt_crossed"], by_bag[103]["pred_crossed"]) == (0, 1)
+
+    out = tmp_path / "bag_events.csv"
+    write_bag_events(rows, str(out))
+    assert out.read_text().splitlines()[0] == "scenario_id,bag_id,gt_crossed,pred_crossed,score"
+
+def test_logs_without_gate_column_read_as_line(tmp_path):
+    import numpy as np
+    np.savez(tmp_path / "chunk_000000.npz", frame_idx=np.array([1]), timestamp=np.array([0.1]), track_id=np.array([7]),
+             direction=np.array([1], dtype=np.int8), person_id=np.array([-1]), box=np.zeros((1, 4), dtype=np.float32),
+             confidence=np.array([0.9], dtype=np.float32))
+    assert read_event_log(str(tmp_path))["gate"].tolist() == ["line"]
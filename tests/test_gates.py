@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from src.counter import BagCounter
+from src.events import read_event_log
+from src.gates import Gate, GateCrossingDetector, GateDirection, GateGrid, gates_from_config
+from src.line_crossing import Direction, LineCrossingDetector, Orientation
+from tests.conftest import StubModel
+
+@pytest.mark.parametrize("orientation", list(Orientation))
+@pytest.mark.parametrize("direction", list(Direction))
+def test_line_gate_matches_line_detector(orientation, direction):
+    kwargs = dict(cooldown_frames=2, line_margin=3)
+    line = LineCrossingDetector(100, direction, orientation, **kwargs)
+    gate = GateCrossingDetector([Gate.from_line(100, orientation, direction, 320, 240)], 320, 240, grid_cell=32, **kwargs)
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        ids = rng.choice(20, size=rng.integers(0, 8), replace=False)
+        points = rng.uniform(85, 115, size=(len(ids), 2))
+        assert line.update_points(ids, points) == gate.update_points(ids, points)
+        assert line.last_crossings == [c[:2] for c in gate.last_crossings]
+
+def test_diagonal_gate_in_and_out():
+    gate = Gate("dock", [[0, 0], [100, 100]])  # right-hand side of the walk is below-left
+    detector = GateCrossingDetector([gate], 200, 200, cooldown_frames=0)
+    detector.update_points([1], [[80, 20]])
+    assert detector.update_points([1], [[20, 80]]) == (1, 0)
+    assert detector.last_crossings == [(1, "in", "dock")]
+    assert detector.update_points([1], [[80, 20]]) == (0, 1)
+    # Passing beyond the end of the segment is not a crossing
+    detector.update_points([2], [[150, 120]])
+    assert detector.update_points([2], [[120, 150]]) == (0, 0)
+
+def test_polyline_vertex_counts_once():
+    gate = Gate("bay", [[0, 50], [50, 50], [100, 0]])
+    detector = GateCrossingDetector([gate], 120, 120, cooldown_frames=0)
+    detector.update_points([1], [[50, 20]])
+    assert detector.update_points([1], [[50, 80]]) == (1, 0)
+
+def test_named_gates_count_separately_with_own_cooldown():
+    gates = [Gate("door", [[0, 50], [200, 50]], GateDirection.IN), Gate("conveyor", [[0, 150], [200, 150]])]
+    detector = GateCrossingDetector(gates, 200, 200, cooldown_frames=10)
+    detector.update_points([1], [[100, 20]])
+    detector.update_points([1], [[100, 100]])
+    assert detector.last_crossings == [(1, "in", "door")]
+    detector.update_points([1], [[100, 180]])
+    assert detector.last_crossings == [(1, "in", "conveyor")]
+    # Door only counts IN; back across the door within its cooldown is ignored either way
+    detector.update_points([1], [[100, 100]])
+    detector.update_points([1], [[100, 20]])
+    assert detector.last_crossings == []
+
+def test_margin_hysteresis():
+    detector = GateCrossingDetector([Gate("g", [[0, 100], [200, 100]])], 200, 200, cooldown_frames=0, line_margin=5)
+    detector.update_points([1], [[50, 90]])
+    assert detector.update_points([1], [[50, 104]]) == (0, 0)  # inside the margin
+    assert detector.update_points([1], [[50, 96]]) == (0, 0)
+    assert detector.update_points([1], [[50, 106]]) == (1, 0)
+
+def test_grid_rejects_tracks_far_from_gates():
+    starts, ends = np.array([[0.0, 100.0]]), np.array([[640.0, 100.0]])
+    grid = GateGrid(starts, ends, 640, 480, cell=32)
+    far = np.array([[100.0, 400.0], [300.0, 300.0]])
+    rows, segs = grid.candidates(far, far + 5)
+    assert len(rows) == 0
+    rows, segs = grid.candidates(np.array([[10.0, 90.0]]), np.array([[10.0, 110.0]]))
+    assert rows.tolist() == [0] and segs.tolist() == [0]
+
+def test_gates_from_config():
+    gates = gates_from_config({'gates': [
+        {'name': 'door', 'points': [[0.0, 0.5], [1.0, 0.5]], 'direction': 'in'},
+        {'points': [[10, 20], [30, 40], [50, 20]]}
+    ]}, 200, 100)
+    assert [g.name for g in gates] == ['door', 'gate2']
+    assert gates[0].points.tolist() == [[0.0, 50.0], [200.0, 50.0]]
+    assert gates[0].direction == GateDirection.IN
+    assert gates_from_config({}, 200, 100) == []
+    with pytest.raises(ValueError):
+        gates_from_config({'gates': [{'name': 'a', 'points': [[0, 0], [1, 1]]}] * 2}, 200, 100)
+
+def test_counter_with_gates(tmp_path, synthetic_video, stub_config):
+    config = {**stub_config, 'gates': [
+        {'name': 'middle', 'points': [[0.5, 1.0], [0.5, 0.0]]},   # same as the vertical line at 0.5
+        {'name': 'far', 'points': [[0.7, 0.1], [0.9, 0.3]]}      # off the blob's path
+    ]}
+    counter = BagCounter(config, model=StubModel())
+    results = counter.process_video(synthetic_video, events_path=str(tmp_path / "events"))
+    assert (results["in"], results["out"]) == (1, 0)
+    assert results["gates"] == {"middle": {"in": 1, "out": 0}, "far": {"in": 0, "out": 0}}
+    assert read_event_log(str(tmp_path / "events"))["gate"].tolist() == ["middle"]
@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from src.counter import BagCounter
+from src.jobs import JobManager, OutputCache, cache_key
+from src.pipeline import ProgressSink
+
+def wait_for(job, timeout=10.0):
+    deadline = time.time() + timeout
+    while job.status in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+def write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+def test_cache_key_follows_video_config_and_model(tmp_path, synthetic_video, stub_config):
+    model = tmp_path / "model.pt"
+    model.write_bytes(b"weights")
+    key = cache_key(synthetic_video, stub_config, str(model))
+    assert key == cache_key(synthetic_video, dict(reversed(list(stub_config.items()))), str(model))
+    assert key != cache_key(synthetic_video, {**stub_config, 'cooldown_frames': 6}, str(model))
+
+    time.sleep(0.01)
+    model.write_bytes(b"other weights")
+    assert key != cache_key(synthetic_video, stub_config, str(model))
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = OutputCache(str(tmp_path / "cache"), max_bytes=250)
+    for i, key in enumerate(["a", "b"]):
+        write(tmp_path / key, 100)
+        cache.put(key, str(tmp_path / key))
+        os.utime(cache.path_for(key), (1000 + i, 1000 + i))
+
+    assert cache.get("a")  # refreshes "a", so "b" is now the oldest
+    write(tmp_path / "c", 100)
+    cache.put("c", str(tmp_path / "c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.size() == 200
+
+def test_resubmit_is_a_cache_hit(tmp_path):
+    renders = []
+
+    def render(job, path):
+        renders.append(job.key)
+        for i in range(1, 11):
+            job.frames_done = i
+        write(path, 10)
+
+    manager = JobManager(OutputCache(str(tmp_path), max_bytes=1000), render)
+    first = wait_for(manager.submit("k", total_frames=10, label="1"))
+    assert first.status == "done" and not first.cached
+    assert first.to_dict()["progress"] == 1.0
+
+    second = manager.submit("k", total_frames=10, label="1")
+    assert second.status == "done" and second.cached
+    assert second.id != first.id
+    assert manager.file(second) == first.output
+    assert renders == ["k"]
+    manager.shutdown()
+
+def test_in_flight_jobs_are_shared_and_failures_reported(tmp_path):
+    release = threading.Event()
+
+    def render(job, path):
+        release.wait(5)
+        if job.key == "bad":
+            raise ValueError("broken video")
+        write(path, 10)
+
+    manager = JobManager(OutputCache(str(tmp_path), max_bytes=1000), render)
+    job = manager.submit("k")
+    assert manager.submit("k") is job
+    bad = manager.submit("bad")
+    release.set()
+
+    assert wait_for(job).status == "done"
+    assert wait_for(bad).status == "failed"
+    assert "broken video" in bad.error
+    assert manager.file(bad) is None
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".")]
+    manager.shutdown()
+
+def test_progress_sink_reports_every_frame(synthetic_video, stub_model, stub_config, tmp_path):
+    frames = []
+    counter = BagCounter(stub_config, model=stub_model)
+    counts = counter.process_video(synthetic_video, str(tmp_path / "out.avi"), sinks=[ProgressSink(frames.append)])
+    assert frames == list(range(1, 31))
+    assert counts == {"in": 1, "out": 0}
+    assert os.path.exists(tmp_path / "out.avi")
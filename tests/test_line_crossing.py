@@ -73,3 +73,42 @@ def test_cooldown_logic():
     detector.update([(1, 90)])
     cin, cout = detector.update([(1, 110)])
     assert cin == 1
+
+def test_cooldown_blocks_recount_until_expiry():
+    detector = LineCrossingDetector(line_coord=100, direction=Direction.BOTH, orientation=Orientation.HORIZONTAL, cooldown_frames=3)
+    detector.update([(1, 90)])
+    assert detector.update([(1, 110)]) == (1, 0)
+    assert detector.update([(1, 90)]) == (0, 0)   # inside cooldown
+    detector.update([(1, 110)])
+    assert detector.update([(1, 90)]) == (0, 1)   # cooldown over
+    assert detector.last_crossings == [(1, "out")]
+
+def test_update_arrays_matches_list_update():
+    import numpy as np
+    kwargs = dict(line_coord=100, direction=Direction.BOTH, orientation=Orientation.VERTICAL, cooldown_frames=2, line_margin=3)
+    a, b = LineCrossingDetector(**kwargs), LineCrossingDetector(**kwargs)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        ids = rng.choice(20, size=rng.integers(0, 8), replace=False)
+        coords = rng.uniform(80, 120, size=len(ids))
+        assert a.update(list(zip(ids.tolist(), coords.tolist()))) == b.update_arrays(ids, coords)
+        assert a.last_crossings == b.last_crossings
+    assert a.tracks_history == b.tracks_history
+
+def test_stale_tracks_are_evicted_and_slots_reused():
+    detector = LineCrossingDetector(line_coord=100, direction=Direction.BOTH, orientation=Orientation.HORIZONTAL,
+                                    cooldown_frames=5, ttl_frames=20, capacity=4)
+    # 10k short-lived tracks, a few alive at a time, like a long shift of ByteTrack ids
+    for tid in range(10_000):
+        detector.update([(tid, 90), (tid + 1, 90)])
+        detector.update([(tid, 110), (tid + 1, 90)])
+    assert len(detector.slots) <= 4 + 20 * 2
+    assert len(detector._side) <= 64
+    assert 9_999 in detector.slots and 0 not in detector.slots
+
+def test_reset_forgets_tracks():
+    detector = LineCrossingDetector(line_coord=100, direction=Direction.BOTH, orientation=Orientation.HORIZONTAL)
+    detector.update([(1, 90)])
+    detector.reset()
+    assert detector.tracks_history == {} and detector.frame == 0
+    assert detector.update([(1, 110)]) == (0, 0)
@@ -0,0 +1,106 @@
+import time
+import threading
+import numpy as np
+from src.counter import BagCounter
+from src.live import LiveSource, is_live_source
+from src.pipeline import CountSink, EventLogSink, FramePipeline
+
+class FakeCamera:
+    """A capture producing numbered frames at `fps`, failing after `frames` reads (None = never)."""
+
+    def __init__(self, fps=200.0, frames=None, opens=True):
+        self.fps, self.frames, self.opens = fps, frames, opens
+        self.n = 0
+
+    def isOpened(self):
+        return self.opens
+
+    def read(self):
+        if self.frames is not None and self.n >= self.frames:
+            return False, None
+        time.sleep(1.0 / self.fps)
+        self.n += 1
+        return True, np.full((4, 6, 3), self.n % 256, dtype=np.uint8)
+
+    def get(self, prop):
+        return 0.0  # like many cameras: no usable frame rate
+
+    def release(self):
+        self.opens = False
+
+def test_is_live_source():
+    assert is_live_source("rtsp://10.0.0.5/stream1")
+    assert is_live_source("0")
+    assert not is_live_source("data/samples/test.mp4")
+    assert is_live_source("data/samples/test.mp4", {"live_source": True})
+
+def test_slow_consumer_gets_newest_frame_and_counts_drops():
+    source = LiveSource("fake", capture_factory=lambda src: FakeCamera(fps=200.0))
+    assert source.start(timeout=2)
+    assert source.props == {"fps": None, "height": 4, "width": 6}
+    values, stamps = [], []
+    for i in range(1, 6):
+        ok, frame = source.read()
+        assert ok
+        values.append(int(frame[0, 0, 0]))
+        stamps.append(source.timestamp_of(i))
+        time.sleep(0.05)  # inference far slower than the camera
+    source.release()
+
+    assert values == sorted(values) and values[-1] - values[0] >= 20  # skipped ahead, no backlog
+    assert stamps == sorted(stamps) and abs(stamps[-1] - time.time()) < 1.0
+    stats = source.stats()
+    assert stats["dropped"] >= 20
+    assert stats["processed"] == 5
+    assert stats["grabbed"] >= stats["dropped"] + stats["processed"] - 1
+
+def test_reconnects_with_backoff_then_gives_up():
+    sessions = [FakeCamera(opens=False), FakeCamera(frames=3), FakeCamera(opens=False), FakeCamera(frames=3)]
+    opened = []
+
+    def factory(src):
+        opened.append(time.time())
+        return sessions.pop(0) if sessions else FakeCamera(opens=False)
+
+    source = LiveSource("fake", reconnect_initial=0.02, reconnect_max=1.0, max_reconnects=3,
+                        capture_factory=factory)
+    assert source.start(timeout=2)
+    frames = 0
+    while True:
+        ok, _ = source.read()
+        if not ok:
+            break
+        frames += 1
+    source.release()
+
+    assert frames >= 2  # newest-frame reads from both sessions that delivered
+    stats = source.stats()
+    assert stats["reconnects"] >= 3
+    assert not source.isOpened()
+    gaps = np.diff(opened)
+    assert gaps[-1] > gaps[-2] > gaps[-3]  # backoff grows between failed attempts in a row
+
+def test_pipeline_counts_a_file_backed_live_stand_in(synthetic_video, stub_model, stub_config):
+    config = {**stub_config, 'live_source': True, 'live_pace_fps': 200, 'live_max_reconnects': 0}
+    counter = BagCounter(config, model=stub_model)
+    events = EventLogSink()
+    pipeline = FramePipeline(counter, [CountSink(), events])
+    started = time.time()
+    results = list(pipeline.run(synthetic_video))
+
+    assert results and results[-1].frame_idx == len(results)
+    assert (counter.count_in, counter.count_out) == (1, 0)
+    assert started - 1 < events.events[0]["timestamp"] <= time.time()
+    stats = pipeline.stats()["source"]
+    assert stats["processed"] == len(results)
+    assert stats["grabbed"] == 30
+
+def test_release_stops_a_blocked_reader():
+    source = LiveSource("fake", capture_factory=lambda src: FakeCamera(fps=2.0))
+    assert source.start(timeout=2)
+    source.read()
+    threading.Timer(0.1, source.release).start()
+    start = time.time()
+    while source.read()[0]:
+        pass
+    assert time.time() - start < 2.0
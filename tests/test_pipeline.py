@@ -0,0 +1,133 @@
+import pytest
+from tests.conftest import StubModel, moving_blob_frames
+from src.counter import BagCounter
+from src.tracker import TrackerWrapper
+from src.pipeline import (FramePipeline, ThreadedFramePipeline, CountSink, EventLogSink, FrameSink, MJPEGSink,
+                          SinkNeeds, make_pipeline)
+
+class RawSink(FrameSink):
+    needs = SinkNeeds.RAW
+
+    def consume(self, result):
+        pass
+
+def test_process_video_counts_crossing(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    results = counter.process_video(synthetic_video)
+    assert results == {"in": 1, "out": 0}
+    assert stub_model.calls == 30
+
+def test_count_only_sinks_skip_drawing(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    sinks = [CountSink(), EventLogSink()]
+    frames = list(FramePipeline(counter, sinks).run(synthetic_video))
+
+    assert all(r.annotated is None for r in frames)
+    assert sinks[0].counts == {"in": 1, "out": 0}
+    assert len(sinks[1].events) == 1
+    assert sinks[1].events[0]["direction"] == "in"
+
+def test_annotated_and_raw_sinks_get_separate_frames(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    raw, mjpeg = RawSink(), MJPEGSink()
+    results = list(FramePipeline(counter, [raw, mjpeg]).run(synthetic_video))
+
+    assert results[-1].annotated is not results[-1].frame
+    assert mjpeg.chunk.startswith(b'--frame\r\n')
+    # The red counting line is only drawn on the annotated copy; the raw blob stays white/grey
+    assert results[0].annotated[200:, counter.line_coord, 2].min() > 200
+    assert results[0].frame[200:, counter.line_coord, 2].max() < 50
+
+def test_stream_video_yields_jpeg_chunks(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    chunks = list(counter.stream_video(synthetic_video))
+    assert len(chunks) == 30
+    assert b'Content-Type: image/jpeg' in chunks[0]
+    assert counter.count_in == 1
+
+def test_video_writer_sink(tmp_path, synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    output_path = str(tmp_path / "out" / "annotated.mp4")
+    counter.process_video(synthetic_video, output_path)
+    assert (tmp_path / "out" / "annotated.mp4").stat().st_size > 0
+
+def test_threaded_pipeline_matches_sequential(synthetic_video, stub_model, stub_config):
+    sequential = BagCounter(stub_config, model=stub_model)
+    expected = [(r.frame_idx, r.count_in, r.count_out) for r in FramePipeline(sequential, [CountSink()]).run(synthetic_video)]
+
+    counter = BagCounter(stub_config, model=stub_model)
+    pipeline = ThreadedFramePipeline(counter, [CountSink(), MJPEGSink()], queue_size=2)
+    results = list(pipeline.run(synthetic_video))
+
+    assert [(r.frame_idx, r.count_in, r.count_out) for r in results] == expected
+    assert all(r.encoded for r in results)
+
+    stats = pipeline.stats()
+    assert stats["stages"]["infer"]["frames"] == 30
+    assert stats["queues"]["decoded"]["capacity"] == 2
+    assert stats["queues"]["decoded"]["max_depth"] <= 2
+
+def test_threaded_pipeline_stops_early(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    gen = ThreadedFramePipeline(counter, [CountSink()], queue_size=1).run(synthetic_video)
+    first = next(gen)
+    gen.close()
+    assert first.frame_idx == 1
+
+def test_threaded_pipeline_propagates_errors(synthetic_video, stub_config):
+    class FailingModel:
+        def track(self, frame, **kwargs):
+            raise RuntimeError("inference failed")
+
+    counter = BagCounter(stub_config, model=FailingModel())
+    with pytest.raises(RuntimeError):
+        list(ThreadedFramePipeline(counter, [CountSink()]).run(synthetic_video))
+
+def test_make_pipeline_mode(stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    assert type(make_pipeline(counter, [CountSink()], stub_config)) is FramePipeline
+    threaded = make_pipeline(counter, [CountSink()], {**stub_config, 'pipeline_mode': 'threaded', 'queue_size': 3})
+    assert isinstance(threaded, ThreadedFramePipeline) and threaded.queue_size == 3
+
+@pytest.mark.parametrize("pipeline_cls", [FramePipeline, ThreadedFramePipeline])
+def test_batched_inference_matches_single_frame(synthetic_video, stub_config, pipeline_cls):
+    single = BagCounter(stub_config, model=StubModel())
+    expected = [(r.frame_idx, r.count_in, r.count_out) for r in FramePipeline(single, [CountSink()]).run(synthetic_video)]
+
+    model = StubModel()
+    counter = BagCounter(stub_config, model=model)
+    pipeline = pipeline_cls(counter, [CountSink()], batch_size=8, max_batch_latency_ms=10000)
+    results = [(r.frame_idx, r.count_in, r.count_out) for r in pipeline.run(synthetic_video)]
+
+    assert results == expected
+    assert model.frames_seen == 30
+    assert model.calls == 4  # 8 + 8 + 8 + 6
+
+def test_mixed_batch_sizes_keep_one_tracker():
+    frames = moving_blob_frames(n=20)
+    tracker = TrackerWrapper(StubModel())
+    ids = []
+    start = 0
+    for size in (1, 4, 1, 1, 6, 2, 5):
+        batch = tracker.track_batch(frames[start:start + size], conf=0.4, classes=[0, 24])
+        ids += [sorted(r.boxes.id.cpu().numpy().tolist()) for r in batch]
+        start += size
+    assert start == len(frames) and len(ids) == len(frames)
+    assert all(i == ids[0] for i in ids) and len(ids[0]) == 2
+
+def test_batch_latency_bound_flushes_partial_batches(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    results = list(FramePipeline(counter, [CountSink()], batch_size=8, max_batch_latency_ms=0).run(synthetic_video))
+    assert len(results) == 30
+    assert stub_model.calls == 30
+
+def test_update_sink_pushes_counts_and_crossings(synthetic_video, stub_model, stub_config):
+    from src.pipeline import UpdateSink
+    messages = []
+    counter = BagCounter(stub_config, model=stub_model)
+    chunks = list(counter.stream_video(synthetic_video, sinks=[UpdateSink(messages.append, tags={"scenario": "s"})]))
+
+    assert len(chunks) == 30
+    assert [m["type"] for m in messages] == ["start", "counts", "crossing"]
+    assert messages[1]["in"] == 1 and messages[1]["delta_in"] == 1 and messages[1]["scenario"] == "s"
+    assert messages[2]["track_id"] == 2 and messages[2]["direction"] == "in"
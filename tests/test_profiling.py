@@ -0,0 +1,75 @@
+import re
+import numpy as np
+from src.counter import BagCounter
+from src.pipeline import CountSink, FramePipeline, MJPEGSink, ThreadedFramePipeline, make_pipeline
+from src.profiling import Profiler, StageStats, prometheus_text
+
+def test_stage_stats_percentiles_cover_the_recent_window():
+    stats = StageStats(window=100)
+    for ms in range(1, 201):
+        stats.add(ms / 1000.0)
+    summary = stats.summary()
+    assert summary["calls"] == 200
+    assert summary["total_s"] == round(sum(range(1, 201)) / 1000.0, 4)
+    # Only calls 101..200 are still in the window
+    assert summary["p50_ms"] == np.percentile(np.arange(101, 201), 50)
+    assert 195 < summary["p95_ms"] < summary["p99_ms"] <= 200
+
+def test_disabled_profiling_leaves_nothing_behind(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    counter.process_video(synthetic_video)
+    assert counter.pipeline.profiler is None
+    assert "profile" not in counter.pipeline.stats()
+    assert "track" not in vars(counter.tracker) and "annotate" not in vars(counter)
+
+def test_profiled_run_times_every_stage(tmp_path, synthetic_video, stub_model, stub_config):
+    counter = BagCounter({**stub_config, 'profiling': True}, model=stub_model)
+    results = counter.process_video(synthetic_video, str(tmp_path / "annotated.mp4"))
+    assert results == {"in": 1, "out": 0}
+
+    profile = counter.pipeline.stats()["profile"]
+    stages = profile["stages"]
+    assert {"decode", "infer", "render", "model", "associate", "cross", "draw",
+            "sink:CountSink", "sink:VideoWriterSink"} <= set(stages)
+    assert profile["frames"] == 30 and stages["model"]["calls"] == 30
+    for s in stages.values():
+        assert s["p50_ms"] <= s["p95_ms"] <= s["p99_ms"]
+    busy = sum(stages[s]["total_s"] for s in ("decode", "infer", "render"))
+    assert abs(profile["model_s"] + profile["host_s"] - busy) < 1e-3
+    assert profile["fps"] > 0
+    # The timers are removed when the run ends
+    assert "track" not in vars(counter.tracker) and "consume" not in vars(counter.pipeline.sinks[0])
+
+def test_stack_sampler_writes_folded_stacks(tmp_path, synthetic_video, stub_model, stub_config):
+    config = {**stub_config, 'profiling': True, 'profile_frames': 5, 'profile_interval_ms': 1,
+              'output_dir': str(tmp_path)}
+    counter = BagCounter(config, model=stub_model)
+    counter.process_video(synthetic_video)
+
+    path = tmp_path / "profile_synthetic.folded"
+    assert counter.pipeline.stats()["profile"]["stack_profile"] == str(path)
+    lines = path.read_text().splitlines()
+    assert lines and all(re.fullmatch(r"\S.*;.* \d+", line) for line in lines)
+    assert any(line.startswith("MainThread;") and "process_frame" in line for line in lines)
+
+def test_threaded_pipeline_exports_queues_and_quantiles(synthetic_video, stub_model, stub_config):
+    config = {**stub_config, 'profiling': True, 'pipeline_mode': 'threaded', 'queue_size': 2}
+    counter = BagCounter(config, model=stub_model)
+    pipeline = make_pipeline(counter, [CountSink(), MJPEGSink()], config)
+    assert isinstance(pipeline, ThreadedFramePipeline) and isinstance(pipeline.profiler, Profiler)
+    list(pipeline.run(synthetic_video))
+
+    text = prometheus_text({"dock-1": pipeline.stats()})
+    assert "# TYPE bagcounter_stage_latency_seconds summary" in text
+    assert 'bagcounter_stage_latency_seconds{source="dock-1",stage="sink:MJPEGSink",quantile="0.99"}' in text
+    assert 'bagcounter_stage_latency_seconds_count{source="dock-1",stage="model"} 30' in text
+    assert 'bagcounter_queue_capacity{source="dock-1",queue="decoded"} 2' in text
+    assert re.search(r'^bagcounter_fps\{source="dock-1"\} [0-9.]+$', text, re.M)
+
+def test_prometheus_text_without_profiling(synthetic_video, stub_model, stub_config):
+    counter = BagCounter(stub_config, model=stub_model)
+    pipeline = FramePipeline(counter, [CountSink()])
+    list(pipeline.run(synthetic_video))
+    text = prometheus_text({'cam "a"': pipeline.stats()})
+    assert 'bagcounter_stage_frames_total{source="cam \\"a\\"",stage="infer"} 30' in text
+    assert "latency" not in text and "queue" not in text
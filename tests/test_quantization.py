@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from src.counter import BagCounter
+from src.quantization import (compare, convert_fp16, judge, quantize_int8, register_variant, resolve_model,
+                              sample_frames, variant_path)
+from tests.conftest import moving_blob_frames, write_video
+
+def tiny_detector(path, channels=8):
+    """A one-convolution ONNX model with the input/output layout of an exported YOLOv8 detector."""
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    weight = numpy_helper.from_array(rng.normal(0, 0.5, (channels, 3, 1, 1)).astype(np.float32), "w")
+    bias = numpy_helper.from_array(rng.normal(0, 0.1, channels).astype(np.float32), "b")
+    shape = numpy_helper.from_array(np.array([1, channels, -1], dtype=np.int64), "shape")
+    graph = helper.make_graph(
+        [helper.make_node("Conv", ["images", "w", "b"], ["features"], name="/model.0/conv/Conv"),
+         helper.make_node("Reshape", ["features", "shape"], ["output0"], name="/model.1/Reshape")],
+        "tiny",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, 32, 32])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, [1, channels, 1024])],
+        initializer=[weight, bias, shape]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, str(path))
+    return str(path)
+
+def test_reduced_precision_models_stay_close_to_fp32(tmp_path):
+    fp32 = tiny_detector(tmp_path / "tiny.onnx")
+    import onnx
+    from src.backends import OnnxDetector
+
+    frames = moving_blob_frames(n=8, width=64, height=48, size=10)
+    int8 = quantize_int8(fp32, str(tmp_path / "tiny_int8.onnx"), frames, imgsz=32)
+    fp16 = convert_fp16(fp32, str(tmp_path / "tiny_fp16.onnx"))
+    assert any(n.op_type == "QuantizeLinear" for n in onnx.load(int8).graph.node)
+
+    tensor = OnnxDetector(fp32, imgsz=32).preprocess(frames[3:4])[0].copy()
+    reference = OnnxDetector(fp32, imgsz=32)._forward(tensor)
+    assert OnnxDetector(fp16, imgsz=32)._forward(tensor) == pytest.approx(reference, abs=0.01)
+    assert OnnxDetector(int8, imgsz=32)._forward(tensor) == pytest.approx(reference, abs=0.1)
+
+def test_only_accepted_variants_resolve(tmp_path):
+    weights = str(tmp_path / "best.pt")
+    assert resolve_model(weights, "fp32") == weights
+    with pytest.raises(ValueError, match="No accepted int8"):
+        resolve_model(weights, "int8")
+
+    path = variant_path(weights, "int8")
+    open(path, "wb").close()
+    register_variant(weights, "int8", 640, {"path": path, "status": "accepted"})
+    assert resolve_model(weights, "int8") == path
+    with pytest.raises(ValueError, match="at 320px"):
+        resolve_model(weights, "int8", imgsz=320)
+
+    register_variant(weights, "fp16", 640, {"path": variant_path(weights, "fp16"), "status": "rejected",
+                                            "reason": "count drift 2 > 0"})
+    with pytest.raises(ValueError, match="count drift 2 > 0"):
+        BagCounter({'model': weights, 'model_precision': 'fp16'})
+    with pytest.raises(ValueError, match="model_precision"):
+        resolve_model(weights, "int4")
+
+def test_gate_rejects_count_drift_and_event_disagreement():
+    baseline = {"in": 3, "out": 1, "events": [(10, "in"), (40, "in"), (70, "out"), (90, "in")], "fps": 5.0}
+    shifted = {**baseline, "events": [(12, "in"), (41, "in"), (68, "out"), (93, "in")]}
+    assert compare(baseline, shifted, tolerance=5) == {"count_drift": 0, "event_f1": 1.0, "in": 3, "out": 1,
+                                                       "fps": 5.0}
+    assert judge([compare(baseline, shifted, tolerance=5)], max_count_drift=0, min_event_f1=0.95) is None
+
+    missed = {"in": 2, "out": 1, "events": [(10, "in"), (70, "out"), (90, "in")], "fps": 9.0}
+    assert judge([compare(baseline, missed, 5)], 0, 0.95) == "count drift 1 > 0"
+    assert judge([compare(baseline, missed, 5)], 1, 0.95) == "event F1 0.857 < 0.95"
+
+    # Same totals, but a crossing moved far from where FP32 saw it
+    moved = {**baseline, "events": [(10, "in"), (40, "in"), (70, "out"), (150, "in")]}
+    assert "event F1" in judge([compare(baseline, moved, 5)], 0, 0.95)
+
+def test_calibration_frames_cover_every_video(tmp_path):
+    a = write_video(tmp_path / "a.avi", moving_blob_frames(n=20))
+    b = write_video(tmp_path / "b.avi", moving_blob_frames(n=10, width=160, height=120))
+    frames = sample_frames([a, b], 8)
+    assert len(frames) == 8
+    assert {f.shape[1] for f in frames} == {320, 160}
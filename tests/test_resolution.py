@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from src.counter import BagCounter
+from src.pipeline import CountSink, FramePipeline
+from src.resolution import ResolutionController
+from tests.conftest import StubModel
+
+def feed(controller, frames, height, conf=0.9, count=1, clear=True, start=1):
+    for i in range(start, start + frames):
+        controller.observe(i, np.full(count, height, dtype=float), np.full(count, conf), 640, zone_clear=clear)
+    return start + frames
+
+def test_steps_up_for_small_objects_or_low_confidence():
+    controller = ResolutionController([320, 640, 960], initial=640, window=5)
+    feed(controller, 5, height=20)  # 3% of the image
+    assert controller.imgsz == 960
+    assert controller.decisions[0].reason.startswith("smallest box")
+
+    controller = ResolutionController([320, 640, 960], initial=640, window=5)
+    feed(controller, 5, height=200, conf=0.3)
+    assert controller.imgsz == 960 and "confidence 0.30" in controller.decisions[0].reason
+    assert controller.stats()["decisions"][0]["previous"] == 640
+
+def test_steps_down_for_few_large_confident_objects_and_stops_at_the_lowest_tier():
+    controller = ResolutionController([320, 640, 960], initial=960, window=5)
+    nxt = feed(controller, 5, height=200, count=2)
+    assert controller.imgsz == 640
+    feed(controller, 20, height=200, count=2, start=nxt)
+    assert controller.imgsz == 320 and len(controller.decisions) == 2
+
+    crowded = ResolutionController([320, 640, 960], initial=640, window=5)
+    feed(crowded, 5, height=200, count=6)
+    assert crowded.imgsz == 640 and not crowded.decisions
+
+def test_empty_windows_hold_the_current_size():
+    controller = ResolutionController([320, 640], initial=640, window=3)
+    feed(controller, 12, height=0, count=0)
+    assert controller.imgsz == 640 and controller.frames_at[640] == 12
+
+def test_change_waits_for_the_counting_zone_to_clear():
+    controller = ResolutionController([320, 640, 960], initial=640, window=5, max_defer=10)
+    nxt = feed(controller, 5, height=20, clear=False)
+    assert controller.imgsz == 640 and controller.pending is not None
+    nxt = feed(controller, 3, height=20, clear=False, start=nxt)
+    assert controller.imgsz == 640
+    feed(controller, 1, height=20, clear=True, start=nxt)
+    decision = controller.decisions[0]
+    assert controller.imgsz == 960 and (decision.decided_at, decision.applied_at) == (5, 9)
+
+    forced = ResolutionController([320, 640, 960], initial=640, window=5, max_defer=10)
+    feed(forced, 20, height=20, clear=False)
+    assert forced.imgsz == 960 and forced.decisions[0].applied_at == 15
+
+def test_tiers_must_match_the_model_stride():
+    with pytest.raises(ValueError, match="multiples of 32"):
+        ResolutionController([320, 500])
+
+class SizeRecordingStub(StubModel):
+    def __init__(self):
+        super().__init__()
+        self.sizes = []
+
+    def track(self, source, **kwargs):
+        self.sizes.append(kwargs.get("imgsz"))
+        return super().track(source, **kwargs)
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_counter_switches_size_without_changing_counts(synthetic_video, stub_config, batch_size):
+    config = {**stub_config, 'batch_size': batch_size, 'dynamic_imgsz': True, 'imgsz': 640,
+              'imgsz_tiers': [320, 640], 'imgsz_window': 3, 'imgsz_large_object': 0.05}
+    model = SizeRecordingStub()
+    counter = BagCounter(config, model=model)
+    pipeline = FramePipeline(counter, [CountSink()])
+    for _ in pipeline.run(synthetic_video):
+        pass
+    assert (counter.count_in, counter.count_out) == (1, 0)
+    assert model.sizes[0] == 640 and model.sizes[-1] == 320
+    assert pipeline.stats()["resolution"]["decisions"][0]["imgsz"] == 320
+
+    fixed = SizeRecordingStub()
+    counter = BagCounter({**stub_config, 'imgsz': 480}, model=fixed)
+    counter.setup(320, 240)
+    counter.process_frame(np.zeros((240, 320, 3), np.uint8), 1)
+    assert fixed.sizes == [480]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src.counter import BagCounter
+from src.roi import RegionOfInterest, points_in_polygon
+from tests.conftest import StubModel
+
+def test_crop_is_zero_copy_view():
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    roi = RegionOfInterest(320, 240, y_min=0.5, y_max=1.0, x_min=0.25)
+    crop = roi.crop(frame)
+    assert crop.shape == (120, 240, 3)
+    assert np.shares_memory(crop, frame)
+    assert roi.area_fraction == pytest.approx(0.375)
+
+def test_boxes_map_back_to_frame():
+    roi = RegionOfInterest(320, 240, x_min=0.25, y_min=0.5)
+    boxes = roi.to_frame(np.array([[0, 0, 10, 10]], dtype=np.float32))
+    assert boxes.tolist() == [[80, 120, 90, 130]]
+
+def test_polygon_filters_by_centroid():
+    square = [[0, 0], [100, 0], [100, 100], [0, 100]]
+    inside = points_in_polygon(np.array([[50, 50], [150, 50], [99, 1]]), np.array(square, dtype=float))
+    assert inside.tolist() == [True, False, True]
+
+    # Triangle in fractions of a 200x200 frame: crop is its bounding box
+    roi = RegionOfInterest(200, 200, polygon=[[0, 0], [1, 0], [0, 1]])
+    boxes = np.array([[10, 10, 30, 30], [150, 150, 170, 170]], dtype=np.float32)
+    assert roi.keep(boxes).tolist() == [True, False]
+
+def test_from_config_full_frame_is_none():
+    assert RegionOfInterest.from_config({'roi_y_min': 0.0, 'roi_y_max': 1.0}, 320, 240) is None
+    assert RegionOfInterest.from_config({'roi_y_min': 0.45}, 320, 240).y0 == 108
+
+def test_empty_roi_rejected():
+    with pytest.raises(ValueError):
+        RegionOfInterest(320, 240, y_min=0.8, y_max=0.2)
+
+def test_roi_crop_keeps_counts(synthetic_video, stub_config):
+    full = BagCounter(stub_config, model=StubModel())
+    expected = full.process_video(synthetic_video)
+
+    model = StubModel()
+    counter = BagCounter({**stub_config, 'roi_y_min': 0.4, 'roi_y_max': 1.0}, model=model)
+    assert counter.process_video(synthetic_video) == expected == {"in": 1, "out": 0}
+    assert model.last_shape[:2] == (144, 320)
@@ -0,0 +1,62 @@
+import numpy as np
+from src.counter import BagCounter
+from src.line_crossing import Orientation
+from src.pipeline import FramePipeline, CountSink
+from src.scheduler import MotionScheduler
+from tests.conftest import StubModel, moving_blob_frames, write_video
+
+def test_static_scene_is_skipped():
+    scheduler = MotionScheduler(320, 240, line_coord=160, orientation=Orientation.VERTICAL)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    assert scheduler.should_infer(frame, 1)  # no reference frame yet
+    assert not any(scheduler.should_infer(frame, i) for i in range(2, 20))
+    assert scheduler.stats()["skipped"] == 18
+
+def test_idle_keyframes():
+    scheduler = MotionScheduler(320, 240, line_coord=160, orientation=Orientation.VERTICAL, idle_stride=5)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    ran = [i for i in range(1, 21) if scheduler.should_infer(frame, i)]
+    assert ran == [1, 6, 11, 16]
+
+def test_motion_away_from_line_uses_stride():
+    scheduler = MotionScheduler(320, 240, line_coord=300, orientation=Orientation.VERTICAL, stride=3, line_zone=0.05)
+    # Blob stays in the left part of the frame, far from the line at x=300
+    frames = [np.hstack([f, np.zeros_like(f)]) for f in moving_blob_frames(n=10, width=160, height=240)]
+    ran = [i for i, f in enumerate(frames, 1) if scheduler.should_infer(f, i)]
+    assert ran == [1, 4, 7, 10]
+
+def test_motion_near_line_runs_every_frame():
+    scheduler = MotionScheduler(320, 240, line_coord=160, orientation=Orientation.VERTICAL, stride=3, hold_frames=2)
+    frames = moving_blob_frames(n=30, width=320, height=240)
+    ran = [i for i, f in enumerate(frames, 1) if scheduler.should_infer(f, i)]
+    # Frames around the blob passing x=160 must all be inferred
+    assert set(range(13, 18)).issubset(ran)
+
+def test_gated_counts_match_full_processing(tmp_path, stub_config):
+    video = write_video(tmp_path / "idle.avi", moving_blob_frames(n=30, idle=60))
+
+    full = BagCounter(stub_config, model=StubModel())
+    full_counts = full.process_video(video)
+
+    model = StubModel()
+    gated = BagCounter({**stub_config, 'motion_gating': True}, model=model)
+    pipeline = FramePipeline(gated, [CountSink()])
+    results = list(pipeline.run(video))
+
+    assert (gated.count_in, gated.count_out) == (full_counts["in"], full_counts["out"]) == (1, 0)
+    motion = pipeline.stats()["motion"]
+    assert motion["skipped"] >= 55
+    assert model.frames_seen == motion["inferred"]
+    assert sum(r.skipped for r in results) == motion["skipped"]
+
+def test_cooldown_advances_on_skipped_frames(stub_config):
+    counter = BagCounter({**stub_config, 'motion_gating': True, 'cooldown_frames': 3}, model=StubModel())
+    counter.setup(320, 240)
+    counter.detector.update([(7, 10.0)])
+    counter.detector.update([(7, 300.0)])
+    assert counter.detector.tracks_cooldown == {7: 3}
+    static = np.zeros((240, 320, 3), dtype=np.uint8)
+    for i in range(1, 5):
+        counter.process_frame(static, i)
+    assert 7 not in counter.detector.tracks_cooldown
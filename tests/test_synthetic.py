@@ -0,0 +1,54 @@
+import numpy as np
+from src.calibration import GroundTruth
+from src.counter import BagCounter
+from src.pipeline import EventLogSink
+from src.synthetic import SceneSpec, generate_scene, run_scene
+
+def test_scenes_are_deterministic_and_only_carried_sacks_are_true_crossings():
+    spec = SceneSpec(frames=900, workers_per_minute=30, carry_fraction=0.5, occlusion_fraction=0.5, seed=3)
+    a, b = generate_scene(spec), generate_scene(spec)
+    assert np.array_equal(a.boxes, b.boxes) and np.array_equal(a.ids, b.ids) and a.truth == b.truth
+
+    carried = [agent for agent in a.agents if agent["carrying"] and agent["crossed_at"] is not None]
+    assert 0 < len(carried) < len(a.agents)
+    assert a.truth.count_in + a.truth.count_out == len(a.truth.events) == len(carried)
+    # Occluded stretches are rendered but not reported by the tracker
+    assert not a.visible.all() and len(a.result(1).boxes.conf.cpu().numpy()) <= a.offsets[2] - a.offsets[1]
+
+def test_clean_scene_counts_exactly():
+    scene = generate_scene(SceneSpec(frames=1500, jitter=0.0, seed=1))
+    run = run_scene(BagCounter(scene.config(), model=scene.model()), scene)
+    assert (run["in"], run["out"]) == (scene.truth.count_in, scene.truth.count_out)
+    assert run["score"]["f1"] == 1.0 and run["fps"] > 0
+
+def test_hesitation_and_jitter_need_the_cooldown_or_margin():
+    scene = generate_scene(SceneSpec(frames=1500, jitter=4.0, hesitate_fraction=0.5, seed=2))
+    guarded = run_scene(BagCounter(scene.config(), model=scene.model()), scene)
+    assert guarded["score"]["count_error"] == 0
+    # Without a cooldown every sway across the line is counted again
+    bare = run_scene(BagCounter(scene.config(cooldown_frames=0), model=scene.model()), scene)
+    assert bare["score"]["count_error"] > 0 and bare["score"]["precision"] < 1.0
+
+def test_id_switches_lose_crossings():
+    spec = SceneSpec(frames=3000, jitter=0.0, id_switch_fraction=1.0, seed=4)
+    scene = generate_scene(spec)
+    assert len(np.unique(scene.ids)) > len(scene.agents) + sum(a["carrying"] for a in scene.agents)
+    run = run_scene(BagCounter(scene.config(), model=scene.model()), scene)
+    # A fresh id has no side yet, so a switch right at the line hides that crossing...
+    assert run["score"]["recall"] < 1.0 and run["score"]["precision"] == 1.0
+    # ...and positions inside the line margin are not remembered, so a wider margin loses more of them
+    wide = run_scene(BagCounter(scene.config(line_margin=10), model=scene.model()), scene)
+    assert wide["score"]["recall"] < run["score"]["recall"]
+
+def test_rendered_video_counts_like_the_tracks(tmp_path):
+    scene = generate_scene(SceneSpec(width=320, height=240, frames=200, workers_per_minute=60, jitter=0.0, seed=5))
+    video = scene.write_video(str(tmp_path / "scene.avi"))
+    truth = GroundTruth.from_events_csv(scene.write_truth(str(tmp_path / "truth.csv")))
+    assert truth == scene.truth and truth.count_in + truth.count_out > 0
+
+    counter, log = BagCounter(scene.config(), model=scene.model()), EventLogSink()
+    assert counter.process_video(video, sinks=[log]) == {"in": truth.count_in, "out": truth.count_out}
+    assert counter.pipeline.stats()["stages"]["infer"]["frames"] == scene.spec.frames
+    # The same model object replays from the start after TrackerWrapper.reset()
+    tracks = run_scene(counter, scene)
+    assert [(e["frame_idx"], e["direction"]) for e in log.events] == tracks["events"]
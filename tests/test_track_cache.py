@@ -0,0 +1,83 @@
+import os
+import pytest
+from src.counter import BagCounter
+from src.pipeline import CountSink, EventLogSink, FramePipeline, ThreadedFramePipeline
+from src.track_cache import track_cache_key
+from tests.conftest import StubModel, moving_blob_frames, write_video
+
+class NamedStub(StubModel):
+    """Stub that reports the same model path as the config, so recordings and replays share a key."""
+    ckpt_path = "missing-weights.pt"
+
+def run(counter, video, pipeline_cls=FramePipeline):
+    events = EventLogSink()
+    for _ in pipeline_cls(counter, [CountSink(), events]).run(video):
+        pass
+    return (counter.count_in, counter.count_out), events.events
+
+@pytest.fixture
+def cached_config(stub_config, tmp_path):
+    return {**stub_config, 'model': NamedStub.ckpt_path, 'track_cache_dir': str(tmp_path / "tracks")}
+
+@pytest.mark.parametrize("pipeline_cls", [FramePipeline, ThreadedFramePipeline])
+def test_replay_matches_recording_without_loading_a_model(synthetic_video, cached_config, pipeline_cls):
+    recorder = BagCounter(cached_config, model=NamedStub())
+    recorded = run(recorder, synthetic_video, pipeline_cls)
+    assert recorded[0] == (1, 0)
+    assert len(os.listdir(cached_config['track_cache_dir'])) == 1
+
+    replayer = BagCounter(cached_config)  # the model path does not exist: it must never be loaded
+    assert run(replayer, synthetic_video, pipeline_cls) == recorded
+    assert replayer.replay is not None
+    assert not replayer.tracker.loaded
+
+def test_counting_parameters_are_replayed_not_reinferred(synthetic_video, cached_config):
+    run(BagCounter(cached_config, model=NamedStub()), synthetic_video)
+
+    for change in ({'count_direction': 'top_to_bottom'}, {'line_position': 0.9}, {'cooldown_frames': 1}):
+        config = {**cached_config, **change}
+        fresh_model = NamedStub()
+        expected = run(BagCounter({**config, 'track_cache_dir': None}, model=fresh_model), synthetic_video)
+        replay_model = NamedStub()
+        assert run(BagCounter(config, model=replay_model), synthetic_video) == expected
+        assert fresh_model.calls > 0 and replay_model.calls == 0
+
+def test_motion_gated_replay_is_rerecorded_when_the_line_moves(synthetic_video, cached_config):
+    config = {**cached_config, 'motion_gating': True, 'motion_idle_stride': 0}
+    run(BagCounter(config, model=NamedStub()), synthetic_video)
+
+    # The skip schedule watches the zone around the line, so moving it needs a new recording
+    for change, replayed in (({'count_direction': 'top_to_bottom'}, True), ({'cooldown_frames': 1}, True),
+                             ({'line_position': 0.9}, False)):
+        changed = {**config, **change}
+        expected = run(BagCounter({**changed, 'track_cache_dir': None}, model=NamedStub()), synthetic_video)
+        model = NamedStub()
+        counter = BagCounter(changed, model=model)
+        assert run(counter, synthetic_video) == expected
+        assert (model.calls == 0) == replayed and (counter.replay is not None) == replayed
+
+def test_cache_key_covers_inference_inputs_only(synthetic_video, cached_config):
+    key = track_cache_key(synthetic_video, NamedStub(), cached_config)
+    assert key == track_cache_key(synthetic_video, NamedStub.ckpt_path, {**cached_config, 'line_position': 0.2})
+    assert key != track_cache_key(synthetic_video, NamedStub(), {**cached_config, 'confidence': 0.6})
+    assert key != track_cache_key(synthetic_video, NamedStub(), {**cached_config, 'track_classes': [24]})
+    assert key != track_cache_key(synthetic_video, StubModel(), cached_config)
+
+def test_incomplete_run_is_not_recorded(synthetic_video, cached_config):
+    counter = BagCounter(cached_config, model=NamedStub())
+    for result in FramePipeline(counter, [CountSink()]).run(synthetic_video):
+        if result.frame_idx == 5:
+            break
+    assert os.listdir(cached_config['track_cache_dir']) == []
+
+def test_replay_keeps_recorded_motion_schedule(tmp_path, cached_config):
+    video = write_video(tmp_path / "idle.avi", moving_blob_frames(idle=20))
+    config = {**cached_config, 'motion_gating': True, 'motion_idle_stride': 0}
+    recorder = BagCounter(config, model=NamedStub())
+    recorded = [r.skipped for r in FramePipeline(recorder, [CountSink()]).run(video)]
+    assert any(recorded)
+
+    replayer = BagCounter(config, model=NamedStub())
+    replayed = [r.skipped for r in FramePipeline(replayer, [CountSink()]).run(video)]
+    assert replayed == recorded
+    assert replayer.scheduler is None
@@ -0,0 +1,113 @@
+import os
+import stat
+import importlib.util
+import cv2
+import numpy as np
+import pytest
+from src.counter import BagCounter
+from src.utils import create_output_writer, get_video_properties
+from src.video_io import Decoder, VideoIOOptions, Writer, open_video, open_writer
+
+SAMPLES = ["data/samples/test_MJPG_avi.avi", "data/samples/test_XVID_avi.avi", "data/samples/test_PIM1_avi.avi",
+           "data/samples/test_mp4v_mp4.mp4"]
+
+def read_all(reader):
+    frames = []
+    while True:
+        ok, frame = reader.read()
+        if not ok:
+            break
+        frames.append(frame)
+    reader.release()
+    return frames
+
+def test_options_default_to_the_opencv_path():
+    options = VideoIOOptions.from_config({})
+    assert options == VideoIOOptions() and options.decoder == Decoder.OPENCV and options.fourcc == "mp4v"
+    options = VideoIOOptions.from_config({'video_decoder': 'pyav', 'video_writer': 'ffmpeg', 'output_crf': 28})
+    assert (options.decoder, options.writer, options.crf) == (Decoder.PYAV, Writer.FFMPEG, 28)
+    with pytest.raises(ValueError):
+        VideoIOOptions.from_config({'video_writer': 'gif'})
+
+@pytest.mark.parametrize("path", SAMPLES)
+def test_threaded_ffmpeg_decoder_matches_opencv_and_seeks_to_the_frame(path):
+    options = VideoIOOptions(decoder=Decoder.FFMPEG, decode_threads=2)
+    assert get_video_properties(path, options) == get_video_properties(path)
+    expected = read_all(open_video(path))
+    assert len(expected) == 10
+    frames = read_all(open_video(path, options))
+    assert all(np.array_equal(a, b) for a, b in zip(frames, expected)) and len(frames) == len(expected)
+
+    # OpenCV positions MPEG-1 in AVI one frame early (see CaptureReader.seek)
+    early = 1 if "PIM1" in path else 0
+    reader = open_video(path, options)
+    for idx in (7, 2):
+        reader.seek(idx)
+        ok, frame = reader.read()
+        assert ok and np.array_equal(frame, expected[idx - early])
+    reader.release()
+
+@pytest.mark.skipif(importlib.util.find_spec("av") is None, reason="PyAV is not installed")
+@pytest.mark.parametrize("path", SAMPLES)
+def test_pyav_decoder_reads_and_seeks(path):
+    expected = read_all(open_video(path))
+    reader = open_video(path, VideoIOOptions(decoder=Decoder.PYAV))
+    assert reader.props["width"] == expected[0].shape[1]
+    reader.seek(5)
+    ok, frame = reader.read()
+    # A different build of libavcodec may round differently, so compare loosely
+    assert ok and np.abs(frame.astype(int) - expected[5]).mean() < 2
+    assert len(read_all(reader)) == 4
+
+@pytest.mark.skipif(importlib.util.find_spec("av") is not None, reason="PyAV is installed")
+def test_pyav_without_the_package_names_it():
+    with pytest.raises(ImportError, match="video_decoder: pyav needs the av package"):
+        open_video(SAMPLES[0], VideoIOOptions(decoder=Decoder.PYAV))
+
+def test_ffmpeg_writer_streams_raw_frames_to_the_process(tmp_path):
+    # A stand-in ffmpeg that saves its arguments and copies stdin to the output path (its last argument)
+    fake = tmp_path / "ffmpeg"
+    fake.write_text('#!/bin/sh\nfor last; do :; done\necho "$@" > "$last.args"\ncat > "$last"\n')
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    frames = [np.full((48, 64, 3), i * 10, np.uint8) for i in range(5)]
+    frames.append(np.zeros((48, 128, 3), np.uint8)[:, ::2])  # a strided view is made contiguous first
+
+    output = tmp_path / "out" / "annotated.mp4"
+    options = VideoIOOptions(writer=Writer.FFMPEG, ffmpeg_binary=str(fake), preset="ultrafast")
+    writer = create_output_writer("in.mp4", str(output), 20.0, 64, 48, options)
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+    assert output.read_bytes() == b"".join(np.ascontiguousarray(f).tobytes() for f in frames)
+    args = (tmp_path / "out" / "annotated.mp4.args").read_text().split()
+    assert args[args.index("-s") + 1] == "64x48" and args[args.index("-c:v") + 1] == "libx264"
+    assert args[args.index("-preset") + 1] == "ultrafast" and args[args.index("-crf") + 1] == "23"
+
+    writer = open_writer(str(tmp_path / "b.mp4"), 20.0, 64, 48, options)
+    with pytest.raises(ValueError):
+        writer.write(np.zeros((48, 63, 3), np.uint8))
+    writer.release()
+    missing = VideoIOOptions(writer=Writer.FFMPEG, ffmpeg_binary="no-such-ffmpeg")
+    with pytest.raises(FileNotFoundError, match="ffmpeg"):
+        open_writer(str(tmp_path / "c.mp4"), 20.0, 64, 48, missing)
+
+def test_jpeg_writer_output_through_the_pipeline(tmp_path, synthetic_video, stub_model, stub_config):
+    config = {**stub_config, 'video_decoder': 'ffmpeg', 'video_writer': 'jpeg', 'output_jpeg_quality': 95}
+    counter = BagCounter(config, model=stub_model)
+    assert counter.process_video(synthetic_video, str(tmp_path / "annotated.mp4")) == {"in": 1, "out": 0}
+
+    names = sorted(os.listdir(tmp_path / "annotated"))
+    assert len(names) == 30 and names[0] == "000001.jpg"
+    first = cv2.imread(str(tmp_path / "annotated" / names[0]))
+    assert first.shape == (240, 320, 3)
+
+def test_opencv_writer_uses_the_fourcc(tmp_path):
+    path = str(tmp_path / "out.avi")
+    writer = open_writer(path, 20.0, 64, 48, VideoIOOptions(fourcc="MJPG"))
+    for i in range(3):
+        writer.write(np.full((48, 64, 3), 100, np.uint8))
+    writer.release()
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FOURCC)).to_bytes(4, "little") == b"MJPG"
+    cap.release()
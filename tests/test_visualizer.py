@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+import pytest
+from src.gates import Gate
+from src.line_crossing import Orientation
+from src.visualizer import TextCache, Visualizer
+
+def reference_hud(frame, vis, count_in, count_out, frame_idx, gate_counts=None):
+    """The original full-frame implementation: draw everything, then blend a shaded copy of the whole frame."""
+    if vis.gates:
+        for gate in vis.gates:
+            pts = np.round(gate.points).astype(np.int32)
+            cv2.polylines(frame, [pts.reshape(-1, 1, 2)], False, (0, 0, 255), 3)
+            a, b = gate.points[0], gate.points[1]
+            mid = (a + b) / 2
+            d = (b - a) / max(np.linalg.norm(b - a), 1e-6)
+            tip = mid + np.array([-d[1], d[0]]) * 30
+            cv2.arrowedLine(frame, tuple(int(v) for v in mid), tuple(int(v) for v in tip), (0, 255, 0), 2, tipLength=0.3)
+            counts = (gate_counts or {}).get(gate.name, {"in": 0, "out": 0})
+            label = f"{gate.name} IN {counts['in']} OUT {counts['out']}"
+            x, y = int(pts[0, 0]), int(pts[0, 1]) - 10
+            cv2.putText(frame, label, (max(0, x), max(20, y)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+    elif vis.orientation == Orientation.HORIZONTAL:
+        cv2.line(frame, (0, vis.line_coord), (vis.width, vis.line_coord), (0, 0, 255), 3)
+    else:
+        cv2.line(frame, (vis.line_coord, 0), (vis.line_coord, vis.height), (0, 0, 255), 3)
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (10, 10), (250, 140), (0, 0, 0), -1)
+    cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+    cv2.putText(frame, f"Frame: {frame_idx}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    cv2.putText(frame, f"IN: {count_in}", (20, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+    cv2.putText(frame, f"OUT: {count_out}", (20, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    cv2.putText(frame, f"TOTAL: {count_in + count_out}", (20, 135), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+    return frame
+
+def assert_close(actual, expected):
+    """Antialiased text is blended by the sprite cache instead of by putText: allow rounding differences."""
+    assert actual.shape == expected.shape
+    assert np.abs(actual.astype(int) - expected.astype(int)).max() <= 2
+
+def frames(width, height, n=4):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(n)]
+
+@pytest.mark.parametrize("orientation,coord", [(Orientation.HORIZONTAL, 120), (Orientation.VERTICAL, 200),
+                                               (Orientation.VERTICAL, 60)])
+def test_hud_matches_full_frame_blend(orientation, coord):
+    vis = Visualizer(coord, orientation, 400, 300)
+    for i, frame in enumerate(frames(400, 300)):
+        expected = reference_hud(frame.copy(), vis, i // 2, 3, i + 1)
+        assert_close(vis.draw_hud(frame, i // 2, 3, i + 1), expected)
+
+def test_gate_layers_and_labels_match_direct_drawing():
+    gates = [Gate("dock", [[5, 8], [150, 90]]), Gate("conveyor", [[300, 280], [390, 200], [399, 100]])]
+    vis = Visualizer(0, Orientation.VERTICAL, 400, 300, gates=gates)
+    assert len(vis.static_layers) == 2
+    assert all(layer.alpha.size < 400 * 300 / 4 for layer in vis.static_layers)
+    for i, frame in enumerate(frames(400, 300)):
+        counts = {"dock": {"in": i, "out": 0}, "conveyor": {"in": 1, "out": i // 2}}
+        expected = reference_hud(frame.copy(), vis, i, 0, i, counts)
+        assert_close(vis.draw_hud(frame, i, 0, i, counts), expected)
+
+def test_count_text_is_rendered_once_per_value():
+    vis = Visualizer(100, Orientation.HORIZONTAL, 320, 240)
+    for i in range(20):
+        vis.draw_hud(np.zeros((240, 320, 3), np.uint8), 1, 2, i)
+    assert vis.text.misses == 3 and vis.text.hits == 57
+    vis.draw_hud(np.zeros((240, 320, 3), np.uint8), 2, 2, 21)
+    assert vis.text.misses == 5  # IN and TOTAL changed, OUT did not
+
+def test_text_sprites_clip_at_frame_edges():
+    cache = TextCache()
+    for org in [(-15, 10), (300, 239), (0, 5)]:
+        frame = np.zeros((240, 320, 3), np.uint8)
+        expected = frame.copy()
+        cv2.putText(expected, "OUT: 12", org, cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+        cache.draw(frame, "OUT: 12", org, 0.8, (0, 0, 255), 2)
+        assert_close(frame, expected)
+
+def test_small_frames_clip_the_hud_panel():
+    vis = Visualizer(50, Orientation.HORIZONTAL, 120, 90)
+    frame = frames(120, 90, 1)[0]
+    assert_close(vis.draw_hud(frame.copy(), 4, 5, 6), reference_hud(frame.copy(), vis, 4, 5, 6))
@@ -1,13 +1,22 @@
 import os
+import json
 import logging
 import sys
+import threading
 from flask import Flask, render_template, Response, jsonify, request, send_file
 
 # Add parent directory to sys.path so we can import 'src'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.counter import BagCounter
-from src.utils import load_config, setup_logging
+from src.backends import Backend, backend_for
+from src.broadcast import BroadcastHub
+from src.encoding import StreamTier, TierEncoder
+from src.jobs import JobManager, OutputCache, cache_key
+from src.pipeline import ProgressSink, UpdateSink
+from src.profiling import prometheus_text
+from src.quantization import resolve_model
+from src.utils import get_video_properties, load_config, setup_logging
 from ultralytics import YOLO
 
 # Initialize
@@ -20,11 +29,7 @@ app = Flask(__name__,
 # Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODELS_DIR = BASE_DIR
-MODEL_PATH = os.path.join(MODELS_DIR, "best.pt")
-
-# 1. Load YOLO Model ONLY ONCE at startup
-logger.info(f"Loading YOLO model from {MODEL_PATH}...")
-shared_model = YOLO(MODEL_PATH)
+MODEL_PATH = os.environ.get("BAGCOUNTER_MODEL", os.path.join(MODELS_DIR, "best.pt"))
 
 # Scenario Mapping
 SCENARIOS = {
@@ -33,9 +38,57 @@ SCENARIOS = {
     "3": {"video": "data/samples/Problem Statement Scenario3.mp4", "config": "config/scenario3_config.yaml", "title": "Scenario 3: Busy Corridor"}
 }
 
-# Global counter instance (or per request if preferred, but user implies persist)
-# We recreate it per scenario to reset state
-active_counter = None
+# Live streams: one background pipeline per scenario, shared by every viewer
+STREAM_CONFIG = load_config(os.path.join(BASE_DIR, "config/default_config.yaml"))
+scenario_models = {}  # scenario id -> (weights, model, the channel that last ran it)
+scenario_models_lock = threading.Lock()
+last_scenario = None
+
+def model_weights(config):
+    """The weights a scenario runs: MODEL_PATH, or its accepted fp16/int8 variant for `model_precision`."""
+    return resolve_model(MODEL_PATH, config.get('model_precision', 'fp32'), config.get('imgsz', 640))
+
+def load_model(weights):
+    """
+    A YOLO model for .pt weights. Exported variants are passed on as paths, so each counter's TrackerWrapper
+    opens them on the ONNX/OpenVINO backend with its own tracker, as the CLI does.
+    """
+    return YOLO(weights) if backend_for(weights) == Backend.TORCH else weights
+
+def scenario_model(scenario_id, weights, channel):
+    """
+    One model per live scenario, handed from channel to channel. ByteTrack state lives on the model, so a new
+    channel first waits for the previous one's producer, which may still be draining after its grace-period
+    stop, to exit; only then is the model safe to reset and reuse.
+    """
+    with scenario_models_lock:
+        loaded, model, previous = scenario_models.get(scenario_id, (None, None, None))
+        if loaded != weights:
+            model = load_model(weights)
+        scenario_models[scenario_id] = (weights, model, channel)
+    if previous is not None and previous is not channel:
+        previous.stop()
+    return model
+
+def start_scenario(scenario_id, channel):
+    """
+    Builds a fresh counter for the scenario and returns it with its annotated-frame generator;
+    each quality tier encodes those frames on its own thread. Count changes and crossing events are
+    pushed to the channel's update listeners as they happen.
+    """
+    scenario = SCENARIOS[scenario_id]
+    config = load_config(os.path.join(BASE_DIR, scenario["config"]))
+    counter = BagCounter(config, model=scenario_model(scenario_id, model_weights(config), channel))
+    counter.reset()
+    updates = UpdateSink(channel.publish_update, tags={"scenario": scenario_id, "session": channel.session})
+    logger.info(f"Started streaming scenario {scenario_id} (session {channel.session})")
+    return counter, counter.stream_frames(os.path.join(BASE_DIR, scenario["video"]), sinks=[updates])
+
+hub = BroadcastHub(
+    start_scenario,
+    ring_size=STREAM_CONFIG.get('stream_ring_size', 8),
+    grace_seconds=STREAM_CONFIG.get('stream_grace_seconds', 5.0)
+)
 
 @app.route("/")
 def index():
@@ -45,84 +98,179 @@ def index():
 def get_scenarios():
     return jsonify([{"id": k, **v} for k, v in SCENARIOS.items()])
 
-def gen_frames(scenario_id):
-    global active_counter
-    if scenario_id not in SCENARIOS:
-        return
-    
-    scenario = SCENARIOS[scenario_id]
-    video_path = os.path.join(BASE_DIR, scenario["video"])
-    config_path = os.path.join(BASE_DIR, scenario["config"])
-    
-    if not os.path.exists(video_path):
-        logger.error(f"Video file {scenario['video']} not found")
-        return
-
-    # Load config and initialize/reset counter
-    config = load_config(config_path)
-    active_counter = BagCounter(config, model=shared_model)
-    active_counter.reset()
-    
-    logger.info(f"Started streaming scenario {scenario_id}")
-    yield from active_counter.stream_video(video_path)
-
 @app.route("/video_feed/<scenario_id>")
 def video_feed(scenario_id):
-    """Video streaming route. Put this in the src attribute of an img tag."""
-    # Add timestamp/cache-buster check if needed here, but usually handled in frontend
-    return Response(gen_frames(scenario_id),
+    """
+    Video streaming route. Put this in the src attribute of an img tag.
+    Every viewer of a scenario reads the same broadcast; the pipeline starts with the first viewer
+    and stops `stream_grace_seconds` after the last one disconnects.
+    Optional ?width=&quality=&fps= pick a quality tier (capped by stream_max_* in the config); viewers
+    on the same tier share one encoder, which drops frames to hold its fps without slowing counting.
+    """
+    global last_scenario
+    if scenario_id not in SCENARIOS:
+        return jsonify({"error": "Unknown scenario"}), 404
+    if not os.path.exists(os.path.join(BASE_DIR, SCENARIOS[scenario_id]["video"])):
+        logger.error(f"Video file {SCENARIOS[scenario_id]['video']} not found")
+        return jsonify({"error": "Video file not found on server"}), 404
+
+    last_scenario = scenario_id
+    tier = StreamTier.from_request(request.args, STREAM_CONFIG)
+    return Response(hub.stream(scenario_id, tier, lambda: TierEncoder(tier), tier.max_fps),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route("/api/events/<scenario_id>")
+def count_events(scenario_id):
+    """
+    Server-Sent Events: a counts snapshot on connect, then `counts` (totals and deltas) and `crossing`
+    messages as bags cross, `start`/`end` around each pipeline run, and a keepalive comment when idle.
+    """
+    if scenario_id not in SCENARIOS:
+        return jsonify({"error": "Unknown scenario"}), 404
+
+    def stream():
+        yield "retry: 3000\n\n"
+        for message in hub.updates(scenario_id, heartbeat=STREAM_CONFIG.get('sse_heartbeat_seconds', 15.0)):
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/api/counts")
 def get_counts():
-    if active_counter:
+    """Current totals for one scenario. Kept for scripts; the dashboard uses /api/events."""
+    channel = hub.get(request.args.get("scenario", last_scenario) or "")
+    counter = channel.state if channel else None
+    if counter:
         return jsonify({
-            "in": active_counter.count_in,
-            "out": active_counter.count_out,
-            "total": active_counter.count_in + active_counter.count_out
+            "in": counter.count_in,
+            "out": counter.count_out,
+            "total": counter.count_in + counter.count_out
         })
     return jsonify({"in": 0, "out": 0, "total": 0})
 
+@app.route("/api/streams")
+def get_streams():
+    """Running broadcasts with their viewer counts and dropped frames."""
+    return jsonify(hub.stats())
 
-@app.route("/download/<scenario_id>")
-def download_processed_video(scenario_id):
+@app.route("/metrics")
+def metrics():
     """
-    Generate and return an annotated MP4 for the given scenario.
-    This reuses the BagCounter.process_video pipeline on the server side.
+    Prometheus text exposition of each live scenario's pipeline: stage busy time and queue depths, plus stage
+    latency quantiles, fps and model vs. host time for scenarios whose config turns `profiling` on.
     """
-    if scenario_id not in SCENARIOS:
-        return jsonify({"error": "Unknown scenario"}), 404
+    sources = {}
+    for scenario_id in SCENARIOS:
+        channel = hub.get(scenario_id)
+        counter = channel.state if channel and channel.running else None
+        if counter is not None and counter.pipeline is not None:
+            sources[scenario_id] = counter.pipeline.stats()
+    return Response(prometheus_text(sources), mimetype="text/plain; version=0.0.4")
+
+
+# Annotated-video downloads: rendered once per (video, config, model) on a worker pool and cached
+CACHE_DIR = os.path.join(BASE_DIR, STREAM_CONFIG.get("output_dir", "outputs"), "cache")
+
+render_models = threading.local()
+
+def render_model(weights):
+    """One model per render worker thread and weights file, loaded on first use; BagCounter resets its tracker."""
+    if not hasattr(render_models, "models"):
+        render_models.models = {}
+    if weights not in render_models.models:
+        render_models.models[weights] = load_model(weights)
+    return render_models.models[weights]
+
+def render_scenario(job, output_path):
+    """Renders one scenario's annotated video with its worker's model, updating the job's frame count."""
+    scenario = SCENARIOS[job.label]
+    config = load_config(os.path.join(BASE_DIR, scenario["config"]))
+    counter = BagCounter(config, model=render_model(model_weights(config)))
 
+    def progress(frame_idx):
+        job.frames_done = frame_idx
+
+    counter.process_video(os.path.join(BASE_DIR, scenario["video"]), output_path, sinks=[ProgressSink(progress)])
+
+jobs = JobManager(
+    OutputCache(CACHE_DIR, int(STREAM_CONFIG.get("output_cache_max_mb", 2048)) * 1024 * 1024),
+    render_scenario,
+    workers=STREAM_CONFIG.get("download_workers", 1)
+)
+
+def submit_download(scenario_id):
+    """Starts (or joins, or answers from cache) the render of a scenario. Returns (job, error response)."""
+    if scenario_id not in SCENARIOS:
+        return None, (jsonify({"error": "Unknown scenario"}), 404)
     scenario = SCENARIOS[scenario_id]
     video_path = os.path.join(BASE_DIR, scenario["video"])
-    config_path = os.path.join(BASE_DIR, scenario["config"])
-
     if not os.path.exists(video_path):
         logger.error(f"Video file {scenario['video']} not found for download")
-        return jsonify({"error": "Video file not found on server"}), 404
+        return None, (jsonify({"error": "Video file not found on server"}), 404)
 
-    # Load config and run offline processing to produce an annotated MP4
-    config = load_config(config_path)
-    counter = BagCounter(config, model=shared_model)
+    config = load_config(os.path.join(BASE_DIR, scenario["config"]))
+    try:
+        weights = model_weights(config)
+    except ValueError as e:
+        logger.error(f"No model for scenario {scenario_id}: {e}")
+        return None, (jsonify({"error": str(e)}), 409)
+    key = cache_key(video_path, config, weights)
+    return jobs.submit(key, get_video_properties(video_path)["total_frames"], label=scenario_id), None
 
-    video_name = os.path.basename(video_path)
-    output_dir = os.path.join(BASE_DIR, config.get("output_dir", "outputs"))
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, f"annotated_{video_name}")
+def job_file_response(job):
+    path = jobs.file(job)
+    if path is None:
+        return jsonify({"error": "Output is no longer cached, submit the job again"}), 410
+    video_name = os.path.basename(SCENARIOS[job.label]["video"])
+    return send_file(path, as_attachment=True, download_name=f"annotated_{video_name}", mimetype="video/mp4")
 
-    logger.info(f"Generating annotated video for download: {output_path}")
-    counter.process_video(video_path, output_path)
+@app.route("/api/jobs/<scenario_id>", methods=["POST"])
+def create_job(scenario_id):
+    """
+    Queues an annotated-video render and returns the job at once: 200 if the output is already cached,
+    202 otherwise. Identical requests while it runs share the same job.
+    """
+    job, error = submit_download(scenario_id)
+    if error:
+        return error
+    return jsonify(job.to_dict()), 200 if job.status == "done" else 202
+
+@app.route("/api/jobs/<job_id>")
+def job_status(job_id):
+    """Status and progress (frames_done / total_frames) of a render job."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
 
-    if not os.path.exists(output_path):
-        logger.error(f"Expected output video not found at {output_path}")
-        return jsonify({"error": "Failed to generate output video"}), 500
+@app.route("/api/jobs/<job_id>/file")
+def job_file(job_id):
+    """The finished video of a job; 409 while it is still rendering."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    if job.status == "failed":
+        return jsonify(job.to_dict()), 500
+    if job.status != "done":
+        return jsonify(job.to_dict()), 409
+    return job_file_response(job)
 
-    return send_file(
-        output_path,
-        as_attachment=True,
-        download_name=os.path.basename(output_path),
-        mimetype="video/mp4",
-    )
+@app.route("/download/<scenario_id>")
+def download_processed_video(scenario_id):
+    """
+    Returns the annotated MP4 for a scenario straight away if it is cached. Otherwise starts a render job
+    and answers 202 with the job; poll /api/jobs/<id> and fetch /api/jobs/<id>/file when it is done.
+    """
+    job, error = submit_download(scenario_id)
+    if error:
+        return error
+    if job.status == "done":
+        return job_file_response(job)
+    return jsonify(job.to_dict()), 202
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=False, threaded=True)
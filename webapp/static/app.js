@@ -4,7 +4,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const videoStream = document.getElementById('videoStream');
     const scenarioTitle = document.getElementById('current-scenario-title');
     const downloadBtn = document.getElementById('download-btn');
-    let countInterval = null;
+    const recentList = document.getElementById('recent-crossings');
+    let countEvents = null;
     let currentScenarioId = null;
 
     async function init() {
@@ -46,8 +47,8 @@ document.addEventListener('DOMContentLoaded', () => {
             downloadBtn.disabled = false;
         }
 
-        // Start polling counts
-        startCountingPolling();
+        // Subscribe to pushed count updates
+        subscribeCounts(id);
     };
 
     window.stopStream = () => {
@@ -58,33 +59,67 @@ document.addEventListener('DOMContentLoaded', () => {
         streamArea.classList.add('hidden');
         grid.classList.remove('hidden');
 
-        // Stop polling
-        if (countInterval) clearInterval(countInterval);
+        // Stop count updates
+        if (countEvents) countEvents.close();
+        countEvents = null;
         // Optional: disable download button if you want it per-session
         // if (downloadBtn) downloadBtn.disabled = true;
     };
 
-    window.downloadVideo = () => {
-        if (!currentScenarioId) return;
-        // Trigger a file download from the backend
-        window.location.href = `/download/${currentScenarioId}`;
+    window.downloadVideo = async () => {
+        if (!currentScenarioId || !downloadBtn) return;
+        const label = downloadBtn.innerText;
+        downloadBtn.disabled = true;
+        try {
+            // Queue the render (answered at once when cached), then poll its progress
+            let resp = await fetch(`/api/jobs/${currentScenarioId}`, { method: 'POST' });
+            let job = await resp.json();
+            while (job.status === 'queued' || job.status === 'running') {
+                downloadBtn.innerText = `Rendering... ${Math.round(job.progress * 100)}%`;
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                resp = await fetch(`/api/jobs/${job.id}`);
+                job = await resp.json();
+            }
+            if (job.status !== 'done') throw new Error(job.error || 'Render failed');
+            window.location.href = `/api/jobs/${job.id}/file`;
+        } catch (err) {
+            console.error('Download failed', err);
+            alert(`Download failed: ${err.message}`);
+        } finally {
+            downloadBtn.innerText = label;
+            downloadBtn.disabled = false;
+        }
     };
 
-    function startCountingPolling() {
-        if (countInterval) clearInterval(countInterval);
+    function showCounts(counts) {
+        document.getElementById('count-in').innerText = counts.in;
+        document.getElementById('count-out').innerText = counts.out;
+        document.getElementById('count-total').innerText = counts.total;
+    }
 
-        countInterval = setInterval(async () => {
-            try {
-                const resp = await fetch('/api/counts');
-                const counts = await resp.json();
+    function showCrossing(event) {
+        if (!recentList) return;
+        const item = document.createElement('li');
+        const gate = event.gate && event.gate !== 'line' ? ` @ ${event.gate}` : '';
+        item.innerText = `${event.timestamp.toFixed(1)}s  bag #${event.track_id} ${event.direction.toUpperCase()}${gate}`;
+        recentList.prepend(item);
+        while (recentList.children.length > 8) recentList.removeChild(recentList.lastChild);
+    }
 
-                document.getElementById('count-in').innerText = counts.in;
-                document.getElementById('count-out').innerText = counts.out;
-                document.getElementById('count-total').innerText = counts.total;
-            } catch (err) {
-                console.error("Failed to poll counts");
-            }
-        }, 1000);
+    function subscribeCounts(id) {
+        if (countEvents) countEvents.close();
+        if (recentList) recentList.innerHTML = '';
+        showCounts({ in: 0, out: 0, total: 0 });
+
+        // Server-Sent Events: the server pushes totals when a bag crosses; the browser reconnects on its own
+        countEvents = new EventSource(`/api/events/${id}`);
+        countEvents.addEventListener('counts', (e) => showCounts(JSON.parse(e.data)));
+        countEvents.addEventListener('crossing', (e) => showCrossing(JSON.parse(e.data)));
+        countEvents.addEventListener('start', () => {
+            if (recentList) recentList.innerHTML = '';
+            showCounts({ in: 0, out: 0, total: 0 });
+        });
+        countEvents.onerror = () => console.error("Count updates disconnected, retrying");
     }
 
     init();